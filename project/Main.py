@@ -3,26 +3,36 @@ from frountend.GUI import (
     GraphicalUserInterface,
     SetAssistantStatus,
     ShowTextToScreen,
+    ShowPartialText,
     TempDirectoryPath,
     SetMicrophoneStatus,
     AnswerModifier,
     QueryModifier,
     GetMicrophoneStatus,
-    GetAssistantStatus
+    GetAssistantStatus,
+    assistant_state
 )
 from backend.model import FirstlayerDMM
-from backend.RealtimeSearchEngine import RealtimeSearchEngine
+from backend.RealtimeSearchEngine import RealtimeSearchEngineStream
 from backend.automation import Automation
-from backend.speechtotext import SpeechRecognition
-from backend.chatbot import Chatbot
-from backend.TextToSpeech import TextToSpeech
+from backend.speechtotext import SpeechRecognition, PrewarmSpeechRecognition
+from backend.chatbot import Chatbot, ChatbotStream, summarizer
+from backend.TextToSpeech import TextToSpeech, StreamingTextToSpeech, PrewarmSpeechCache, InterruptSpeech, IsSpeaking, PRIORITY_URGENT
+from backend.conversation import get_conversation
+from backend.transcript import TranscriptRenderer
+from backend.search_index import get_search_index
+from backend.memory import get_memory
+from backend.image_worker import ImageWorkerClient
+from backend.streaming import SentenceSplitter
+from backend.cancel import CancelToken
+from backend.events import get_event_bus, MIC_STATUS
 from asyncio import run
-from time import sleep
-import subprocess
 import threading
-import json
+import logging
+import sys
 import os
-import pyttsx3  # Ensure this library is installed for text-to-speech
+
+logger = logging.getLogger(__name__)
 
 # Load environment variables
 env_vars = dotenv_values(".env")
@@ -30,37 +40,51 @@ Username = env_vars.get("Username")
 Assistantname = env_vars.get("Assistantname")
 DefaultMessage = f''''{Username} : Hello {Assistantname},How are you?
 {Assistantname} : welcome {Username}. I am doing well. How may I help you?'''
-subprocess = []
 Functions = ["open", "close", "play", "system", "content", "google search", "youtube search"]
 
+# Rendered chat transcript shown by the GUI, kept in step with the conversation
+transcript = TranscriptRenderer(TempDirectoryPath('Database.data'), Username, Assistantname)
+get_conversation().add_listener(transcript.add_turns)
+
+def ShowImageProgress(event):
+    # Progress events from the image worker, delivered on its reader thread
+    if event["state"] == "running" and event.get("total"):
+        # Jobs still waiting are read from the worker's shared-memory status block
+        queued = image_worker.status()["queued"]
+        SetAssistantStatus(f"Generating images... {event['done']}/{event['total']}"
+                           + (f" ({queued} more queued)" if queued else ""))
+    elif event["state"] == "failed":
+        SetAssistantStatus(f"Image generation failed: {event['error']}")
+    elif event["state"] == "done":
+        SetAssistantStatus("Available...")
+
+# Long-lived image worker, started on the first image request
+image_worker = ImageWorkerClient([sys.executable, '-m', 'backend.imageGeneration'], on_event=ShowImageProgress,
+                                 cwd=os.path.dirname(os.path.abspath(__file__)))
+
+# Asking for an image again with one of these words draws new seeds instead
+# of returning the cached images for the same prompt
+RegenerateWords = {"again", "another", "different", "new", "regenerate"}
+
+def StartImageGeneration(prompt):
+    try:
+        image_worker.submit(prompt, regenerate=bool(RegenerateWords & set(prompt.lower().split())))
+    except (OSError, RuntimeError) as e:
+        print(f"Error starting ImageGeneration.py: {e}")
+
 def ShowDefultChatIfNoChats():
-    File = open(r'Data\ChatLog.json', "r", encoding='utf-8')
-    
-    if len(File.read()) < 5:
+    if len(get_conversation()) == 0:
         with open(TempDirectoryPath('Database.data'), "w", encoding='utf-8') as file:
             file.write("")  # Clear the database file
         
-        with open(TempDirectoryPath('Responses.data'), "w", encoding='utf-8') as file:
-            file.write(DefaultMessage)  # Write the default chat message
+        ShowTextToScreen(DefaultMessage)  # Show the default chat message
 
 def ReadChatLogJson():
-    with open(r'Data\ChatLog.json', 'r', encoding='utf-8') as file:
-        chatlog_data = json.load(file)
-    return chatlog_data  # Add return statement
+    return get_conversation().read_all()
 
 def ChatLogIntegration():
-    json_data = ReadChatLogJson()
-    formatted_chatlog = ""
-    for entry in json_data:
-        if entry["role"] == "user":
-            formatted_chatlog += f"User: {entry['content']}\n"  # Corrected typo: "USer" to "User"
-        elif entry["role"] == "assistant":
-            formatted_chatlog += f"Assistant: {entry['content']}\n"
-    formatted_chatlog = formatted_chatlog.replace("User", Username + "")
-    formatted_chatlog = formatted_chatlog.replace("Assistant", Assistantname + "")
-
-    with open(TempDirectoryPath('Database.data'), 'w', encoding='utf-8') as file:
-        file.write(AnswerModifier(formatted_chatlog))
+    # Only turns recorded since the last render are formatted and appended
+    transcript.sync(get_conversation())
 
 def ShowCatsOnGUI():
     File = open(TempDirectoryPath('Database.data'), "r", encoding='utf-8')  # Corrected typo: 'Databas' to 'Database'
@@ -68,10 +92,8 @@ def ShowCatsOnGUI():
     if len(str(Data)) > 0:
         lines = Data.split('\n')
         result = '\n'.join(lines)  # Corrected typo: 'reslut' to 'result'
-        File.close()
-        File = open(TempDirectoryPath('Responses.data'), "w", encoding='utf-8')
-        File.write(result)
-        File.close()
+        ShowTextToScreen(result)
+    File.close()
 
 def InitialExecution():
     SetMicrophoneStatus("False")
@@ -83,6 +105,60 @@ def InitialExecution():
 
 InitialExecution()
 
+# Token of the answer being generated/spoken; cancelled when the user barges in
+current_answer = None
+
+def BargeIn(topic, value):
+    # Turning the mic on while answering cuts the answer short: the LLM stream
+    # is closed, the mixer stops and queued sentences are dropped
+    if str(value) != "True":
+        return
+    answer = current_answer
+    answering = answer is not None and not answer.cancelled
+    if answering:
+        logger.info("Barge-in: cancelling the current answer")
+        answer.cancel()
+    # Speech from an earlier answer may still be playing after generation ended
+    if answering or IsSpeaking(tail=0):
+        InterruptSpeech()
+
+get_event_bus().subscribe(MIC_STATUS, BargeIn)
+
+def StreamAnswer(Tokens, token):
+    # Shows the answer on screen and speaks finished sentences while the
+    # model is still generating the rest
+    # A newer answer replaces an older one that has not started speaking yet
+    speech = StreamingTextToSpeech(token=token, key="answer")
+    splitter = SentenceSplitter()
+    Answer = ""
+    for Text in Tokens:
+        if token.cancelled:
+            break
+        if not Answer:
+            SetAssistantStatus("Answering...")
+        Answer += Text
+        ShowPartialText(f"{Assistantname} : {AnswerModifier(Answer)}")
+        for sentence in splitter.feed(Text):
+            speech.add(sentence)
+    if not token.cancelled:
+        for sentence in splitter.flush():
+            speech.add(sentence)
+
+    Answer = AnswerModifier(Answer.strip())
+    ShowTextToScreen(f"{Assistantname} : {Answer}")
+    speech.finish(Answer, wait=False)  # Spoken by the TTS worker while we listen again
+    return Answer
+
+def AnswerWith(Stream, Query):
+    # Streams one answer under a fresh cancel token so BargeIn can interrupt it
+    global current_answer
+    token = CancelToken()
+    current_answer = token
+    try:
+        return StreamAnswer(Stream(Query, token), token)
+    finally:
+        current_answer = None
+
 def MainExecution():  # Fixed missing colon
     TaskExecution = False
     ImageExecution = False
@@ -96,6 +172,12 @@ def MainExecution():  # Fixed missing colon
         print("No valid input detected, retrying...")
         return  # Or handle the case where there's no valid input
 
+    # Answers are spoken while we listen again, so the mic hears them too;
+    # the user interrupts an answer with the mic button instead (BargeIn)
+    if IsSpeaking():
+        print(f"Ignoring speech heard while {Assistantname} was talking: {Query}")
+        return
+
     ShowTextToScreen(f"{Username} : {Query}")
     SetAssistantStatus("Thinking...")
 
@@ -127,24 +209,11 @@ def MainExecution():  # Fixed missing colon
                 TaskExecution = True
 
     if ImageExecution == True:
-        with open(r"frountend\Files\imagegenration.data", "w") as file:
-            file.write(f"{ImageGenerationQuery},True")
-
-        try:
-            p1 = subprocess.Popen(['python', r'backend\imageGeneration.py'],
-                                  stdout=subprocess, stderr=subprocess.PIPE,
-                                  stdin=subprocess.PIPE, shell=False)
-
-            subprocess.append(p1)
-
-        except Exception as e:
-            print(f"Error starting ImageGeneration.py: {e}")
+        StartImageGeneration(ImageGenerationQuery)  # submit() only queues the job
 
     if G and R or R:
         SetAssistantStatus("Searching...")
-        Answer = RealtimeSearchEngine(QueryModifier(Mearged_query))
-        ShowTextToScreen(f"{Assistantname} : {Answer}")
-        TextToSpeech(Answer)  # Ensure this works correctly
+        AnswerWith(RealtimeSearchEngineStream, QueryModifier(Mearged_query))
         return True
 
     else:
@@ -152,19 +221,13 @@ def MainExecution():  # Fixed missing colon
             if "general" in Queries:
                 SetAssistantStatus("Thinking...")
                 QueryFinal = Queries.replace("general", "")
-                Answer = Chatbot(QueryModifier(QueryFinal))
-                ShowTextToScreen(f"{Assistantname} : {Answer}")
-                SetAssistantStatus("Answering...")
-                TextToSpeech(Answer)  # Ensure this works correctly
+                AnswerWith(ChatbotStream, QueryModifier(QueryFinal))
                 return True
 
             elif "realtime" in Queries:
                 SetAssistantStatus("Searching...")
                 QueryFinal = Queries.replace("realtime", "")
-                Answer = RealtimeSearchEngine(QueryModifier(QueryFinal))
-                ShowTextToScreen(f"{Assistantname} : {Answer}")
-                SetAssistantStatus("Answering...")
-                TextToSpeech(Answer)  # Ensure this works correctly
+                AnswerWith(RealtimeSearchEngineStream, QueryModifier(QueryFinal))
                 return True
 
             elif "exit" in Queries:
@@ -172,8 +235,11 @@ def MainExecution():  # Fixed missing colon
                 Answer = Chatbot(QueryModifier(QueryFinal))
                 ShowTextToScreen(f"{Assistantname} : {Answer}")
                 SetAssistantStatus("Answering...")
-                TextToSpeech(Answer)  # Ensure this works correctly
+                TextToSpeech(Answer, priority=PRIORITY_URGENT, interrupt=True)  # Waits, the process exits next
                 SetAssistantStatus("Answering...")
+                get_conversation().flush()  # os._exit skips atexit handlers
+                get_memory().save()
+                get_search_index().save()
                 os._exit(1)
 
 def FirstThread():
@@ -184,30 +250,18 @@ def FirstThread():
             MainExecution()
 
         else:
-            AIStatus = GetAssistantStatus()
-            if "Available..." in AIStatus:
-                sleep(0.1)
-
-            else:
-                SetAssistantStatus("Available")
+            # Written once per transition, then sleep until the mic is toggled
+            SetAssistantStatus("Available...")
+            assistant_state.wait_for_mic(True)
 
 def SecondThread():
     GraphicalUserInterface()
 
-def test_speech(text):
-    """Test function to check if TextToSpeech works outside the main program flow."""
-    try:
-        print("Speaking now: ", text)
-        engine = pyttsx3.init()  # Ensure this is correctly initialized
-        engine.say(text)
-        engine.runAndWait()
-    except Exception as e:
-        print(f"Error in TextToSpeech: {e}")
-
 if __name__ == "__main__":
+    summarizer.start()  # Runs on its own daemon thread, never blocks the voice loop
+    PrewarmSpeechCache()  # Canned replies then play without a network round-trip
+    PrewarmSpeechRecognition()  # Chrome starts in the background while the GUI opens
+    threading.Thread(target=get_search_index, name="SearchIndexSync", daemon=True).start()
     thread2 = threading.Thread(target=FirstThread, daemon=True)
     thread2.start()
     SecondThread()
-
-    # Test TextToSpeech with a simple example
-    test_speech("Hello, I am speaking!")
@@ -1,9 +1,13 @@
 from googlesearch import search
 from groq import Groq
-from json import load, dump
 import os
 import datetime
 from dotenv import dotenv_values
+from backend.conversation import get_conversation
+from backend.context import ContextBuilder
+from backend.summarizer import get_summary_store
+from backend.chatbot import summarizer  # One summarizer folds turns from both answer paths
+from backend.streaming import iter_completion_text
 
 # Load environment variables
 env_vars = dotenv_values(".env")
@@ -25,14 +29,12 @@ System = f"""Hello, I am {Username}, You are a very accurate and advanced AI cha
 if not os.path.exists("Data"):
     os.makedirs("Data")
 
-# Load or initialize chat logs
-try:
-    with open(r"Data\ChatLog.json", "r") as f:
-        messages = load(f)
-except FileNotFoundError:
-    with open(r"Data\ChatLog.json", "w") as f:
-        dump([], f)
-    messages = []
+# Shared in-memory conversation, written behind to the chat log
+chat_log = get_conversation()
+
+# Keeps prompts inside the model's context window
+context_builder = ContextBuilder("llama3-70b-8192", max_tokens=1024)
+summary_store = get_summary_store()
 
 
 def GoogleSearch(query):
@@ -73,14 +75,11 @@ def Information():
     return data
 
 
-def RealtimeSearchEngine(prompt):
-    global messages
-
-    # Load chat log
-    with open(r"Data\ChatLog.json", "r") as f:
-        messages = load(f)
-    messages.append({"role": "user", "content": f"{prompt}"})
+def RealtimeSearchEngineStream(prompt, token=None):
+    """Yield the answer as it is generated; the turn is recorded once it is complete.
 
+    Cancelling `token` closes the Groq stream and skips recording the turn.
+    """
     # System chat setup
     SystemChatBot = [
         {"role": "system", "content": System},
@@ -89,34 +88,52 @@ def RealtimeSearchEngine(prompt):
     ]
 
     SystemChatBot.append({"role": "system", "content": GoogleSearch(prompt)})
-
-    # Completion request
-    completion = client.chat.completions.create(
-        model="llama3-70b-8192",
-        messages=SystemChatBot + [{"role": "system", "content": Information()}] + messages,
-        max_tokens=1024,
-        temperature=0.7,
-        top_p=1,
-        stream=False,
-        stop=None,
+    if token is not None and token.cancelled:
+        return
+
+    # Summary plus the newest history that fits the token budget
+    messages = context_builder.build(
+        SystemChatBot + [{"role": "system", "content": Information()}],
+        chat_log.iter_reverse(),
+        {"role": "user", "content": f"{prompt}"},
+        summary=summary_store.latest(),
     )
 
-    # Access content properly
+    # Completion request, streamed so the first words can be shown and spoken early
     try:
-        Answer = completion.choices[0].message.content
-    except AttributeError as e:
+        completion = client.chat.completions.create(
+            model=context_builder.model,
+            messages=messages,
+            max_tokens=1024,
+            temperature=0.7,
+            top_p=1,
+            stream=True,
+            stop=None,
+        )
+
+        Answer = ""
+        for text in iter_completion_text(completion, token):
+            Answer += text
+            yield text
+
+    except Exception as e:
         print("Error accessing response content:", e)
-        print("Completion object:", completion)
-        return "An error occurred while processing your query."
+        yield "An error occurred while processing your query."
+        return
+
+    if token is not None and token.cancelled:
+        return
 
     # Append to chat log
-    messages.append({"role": "assistant", "content": Answer})
+    chat_log.append_many([
+        {"role": "user", "content": f"{prompt}"},
+        {"role": "assistant", "content": Answer},
+    ])
+    summarizer.notify()
 
-    # Save chat log
-    with open(r"Data\ChatLog.json", "w") as f:
-        dump(messages, f, indent=4)
 
-    return AnswerModifier(Answer=Answer)
+def RealtimeSearchEngine(prompt):
+    return AnswerModifier(Answer="".join(RealtimeSearchEngineStream(prompt)))
 
 
 if __name__ == "__main__":
@@ -3,69 +3,363 @@ import random
 import asyncio
 import edge_tts
 import os
+import io
+import time
+import logging
+import queue
+import threading
+import itertools
+import concurrent.futures
 import dotenv
+import unicodedata
+from backend.cancel import CancelToken, Cancelled
+from backend.config import config
+from backend.disk_cache import DiskLRU
+from backend.streaming import SentencePipeline, SentenceSplitter
 
 # Load environment variables
 dotenv.load_dotenv(".env")
 AssistantVoice = os.getenv("AssistantVoice")  # Get the voice from .env
 
-async def TextToAudioFile(text) -> None:
-    file_path = r"Data\speech.mp3"
+END_OF_AUDIO = object()
+# How often playback re-checks func(); a cancelled token stops the mixer at once
+PLAYBACK_POLL_SECONDS = 0.01
+# A stalled edge_tts request gives up after this long instead of hanging the worker
+SYNTHESIS_TIMEOUT_SECONDS = 20
+# The microphone still hears the end of our own speech for a moment after it stops
+ECHO_TAIL_SECONDS = 1.0
 
-    # Delete existing audio file if it exists
-    if os.path.exists(file_path):
-        os.remove(file_path)
+# Lower numbers are spoken first; equal priorities keep their order
+PRIORITY_URGENT = 0
+PRIORITY_NORMAL = 1
+PRIORITY_LOW = 2
 
-    try:
-        # Convert text to speech and save as audio file
-        communicate = edge_tts.Communicate(text, AssistantVoice, pitch='+5Hz', rate='+1%')
-        await communicate.save(file_path)
-    except Exception as e:
-        raise RuntimeError(f"Failed to generate speech: {e}")
+class TTSEngine:
+    """edge_tts synthesis played from memory on a mixer that stays initialized"""
 
-def TTS(text, func=lambda r=None: True):
-    try:
-        # Run the async function to convert text to speech
-        asyncio.run(TextToAudioFile(text))
+    def __init__(self, voice=None, pitch='+5Hz', rate='+1%', cache=None):
+        self.voice = voice or AssistantVoice
+        self.pitch = pitch
+        self.rate = rate
+        self.playback_lock = threading.Lock()
+        # Repeated phrases are played from disk without a network round-trip
+        if cache is None:
+            cache = DiskLRU(config.TTS_CACHE_DIR, config.TTS_CACHE_MAX_MB * 1024 * 1024, suffix=".mp3")
+        self.cache = cache
+        # The event loop and the speech queue are started on first use
+        self.start_lock = threading.Lock()
+        self.loop = None
+        self.queue = None
+
+    def event_loop(self):
+        """One loop for every synthesis request instead of asyncio.run per sentence."""
+        with self.start_lock:
+            if self.loop is None:
+                self.loop = asyncio.new_event_loop()
+                threading.Thread(target=self.loop.run_forever, name="TTSLoop", daemon=True).start()
+            return self.loop
+
+    def speech_queue(self):
+        with self.start_lock:
+            if self.queue is None:
+                self.queue = SpeechQueue()
+            return self.queue
+
+    def cache_key(self, text):
+        text = " ".join(unicodedata.normalize("NFC", str(text)).split())
+        return f"{self.voice}\0{self.pitch}\0{self.rate}\0{text}"
+
+    async def synthesize_async(self, text):
+        # Collect the MP3 stream in memory instead of saving it to a file
+        communicate = edge_tts.Communicate(text, self.voice, pitch=self.pitch, rate=self.rate)
+        audio = bytearray()
+        async for chunk in communicate.stream():
+            if chunk["type"] == "audio":
+                audio += chunk["data"]
+        return bytes(audio)
+
+    def synthesize(self, text, token=None):
+        key = self.cache_key(text)
+        audio = self.cache.get_bytes(key)
+        if audio is not None:
+            return audio
+        future = asyncio.run_coroutine_threadsafe(self.synthesize_async(text), self.event_loop())
+        # Cancelling the token cancels the edge_tts request mid-flight
+        unregister = token.on_cancel(future.cancel) if token is not None else (lambda: None)
+        try:
+            audio = future.result(timeout=SYNTHESIS_TIMEOUT_SECONDS)
+        except concurrent.futures.CancelledError:
+            raise Cancelled()
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            logging.error(f"Speech synthesis timed out after {SYNTHESIS_TIMEOUT_SECONDS}s: {text[:60]!r}")
+            raise RuntimeError(f"Speech synthesis timed out after {SYNTHESIS_TIMEOUT_SECONDS}s")
+        except Exception as e:
+            raise RuntimeError(f"Failed to generate speech: {e}")
+        finally:
+            unregister()
+        if audio:
+            self.cache.put_bytes(key, audio)
+        return audio
+
+    def prewarm(self, texts):
+        """Synthesize into the cache, sentence by sentence as speak() would."""
+        for text in texts:
+            splitter = SentenceSplitter()
+            for sentence in splitter.feed(str(text)) + splitter.flush():
+                if self.cache_key(sentence) not in self.cache:
+                    try:
+                        self.synthesize(sentence)
+                    except RuntimeError as e:
+                        print(f"Could not pre-warm speech cache: {e}")
+                        return
+
+    def play_audio(self, audio, func=lambda r=None: True, token=None):
+        """Play MP3 bytes; returns False if func() or the token asked to stop."""
+        token = token or CancelToken()
+        with self.playback_lock:
+            # Initialized once and kept open between utterances
+            if not pygame.mixer.get_init():
+                pygame.mixer.init()
+            pygame.mixer.music.load(io.BytesIO(audio), "mp3")
+            pygame.mixer.music.play()
+            unregister = token.on_cancel(pygame.mixer.music.stop)
+
+            # Play the audio while checking if the function allows it to continue
+            try:
+                while pygame.mixer.music.get_busy():
+                    if not func() or token.cancelled:  # Check if the function indicates to stop
+                        pygame.mixer.music.stop()
+                        return False
+                    token.wait(PLAYBACK_POLL_SECONDS)
+                return not token.cancelled
+            finally:
+                unregister()
+
+    def open(self, func=lambda r=None: True, token=None, priority=PRIORITY_NORMAL, key=None, interrupt=False):
+        """Queue a new utterance for playback; add sentences to it, then finish() it."""
+        utterance = Utterance(self, func, token, key)
+        self.speech_queue().submit(utterance, priority, interrupt)
+        return utterance
+
+    def speak(self, text, func=lambda r=None: True, token=None, wait=True, **options):
+        utterance = self.open(func, token, **options)
+        splitter = SentenceSplitter()
+        for sentence in splitter.feed(str(text)) + splitter.flush():
+            utterance.add(sentence)
+        return utterance.finish(wait)
+
+class Utterance:
+    """Sentences in, audio out: sentence N+1 is synthesized while sentence N plays.
+
+    Synthesis starts as soon as sentences are added; playback happens when the
+    speech queue reaches this utterance.
+    """
+
+    def __init__(self, engine, func=lambda r=None: True, token=None, key=None):
+        self.engine = engine
+        self.func = func
+        self.key = key
+        # Own token, so one utterance can be dropped without cancelling the answer
+        self.token = CancelToken()
+        self.unlink = token.on_cancel(self.token.cancel) if token is not None else (lambda: None)
+        self.stopped = threading.Event()
+        self.done = threading.Event()
+        self.audio = queue.Queue()
+        self.synthesis = SentencePipeline(self._synthesize, name="TTSSynthesis",
+                                          on_close=lambda: self.audio.put(END_OF_AUDIO))
+        self.token.on_cancel(self._cancel)
+
+    def _cancel(self):
+        # Drop everything not yet spoken; playback and synthesis stop via the token
+        self.stopped.set()
+        self.synthesis.clear()
+        self.audio.put(END_OF_AUDIO)
+
+    def _synthesize(self, sentence):
+        if self.stopped.is_set():
+            return
+        try:
+            self.audio.put(self.engine.synthesize(sentence, self.token))
+        except Cancelled:
+            pass
+
+    def cancel(self):
+        self.token.cancel()
+
+    def play(self):
+        """Speak the audio as it is synthesized (runs on the speech queue's thread)."""
+        try:
+            while not self.stopped.is_set():
+                audio = self.audio.get()
+                if audio is END_OF_AUDIO:
+                    break
+                try:
+                    if not self.engine.play_audio(audio, self.func, self.token):
+                        self.stopped.set()
+                except Exception as e:
+                    print(f"Error in TTS: {e}")
+                    self.stopped.set()
+        finally:
+            self.unlink()
+            try:
+                self.func(False)
+            except Exception as stop_e:
+                print(f"Error in finally block: {stop_e}")
+            self.done.set()
 
-        # Initialize pygame mixer
-        pygame.mixer.init()
-        pygame.mixer.music.load(r"Data\speech.mp3")
-        pygame.mixer.music.play()
+    def add(self, sentence):
+        self.synthesis.put(sentence)
 
-        # Play the audio while checking if the function allows it to continue
-        while pygame.mixer.music.get_busy():
-            if not func():  # Check if the function indicates to stop
-                break
-            pygame.time.Clock().tick(10)
+    def finish(self, wait=True):
+        """No more sentences; with wait, block until spoken. False if playback was stopped."""
+        self.synthesis.close(wait=False)
+        if wait:
+            self.done.wait()
+        return not self.stopped.is_set()
 
-        return True
+class SpeechQueue:
+    """Plays utterances one at a time on a dedicated thread, most urgent first.
+
+    Callers hand over an utterance and carry on; interrupt() drops what is
+    playing and everything queued, and an utterance with a key replaces a
+    queued one with the same key that has not started yet.
+    """
+
+    def __init__(self):
+        self.queue = queue.PriorityQueue()
+        self.order = itertools.count()
+        self.lock = threading.Lock()
+        self.waiting = set()
+        self.current = None
+        self.quiet_since = 0.0
+        self.counts = {"queued": 0, "played": 0, "interrupted": 0, "coalesced": 0, "max_depth": 0}
+        threading.Thread(target=self._run, name="TTSWorker", daemon=True).start()
+
+    @property
+    def depth(self):
+        """Utterances waiting to be spoken, not counting the one playing."""
+        with self.lock:
+            return len(self.waiting)
+
+    def speaking(self, tail=0.0):
+        """True while an utterance is queued or playing, and for tail seconds after."""
+        with self.lock:
+            if self.current is not None or self.waiting:
+                return True
+            return time.monotonic() - self.quiet_since < tail
+
+    def stats(self):
+        with self.lock:
+            return dict(self.counts, depth=len(self.waiting), playing=self.current is not None)
+
+    def submit(self, utterance, priority=PRIORITY_NORMAL, interrupt=False):
+        if interrupt:
+            self.interrupt()
+        with self.lock:
+            if utterance.key is not None:
+                for other in [u for u in self.waiting if u.key == utterance.key]:
+                    other.cancel()
+                    self.waiting.discard(other)
+                    self.counts["coalesced"] += 1
+            self.waiting.add(utterance)
+            self.counts["queued"] += 1
+            self.counts["max_depth"] = max(self.counts["max_depth"], len(self.waiting))
+        self.queue.put((priority, next(self.order), utterance))
+
+    def interrupt(self):
+        """Stop the current utterance and drop every queued one."""
+        with self.lock:
+            dropped = list(self.waiting) + ([self.current] if self.current is not None else [])
+            self.waiting.clear()
+            self.counts["interrupted"] += len(dropped)
+        for utterance in dropped:
+            utterance.cancel()
+
+    def _run(self):
+        while True:
+            _, _, utterance = self.queue.get()
+            with self.lock:
+                self.waiting.discard(utterance)
+                self.current = utterance
+            utterance.play()  # Returns at once for a dropped utterance
+            with self.lock:
+                self.current = None
+                self.quiet_since = time.monotonic()
+                if not utterance.stopped.is_set():
+                    self.counts["played"] += 1
+
+# One engine per process, so the mixer is set up only once
+tts_engine = TTSEngine()
+
+def TTS(text, func=lambda r=None: True, token=None, wait=True, **options):
+    try:
+        return tts_engine.speak(text, func, token, wait, **options)
 
     except Exception as e:
         print(f"Error in TTS: {e}")
 
-    finally:
-        # Ensure pygame mixer is properly stopped and quit
-        try:
-            pygame.mixer.music.stop()
-            pygame.mixer.quit()
-            func(False)
-        except Exception as stop_e:
-            print(f"Error in finally block: {stop_e}")
-
-def TextToSpeech(Text, func=lambda r=None: True):
-    Data = str(Text).split(".")
-    responses = [
-        "The rest of the result has been printed to the chat screen, kindly check it out sir.",
-        "The rest of the text is now on the chat screen, sir, please check it.",
-        "You can see the rest of the text on the chat screen, sir.",
-        # Additional responses...
-    ]
-
-    if len(Data) > 4 and len(Text) > 250:
-        TTS("".join(Text.split(".")[0:2]) + "." + random.choice(responses), func)
+def InterruptSpeech():
+    tts_engine.speech_queue().interrupt()
+
+def SpeechQueueDepth():
+    return tts_engine.speech_queue().depth
+
+def IsSpeaking(tail=ECHO_TAIL_SECONDS):
+    # Whatever the mic hears now is likely our own voice
+    return tts_engine.speech_queue().speaking(tail)
+
+# Spoken instead of the rest of a long answer
+responses = [
+    "The rest of the result has been printed to the chat screen, kindly check it out sir.",
+    "The rest of the text is now on the chat screen, sir, please check it.",
+    "You can see the rest of the text on the chat screen, sir.",
+    # Additional responses...
+]
+
+# Warms the audio cache for the canned phrases in the background at startup
+def PrewarmSpeechCache(extra=()):
+    threading.Thread(target=tts_engine.prewarm, args=(list(responses) + list(extra),),
+                     name="TTSPrewarm", daemon=True).start()
+
+def IsLongAnswer(Text):
+    return len(str(Text).split(".")) > 4 and len(Text) > 250
+
+def TextToSpeech(Text, func=lambda r=None: True, token=None, wait=True, **options):
+    if IsLongAnswer(Text):
+        TTS("".join(Text.split(".")[0:2]) + "." + random.choice(responses), func, token, wait, **options)
     else:
-        TTS(Text, func)
+        TTS(Text, func, token, wait, **options)
+
+class StreamingTextToSpeech:
+    """Speaks an answer sentence by sentence while it is still being generated.
+
+    Like TextToSpeech, a long answer is cut short after its first two sentences
+    with one of the `responses` lines; shorter answers are spoken in full.
+    """
+
+    def __init__(self, func=lambda r=None: True, token=None, **options):
+        self.utterance = tts_engine.open(func, token, **options)
+        self.spoken = 0
+        self.held = []
+
+    def add(self, sentence):
+        # The first two sentences are spoken in any case; later ones wait
+        # until the answer's length is known
+        if self.spoken < 2:
+            self.utterance.add(sentence)
+            self.spoken += 1
+        else:
+            self.held.append(sentence)
+
+    def finish(self, Text, wait=True):
+        """Queue the rest for the complete answer; with wait, block until it has been spoken."""
+        if IsLongAnswer(Text):
+            self.utterance.add(random.choice(responses))
+        else:
+            for sentence in self.held:
+                self.utterance.add(sentence)
+        return self.utterance.finish(wait)
 
 if __name__ == "__main__":
     while True:
@@ -0,0 +1,102 @@
+"""
+Assistant mic/status state for JARVIS AI Assistant
+
+``AssistantState`` holds the microphone flag and the assistant status line.
+Writes are published on the event bus only when the value actually changes
+(repeats are counted as suppressed), and the control loop can block on
+``wait_for_mic`` instead of polling until the user toggles the microphone.
+"""
+import logging
+import threading
+from typing import Any, Dict, Optional
+
+from .events import ASSISTANT_STATUS, MIC_STATUS, EventBus, get_event_bus
+
+logger = logging.getLogger(__name__)
+
+
+def _as_mic_flag(value: Any) -> bool:
+    return str(value).strip().lower() == "true"
+
+
+class AssistantState:
+    """Microphone and status state with wait/notify semantics"""
+
+    def __init__(self, bus: Optional[EventBus] = None):
+        self.bus = bus or get_event_bus()
+        self._cond = threading.Condition()
+        self._mic = _as_mic_flag(self.bus.latest(MIC_STATUS, "False"))
+        self._status = str(self.bus.latest(ASSISTANT_STATUS, ""))
+        self._counters = {
+            "status_changes": 0,
+            "status_suppressed": 0,
+            "mic_changes": 0,
+            "mic_suppressed": 0,
+        }
+        # Values published directly on the bus (e.g. by the speech scripts)
+        # still update the state and wake waiters
+        self.bus.subscribe(MIC_STATUS, self._on_event)
+        self.bus.subscribe(ASSISTANT_STATUS, self._on_event)
+
+    def _on_event(self, topic: str, value: Any) -> None:
+        with self._cond:
+            if topic == MIC_STATUS:
+                self._mic = _as_mic_flag(value)
+            else:
+                self._status = str(value)
+            self._cond.notify_all()
+
+    @property
+    def mic(self) -> bool:
+        return self._mic
+
+    @property
+    def status(self) -> str:
+        return self._status
+
+    def counters(self) -> Dict[str, int]:
+        """Transition and suppressed-write counts since startup"""
+        with self._cond:
+            return dict(self._counters)
+
+    def set_mic(self, enabled: bool) -> bool:
+        """Set the microphone flag; return True if it changed"""
+        enabled = _as_mic_flag(enabled)
+        with self._cond:
+            if enabled == self._mic:
+                self._counters["mic_suppressed"] += 1
+                return False
+            self._mic = enabled
+            self._counters["mic_changes"] += 1
+            self._cond.notify_all()
+        self.bus.publish(MIC_STATUS, str(enabled))
+        return True
+
+    def set_status(self, status: str) -> bool:
+        """Set the status line; return True if it changed"""
+        with self._cond:
+            if status == self._status:
+                self._counters["status_suppressed"] += 1
+                return False
+            self._status = status
+            self._counters["status_changes"] += 1
+        self.bus.publish(ASSISTANT_STATUS, status)
+        return True
+
+    def wait_for_mic(self, enabled: bool = True, timeout: Optional[float] = None) -> bool:
+        """Block until the microphone flag equals ``enabled``; False on timeout"""
+        with self._cond:
+            return self._cond.wait_for(lambda: self._mic == enabled, timeout)
+
+
+_assistant_state: Optional[AssistantState] = None
+_assistant_state_lock = threading.Lock()
+
+
+def get_assistant_state() -> AssistantState:
+    """Return the process-wide assistant state, creating it on first use"""
+    global _assistant_state
+    with _assistant_state_lock:
+        if _assistant_state is None:
+            _assistant_state = AssistantState()
+        return _assistant_state
@@ -0,0 +1,175 @@
+"""
+Lazy headless Chrome for JARVIS AI Assistant
+
+The speech recognizer runs in headless Chrome driven by Selenium. Starting it
+used to happen at import time: ``ChromeDriverManager().install()`` checks the
+network for a matching driver, then Chrome is launched, so every import of
+Main.py paid seconds before anything else ran. ``LazyBrowser`` creates the
+driver on first use (or on a background thread via ``prewarm``), and the
+resolved chromedriver path is cached in ``CHROMEDRIVER_CACHE_FILE`` so later
+starts skip the driver manager entirely.
+
+Measure startup with a cold and a warm cache with::
+
+    python -m backend.browser --cold
+"""
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from .config import config
+
+logger = logging.getLogger(__name__)
+
+USER_AGENT = ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+              "(KHTML, like Gecko) Chrome/89.8.142.06 Safari/537.36")
+
+
+def _read_cached_path() -> Optional[str]:
+    try:
+        with open(config.CHROMEDRIVER_CACHE_FILE, "r", encoding="utf-8") as f:
+            path = json.load(f).get("path")
+    except (OSError, ValueError, AttributeError):
+        return None
+    return path if path and os.path.isfile(path) else None
+
+
+def _write_cached_path(path: str) -> None:
+    tmp_path = f"{config.CHROMEDRIVER_CACHE_FILE}.part"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"path": path, "resolved_at": time.time()}, f)
+    os.replace(tmp_path, config.CHROMEDRIVER_CACHE_FILE)
+
+
+def clear_driver_cache() -> None:
+    try:
+        os.unlink(config.CHROMEDRIVER_CACHE_FILE)
+    except FileNotFoundError:
+        pass
+
+
+def resolve_driver_path(refresh: bool = False) -> str:
+    """Path of a chromedriver matching the installed Chrome, cached on disk"""
+    if not refresh:
+        path = _read_cached_path()
+        if path is not None:
+            return path
+    from webdriver_manager.chrome import ChromeDriverManager
+
+    started = time.perf_counter()
+    path = ChromeDriverManager().install()
+    logger.info(f"Resolved chromedriver in {time.perf_counter() - started:.2f}s: {path}")
+    _write_cached_path(path)
+    return path
+
+
+def chrome_options(headless: bool = True) -> Any:
+    from selenium.webdriver.chrome.options import Options
+
+    options = Options()
+    options.add_argument(f"user-agent={USER_AGENT}")
+    options.add_argument("--use-fake-ui-for-media-stream")
+    if headless:
+        options.add_argument("--headless=new")
+    return options
+
+
+class LazyBrowser:
+    """Chrome WebDriver created on first ``get()`` and reused afterwards"""
+
+    def __init__(self, headless: bool = True):
+        self.headless = headless
+        self._driver = None
+        self._lock = threading.Lock()
+        self.timings: Dict[str, float] = {}
+
+    def _launch(self, driver_path: str) -> Any:
+        from selenium import webdriver
+        from selenium.webdriver.chrome.service import Service
+
+        return webdriver.Chrome(service=Service(driver_path), options=chrome_options(self.headless))
+
+    def get(self) -> Any:
+        """Return the driver, starting Chrome if this is the first call"""
+        with self._lock:
+            if self._driver is not None:
+                return self._driver
+            started = time.perf_counter()
+            cached = _read_cached_path() is not None
+            driver_path = resolve_driver_path()
+            resolved = time.perf_counter()
+            try:
+                self._driver = self._launch(driver_path)
+            except Exception as e:
+                if not cached:
+                    raise
+                # Chrome may have updated past the cached driver; resolve again once
+                logger.warning(f"Cached chromedriver failed to start ({e}), resolving again")
+                driver_path = resolve_driver_path(refresh=True)
+                resolved = time.perf_counter()
+                self._driver = self._launch(driver_path)
+            launched = time.perf_counter()
+            self.timings = {"resolve_seconds": resolved - started, "launch_seconds": launched - resolved,
+                            "total_seconds": launched - started, "cached_path": float(cached)}
+            logger.info(f"Chrome started in {launched - started:.2f}s "
+                        f"(driver path {'cached' if cached else 'resolved'} in {resolved - started:.2f}s)")
+            return self._driver
+
+    def prewarm(self) -> threading.Thread:
+        """Start Chrome on a background thread so the first ``get()`` does not wait"""
+        def warm() -> None:
+            try:
+                self.get()
+            except Exception as e:
+                logger.error(f"Could not start Chrome: {e}")
+
+        thread = threading.Thread(target=warm, name="BrowserPrewarm", daemon=True)
+        thread.start()
+        return thread
+
+    @property
+    def started(self) -> bool:
+        return self._driver is not None
+
+    def quit(self) -> None:
+        with self._lock:
+            if self._driver is not None:
+                self._driver.quit()
+                self._driver = None
+
+
+_recognizer_browser: Optional[LazyBrowser] = None
+_recognizer_browser_lock = threading.Lock()
+
+
+def get_recognizer_browser() -> LazyBrowser:
+    """Return the shared browser used for speech recognition (not started yet)"""
+    global _recognizer_browser
+    with _recognizer_browser_lock:
+        if _recognizer_browser is None:
+            _recognizer_browser = LazyBrowser()
+        return _recognizer_browser
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Measure headless Chrome startup")
+    parser.add_argument("--cold", action="store_true", help="Drop the cached driver path first")
+    parser.add_argument("--runs", type=int, default=2, help="Starts to measure (the first may be cold)")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+    started = time.perf_counter()
+    from selenium import webdriver  # noqa: F401  (import cost is part of startup)
+    print(f"import_seconds: {time.perf_counter() - started:.2f}")
+    if args.cold:
+        clear_driver_cache()
+    for run in range(args.runs):
+        browser = LazyBrowser()
+        browser.get()
+        browser.quit()
+        print(f"run {run + 1}: " + ", ".join(f"{key}={value:.2f}" for key, value in browser.timings.items()))
@@ -0,0 +1,70 @@
+"""
+Cooperative cancellation for JARVIS AI Assistant
+
+A ``CancelToken`` is created for each answer and passed down to the LLM
+stream, speech synthesis and playback. Cancelling it (e.g. when the user
+toggles the microphone to barge in) sets an event that loops check between
+steps and runs registered callbacks right away, so blocking work such as an
+open HTTP stream or the audio mixer can be torn down without waiting for
+the next poll.
+"""
+import logging
+import threading
+from typing import Callable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class Cancelled(Exception):
+    """Raised by ``CancelToken.raise_if_cancelled``"""
+
+
+class CancelToken:
+    """One-shot cancellation signal with callbacks"""
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._callbacks: List[Callable[[], None]] = []
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def cancel(self) -> None:
+        """Cancel once; callbacks run on the calling thread"""
+        with self._lock:
+            if self._event.is_set():
+                return
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                logger.warning(f"Cancel callback {callback!r} failed: {e}")
+
+    def on_cancel(self, callback: Callable[[], None]) -> Callable[[], None]:
+        """Run ``callback`` on cancellation (now, if already cancelled); return an unregister function"""
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+
+                def unregister() -> None:
+                    with self._lock:
+                        try:
+                            self._callbacks.remove(callback)
+                        except ValueError:
+                            pass
+
+                return unregister
+        callback()
+        return lambda: None
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Sleep up to ``timeout`` seconds, waking early on cancellation; True if cancelled"""
+        return self._event.wait(timeout)
+
+    def raise_if_cancelled(self) -> None:
+        if self._event.is_set():
+            raise Cancelled()
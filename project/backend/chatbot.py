@@ -1,7 +1,12 @@
 from groq import Groq
-from json import load, dump
 import datetime
 from dotenv import dotenv_values
+from backend.config import config
+from backend.conversation import get_conversation
+from backend.context import ContextBuilder
+from backend.summarizer import HistorySummarizer, get_summary_store, groq_summarizer
+from backend.memory import get_memory
+from backend.streaming import iter_completion_text
 
 # Load environment variables
 env_vars = dotenv_values(".env")
@@ -21,8 +26,6 @@ if not GroqAPIKey:
 # Instantiate Groq client
 client = Groq(api_key=GroqAPIKey)
 
-messages = []
-
 # System message and preamble
 System = f"""Hello, I am {Username}, You are a very accurate and advanced AI chatbot named {Assistantname} which also has real-time up-to-date information from the internet.
 *** Do not tell time until I ask, do not talk too much, just answer the question.***
@@ -32,13 +35,18 @@ System = f"""Hello, I am {Username}, You are a very accurate and advanced AI cha
 
 SystemChatBot = [{"role": "system", "content": System}]
 
-# Try to load the chat log, create if not found
-try:
-    with open(r"Data\ChatLog.json", "r") as f:
-        messages = load(f)
-except FileNotFoundError:
-    with open(r"Data\ChatLog.json", "w") as f:
-        dump([], f)
+# Shared in-memory conversation, written behind to the chat log
+chat_log = get_conversation()
+
+# Keeps prompts inside the model's context window
+context_builder = ContextBuilder("llama3-70b-8192", max_tokens=1024)
+
+# Folds old turns into a rolling summary (started by Main.py)
+summary_store = get_summary_store()
+summarizer = HistorySummarizer(chat_log, groq_summarizer(client), summary_store)
+
+# Local vector index over past turns, kept up to date as turns are appended
+memory = get_memory(chat_log)
 
 # Function to fetch real-time information
 def RealtimeInformation():
@@ -62,25 +70,34 @@ def AnswerModifier(Answer):
     non_empty_lines = [line for line in line if line.strip()]
     return non_empty_lines
 
-# Main chatbot function
-def Chatbot(query):
-    """This function sends the user's query to the chatbot and returns the AI's response."""
+# Streaming chatbot: yields the answer as Groq generates it
+def ChatbotStream(query, token=None):
+    """Yield the AI's response to the user's query piece by piece; the turn is recorded once it is complete.
+
+    Cancelling `token` closes the Groq stream and skips recording the turn.
+    """
     
-    # Load previous messages
     try:
-        with open(r"Data\ChatLog.json", "r") as f:
-            messages = load(f)
-
-        # Append user message to chat history
-        messages.append({"role": "user", "content": f"{query}"})
-
         # Fetch real-time information
         real_time_info = RealtimeInformation()
 
+        # Earlier turns most relevant to this query
+        hits = memory.search(query, k=config.MEMORY_TOP_K)
+        retrieved = chat_log.get_many([hit["id"] for hit in hits])
+
+        # Summary, relevant turns and the newest history that fit the token budget
+        messages = context_builder.build(
+            SystemChatBot + [{"role": "system", "content": real_time_info}],
+            chat_log.iter_reverse(),
+            {"role": "user", "content": f"{query}"},
+            summary=summary_store.latest(),
+            retrieved=retrieved,
+        )
+
         # Call Groq API for response
         completion = client.chat.completions.create(
-            model="llama3-70b-8192",
-            messages=SystemChatBot + [{"role": "system", "content": real_time_info}] + messages,
+            model=context_builder.model,
+            messages=messages,
             max_tokens=1024,
             temperature=0.7,
             top_p=1,
@@ -90,27 +107,33 @@ def Chatbot(query):
 
         Answer = ""
 
-        # Process the streamed response
-        for chunk in completion:
-            if hasattr(chunk, 'choices') and chunk.choices:
-                choice = chunk.choices[0]
-                if hasattr(choice, 'delta') and hasattr(choice.delta, 'content') and choice.delta.content:
-                    Answer += choice.delta.content
+        # Pass each piece on as soon as it arrives
+        for text in iter_completion_text(completion, token):
+            text = text.replace("</s>", "")
+            Answer += text
+            yield text
 
-        # Clean the answer
-        Answer = Answer.replace("</s>", "").strip()
+    except Exception as e:
+        yield f"Error: {e}"
+        return
 
-        # Append AI's answer to the messages
-        messages.append({"role": "assistant", "content": Answer})
+    if token is not None and token.cancelled:
+        return
 
-        # Save the updated chat log
-        with open(r"Data\ChatLog.json", "w") as f:
-            dump(messages, f, indent=4)
+    # Clean the answer
+    Answer = Answer.strip()
 
-        return Answer
-    
-    except Exception as e:
-        return f"Error: {e}"
+    # Record the turn in the chat log
+    chat_log.append_many([
+        {"role": "user", "content": f"{query}"},
+        {"role": "assistant", "content": Answer},
+    ])
+    summarizer.notify()
+
+# Main chatbot function
+def Chatbot(query):
+    """This function sends the user's query to the chatbot and returns the AI's response."""
+    return "".join(ChatbotStream(query)).strip()
 
 # Main loop to take input from the user
 if __name__ == "__main__":
@@ -0,0 +1,672 @@
+"""
+Append-only chat log storage for JARVIS AI Assistant
+
+The history is kept as a series of JSONL segment files. Each segment has a
+binary sidecar index of ``(turn id, byte offset)`` pairs so any turn can be
+read with a single seek, and a small manifest lists the live segments in
+order. Recording a turn appends one line and one index entry, so the cost of
+a write does not depend on how long the history is.
+
+Older sealed segments move to a cold tier: their lines are packed into
+zlib-compressed blocks with a sparse block index, and a block is only
+decompressed when a reader touches a turn inside it.
+"""
+import json
+import logging
+import os
+import struct
+import threading
+import zlib
+from array import array
+from collections import OrderedDict
+from bisect import bisect_right
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from .config import config
+from .listeners import TurnListener, TurnListenerMixin
+from .message import Message, decode_messages, encode_messages
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = "manifest.json"
+INDEX_ENTRY = struct.Struct("<qq")
+
+COLD_SUFFIX = ".jz"
+COLD_INDEX_SUFFIX = ".cidx"
+# Cold index: block count, then (first id, offset, compressed length, turns)
+# per block, then the zlib-compressed array of every turn id in the segment.
+# Blocks hold ``encode_messages`` batches (older stores may hold JSONL lines).
+COLD_HEADER = struct.Struct("<I")
+COLD_BLOCK = struct.Struct("<qqii")
+COLD_BLOCK_TURNS = 256
+COLD_CACHE_BLOCKS = 64
+
+
+def atomic_write_json(path: Path, data: Any) -> None:
+    """Write JSON to ``path`` through a temp file and an atomic rename"""
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class _Segment:
+    """One JSONL segment file and its in-memory offset index"""
+
+    def __init__(self, directory: Path, name: str):
+        self.name = name
+        self.path = directory / name
+        self.index_path = self.path.with_suffix(".idx")
+        self.ids = array("q")
+        self.offsets = array("q")
+        self.size = 0
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def load(self) -> None:
+        """Load the sidecar index, rebuilding it if it is out of step"""
+        self.size = self.path.stat().st_size if self.path.exists() else 0
+        if self.index_path.exists():
+            raw = self.index_path.read_bytes()
+            usable = len(raw) - len(raw) % INDEX_ENTRY.size
+            for turn_id, offset in INDEX_ENTRY.iter_unpack(raw[:usable]):
+                self.ids.append(turn_id)
+                self.offsets.append(offset)
+        if not self._index_matches_data():
+            logger.warning(f"Rebuilding chat log index for {self.name}")
+            self.rebuild_index()
+
+    def _index_matches_data(self) -> bool:
+        if not self.offsets:
+            return self.size == 0
+        with open(self.path, "rb") as f:
+            f.seek(self.offsets[-1])
+            line = f.readline()
+            return line.endswith(b"\n") and f.tell() == self.size
+
+    def rebuild_index(self) -> None:
+        """Rescan the segment, dropping a torn trailing line if present"""
+        self.ids = array("q")
+        self.offsets = array("q")
+        offset = 0
+        with open(self.path, "rb") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break
+                self.ids.append(int(record["id"]))
+                self.offsets.append(offset)
+                offset += len(line)
+        if offset != self.size:
+            with open(self.path, "r+b") as f:
+                f.truncate(offset)
+            self.size = offset
+        with open(self.index_path, "wb") as f:
+            for turn_id, entry_offset in zip(self.ids, self.offsets):
+                f.write(INDEX_ENTRY.pack(turn_id, entry_offset))
+
+    def read(self, start: int, stop: int) -> List[Dict[str, Any]]:
+        """Read records ``start:stop`` (positions within this segment)"""
+        if start >= stop:
+            return []
+        records = []
+        with open(self.path, "rb") as f:
+            f.seek(self.offsets[start])
+            for _ in range(stop - start):
+                records.append(Message.from_dict(json.loads(f.readline())))
+        return records
+
+    def files(self) -> List[Path]:
+        return [self.path, self.index_path]
+
+    def unlink(self) -> None:
+        for path in self.files():
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+
+
+class _BlockCache:
+    """Small LRU of decoded cold blocks, shared by a store's segments"""
+
+    def __init__(self, max_blocks: int = COLD_CACHE_BLOCKS):
+        self.max_blocks = max_blocks
+        self._blocks: "OrderedDict[Tuple[str, int], List[Message]]" = OrderedDict()
+
+    def get(self, key: Tuple[str, int]) -> Optional[List[Message]]:
+        records = self._blocks.get(key)
+        if records is not None:
+            self._blocks.move_to_end(key)
+        return records
+
+    def put(self, key: Tuple[str, int], records: List[Message]) -> None:
+        self._blocks[key] = records
+        if len(self._blocks) > self.max_blocks:
+            self._blocks.popitem(last=False)
+
+    def discard(self, name: str) -> None:
+        for key in [key for key in self._blocks if key[0] == name]:
+            del self._blocks[key]
+
+
+class _ColdSegment:
+    """A sealed segment stored as zlib-compressed blocks of encoded turns"""
+
+    def __init__(self, directory: Path, name: str, cache: _BlockCache):
+        self.name = name
+        self.path = directory / name
+        self.index_path = self.path.with_suffix(COLD_INDEX_SUFFIX)
+        self.ids = array("q")
+        self.blocks: List[Tuple[int, int, int, int]] = []
+        self.block_starts: List[int] = []
+        self.size = 0
+        self._cache = cache
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def _set_blocks(self, blocks: List[Tuple[int, int, int, int]]) -> None:
+        self.blocks = blocks
+        self.block_starts = []
+        total = 0
+        for block in blocks:
+            self.block_starts.append(total)
+            total += block[3]
+        self.size = sum(block[2] for block in blocks)
+
+    def load(self) -> None:
+        raw = self.index_path.read_bytes()
+        (block_count,) = COLD_HEADER.unpack_from(raw)
+        end = COLD_HEADER.size + block_count * COLD_BLOCK.size
+        self._set_blocks([COLD_BLOCK.unpack_from(raw, offset)
+                          for offset in range(COLD_HEADER.size, end, COLD_BLOCK.size)])
+        self.ids = array("q", zlib.decompress(raw[end:]))
+
+    @classmethod
+    def freeze(cls, segment: _Segment, cache: _BlockCache) -> "_ColdSegment":
+        """Compress a sealed hot segment into a new cold segment"""
+        cold = cls(segment.path.parent, segment.path.with_suffix(COLD_SUFFIX).name, cache)
+        data = segment.path.read_bytes()[:segment.size]
+        blocks = []
+        tmp_path = cold.path.with_suffix(COLD_SUFFIX + ".tmp")
+        with open(tmp_path, "wb") as f:
+            for first in range(0, len(segment), COLD_BLOCK_TURNS):
+                last = min(first + COLD_BLOCK_TURNS, len(segment))
+                stop = segment.offsets[last] if last < len(segment) else len(data)
+                lines = data[segment.offsets[first]:stop].splitlines()
+                compressed = zlib.compress(encode_messages(json.loads(line) for line in lines), 6)
+                blocks.append((segment.ids[first], f.tell(), len(compressed), last - first))
+                f.write(compressed)
+            f.flush()
+            os.fsync(f.fileno())
+        tmp_index = cold.index_path.with_suffix(COLD_INDEX_SUFFIX + ".tmp")
+        with open(tmp_index, "wb") as f:
+            f.write(COLD_HEADER.pack(len(blocks)))
+            for block in blocks:
+                f.write(COLD_BLOCK.pack(*block))
+            f.write(zlib.compress(segment.ids.tobytes()))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, cold.path)
+        os.replace(tmp_index, cold.index_path)
+        cold.ids = array("q", segment.ids)
+        cold._set_blocks(blocks)
+        return cold
+
+    def _records(self, block_no: int) -> List[Message]:
+        key = (self.name, block_no)
+        records = self._cache.get(key)
+        if records is None:
+            _, offset, length, _ = self.blocks[block_no]
+            with open(self.path, "rb") as f:
+                f.seek(offset)
+                payload = zlib.decompress(f.read(length))
+            if payload.startswith(b"{"):
+                records = [Message.from_dict(json.loads(line)) for line in payload.splitlines()]
+            else:
+                records = decode_messages(payload)
+            self._cache.put(key, records)
+        return records
+
+    def read(self, start: int, stop: int) -> List[Dict[str, Any]]:
+        """Read records ``start:stop``, decompressing only the blocks touched"""
+        records = []
+        block_no = bisect_right(self.block_starts, start) - 1
+        while start < stop:
+            block_start = self.block_starts[block_no]
+            block_stop = min(stop - block_start, self.blocks[block_no][3])
+            records.extend(self._records(block_no)[start - block_start:block_stop])
+            start = block_start + block_stop
+            block_no += 1
+        return records
+
+    def files(self) -> List[Path]:
+        return [self.path, self.index_path]
+
+    def unlink(self) -> None:
+        self._cache.discard(self.name)
+        for path in self.files():
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+
+
+class ChatLogStore(TurnListenerMixin):
+    """Segmented append-only chat log with an offset index"""
+
+    def __init__(self, directory: Optional[Union[str, Path]] = None,
+                 segment_bytes: Optional[int] = None,
+                 legacy_file: Optional[Union[str, Path]] = None,
+                 hot_segments: Optional[int] = None):
+        self.directory = Path(directory or config.CHAT_LOG_DIR)
+        self.segment_bytes = segment_bytes or config.CHAT_LOG_SEGMENT_BYTES
+        self.legacy_file = Path(legacy_file or config.CHAT_LOG_FILE)
+        # Segments kept as plain JSONL (including the active one); 0 disables the cold tier
+        self.hot_segments = config.CHAT_LOG_HOT_SEGMENTS if hot_segments is None else hot_segments
+        self._block_cache = _BlockCache()
+        self._lock = threading.RLock()
+        self._segments: List[Union[_Segment, _ColdSegment]] = []
+        self._starts: List[int] = []
+        self._count = 0
+        self._last_id = 0
+        self._next_segment = 1
+        self._id_floor = 0
+        self._data_handle = None
+        self._index_handle = None
+        self._listeners: List[TurnListener] = []
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._open()
+
+    # ------------------------------------------------------------------
+    # Setup
+    # ------------------------------------------------------------------
+    def _open(self) -> None:
+        manifest_path = self.directory / MANIFEST_NAME
+        if manifest_path.exists():
+            with open(manifest_path, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+            self._next_segment = manifest["next_segment"]
+            self._id_floor = manifest.get("last_id", 0)
+            for name in manifest["segments"]:
+                if name.endswith(COLD_SUFFIX):
+                    segment = _ColdSegment(self.directory, name, self._block_cache)
+                else:
+                    segment = _Segment(self.directory, name)
+                segment.load()
+                self._segments.append(segment)
+            self._remove_orphans()
+            self._reindex()
+            self._freeze_cold()
+        else:
+            self._roll_segment()
+            self._import_legacy()
+
+    def _remove_orphans(self) -> None:
+        """Delete segment files left behind by an interrupted compaction or freeze"""
+        live = {path.name for segment in self._segments for path in segment.files()}
+        for path in self.directory.glob("segment-*"):
+            if path.name not in live:
+                logger.info(f"Removing orphaned chat log file: {path.name}")
+                path.unlink()
+
+    def _import_legacy(self) -> None:
+        """Import an existing ChatLog.json once, when the store is created"""
+        if not self.legacy_file.exists():
+            return
+        try:
+            with open(self.legacy_file, "r", encoding="utf-8") as f:
+                messages = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not import legacy chat log {self.legacy_file}: {e}")
+            return
+        if messages:
+            self.append_many(messages)
+            logger.info(f"Imported {len(messages)} turns from {self.legacy_file}")
+
+    def _reindex(self) -> None:
+        self._starts = []
+        total = 0
+        for segment in self._segments:
+            self._starts.append(total)
+            total += len(segment)
+        self._count = total
+        self._last_id = self._id_floor
+        for segment in reversed(self._segments):
+            if segment.ids:
+                self._last_id = max(self._last_id, segment.ids[-1])
+                break
+
+    def _write_manifest(self) -> None:
+        atomic_write_json(self.directory / MANIFEST_NAME, {
+            "segments": [segment.name for segment in self._segments],
+            "next_segment": self._next_segment,
+            "last_id": max(self._last_id, self._id_floor),
+        })
+
+    def _close_handles(self) -> None:
+        for handle in (self._data_handle, self._index_handle):
+            if handle is not None:
+                handle.close()
+        self._data_handle = None
+        self._index_handle = None
+
+    def _new_segment_name(self) -> str:
+        name = f"segment-{self._next_segment:06d}.jsonl"
+        self._next_segment += 1
+        return name
+
+    def _roll_segment(self) -> None:
+        """Seal the active segment and start a new one"""
+        self._close_handles()
+        segment = _Segment(self.directory, self._new_segment_name())
+        segment.path.touch()
+        segment.index_path.touch()
+        self._segments.append(segment)
+        self._starts.append(self._count)
+        self._write_manifest()
+        self._freeze_cold()
+
+    def _freeze_cold(self) -> None:
+        """Move sealed segments beyond the hot window to the cold tier"""
+        if self.hot_segments <= 0:
+            return
+        frozen = []
+        for seg_no, segment in enumerate(self._segments[:-self.hot_segments]):
+            if isinstance(segment, _Segment) and len(segment):
+                self._segments[seg_no] = _ColdSegment.freeze(segment, self._block_cache)
+                frozen.append(segment)
+        if frozen:
+            self._write_manifest()
+            for segment in frozen:
+                segment.unlink()
+            logger.info(f"Moved {len(frozen)} chat log segment(s) to cold storage")
+
+    def _active(self) -> _Segment:
+        segment = self._segments[-1]
+        if self._data_handle is None:
+            self._data_handle = open(segment.path, "ab")
+            self._index_handle = open(segment.index_path, "ab")
+        return segment
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+    def _write(self, message: Dict[str, Any]) -> Message:
+        turn_id = message.get("id") or self._last_id + 1
+        if turn_id <= self._last_id:
+            raise ValueError(f"Turn id {turn_id} must be greater than {self._last_id}")
+        segment = self._active()
+        record = Message(turn_id, message["role"], message.get("content", ""), message.get("timestamp"))
+        line = (record.to_json() + "\n").encode("utf-8")
+        offset = segment.size
+        self._data_handle.write(line)
+        self._index_handle.write(INDEX_ENTRY.pack(record["id"], offset))
+        segment.ids.append(record["id"])
+        segment.offsets.append(offset)
+        segment.size += len(line)
+        self._count += 1
+        self._last_id = record["id"]
+        return record
+
+    def _flush(self) -> None:
+        if self._data_handle is None:
+            # Nothing written since the last roll
+            return
+        self._data_handle.flush()
+        self._index_handle.flush()
+        if self._segments[-1].size >= self.segment_bytes:
+            self._roll_segment()
+
+    def append(self, role: str, content: str,
+               timestamp: Optional[str] = None) -> Dict[str, Any]:
+        """Append a single turn and return the stored record"""
+        with self._lock:
+            record = self._write({"role": role, "content": content, "timestamp": timestamp})
+            self._flush()
+        self._notify([record])
+        return record
+
+    def append_many(self, messages: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Append several turns with one flush
+
+        Messages may carry an ``id`` (it must be greater than ``last_id``);
+        otherwise the next id is assigned.
+        """
+        with self._lock:
+            records = []
+            for message in messages:
+                records.append(self._write(message))
+                if self._segments[-1].size >= self.segment_bytes:
+                    self._flush()
+            if records:
+                self._flush()
+        if records:
+            self._notify(records)
+        return records
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def last_id(self) -> int:
+        """Id of the most recently written turn (0 when empty)"""
+        return self._last_id
+
+    def read_range(self, start: int, stop: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Read turns by position, like ``history[start:stop]``"""
+        with self._lock:
+            start, stop, _ = slice(start, stop).indices(self._count)
+            records: List[Dict[str, Any]] = []
+            if start >= stop:
+                return records
+            if self._data_handle is not None:
+                self._data_handle.flush()
+            seg_no = bisect_right(self._starts, start) - 1
+            while start < stop:
+                segment = self._segments[seg_no]
+                seg_start = self._starts[seg_no]
+                seg_stop = min(stop - seg_start, len(segment))
+                records.extend(segment.read(start - seg_start, seg_stop))
+                start = seg_start + seg_stop
+                seg_no += 1
+            return records
+
+    def read_all(self) -> List[Dict[str, Any]]:
+        """Read the whole history"""
+        return self.read_range(0)
+
+    def tail(self, n: int) -> List[Dict[str, Any]]:
+        """Read the newest ``n`` turns"""
+        if n <= 0:
+            return []
+        return self.read_range(max(0, self._count - n))
+
+    def position_after(self, turn_id: int) -> int:
+        """Position of the first turn whose id is greater than ``turn_id``"""
+        with self._lock:
+            for seg_no, segment in enumerate(self._segments):
+                if segment.ids and segment.ids[-1] > turn_id:
+                    return self._starts[seg_no] + bisect_right(segment.ids, turn_id)
+            return self._count
+
+    def after(self, turn_id: int, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Read turns with an id greater than ``turn_id``, oldest first"""
+        with self._lock:
+            start = self.position_after(turn_id)
+            stop = None if limit is None else start + limit
+            return self.read_range(start, stop)
+
+    def get_many(self, turn_ids: Iterable[int]) -> List[Dict[str, Any]]:
+        """Read specific turns by id, in the order requested"""
+        records = []
+        with self._lock:
+            for turn_id in turn_ids:
+                position = self.position_after(turn_id - 1)
+                if position < self._count:
+                    record = self.read_range(position, position + 1)[0]
+                    if record["id"] == turn_id:
+                        records.append(record)
+        return records
+
+    def iter_reverse(self, batch_size: int = 64) -> Iterator[Dict[str, Any]]:
+        """Yield turns newest first, reading the log in batches from the end"""
+        stop = self._count
+        while stop > 0:
+            start = max(0, stop - batch_size)
+            yield from reversed(self.read_range(start, stop))
+            stop = start
+
+    def since(self, timestamp: str) -> List[Dict[str, Any]]:
+        """Read turns recorded at or after ``timestamp`` (ISO 8601)
+
+        Timestamps increase along the log, so the first matching position is
+        found with a binary search over the offset index.
+        """
+        with self._lock:
+            lo, hi = 0, self._count
+            while lo < hi:
+                mid = (lo + hi) // 2
+                if self.read_range(mid, mid + 1)[0]["timestamp"] < timestamp:
+                    lo = mid + 1
+                else:
+                    hi = mid
+            return self.read_range(lo)
+
+    # ------------------------------------------------------------------
+    # Maintenance
+    # ------------------------------------------------------------------
+    def _replace_segments(self, records: Iterable[Dict[str, Any]], id_floor: int) -> None:
+        """Write ``records`` to fresh segments and swap them in via the manifest"""
+        old_segments = self._segments
+        self._id_floor = id_floor
+        self._last_id = id_floor
+        self._close_handles()
+        self._segments = []
+        self._starts = []
+        self._count = 0
+        segment = None
+        data_handle = index_handle = None
+
+        def seal() -> None:
+            # Durable before the manifest points at the new segments
+            for handle in (data_handle, index_handle):
+                handle.flush()
+                os.fsync(handle.fileno())
+                handle.close()
+
+        for record in records:
+            if segment is None or segment.size >= self.segment_bytes:
+                if data_handle is not None:
+                    seal()
+                segment = _Segment(self.directory, self._new_segment_name())
+                self._segments.append(segment)
+                data_handle = open(segment.path, "wb")
+                index_handle = open(segment.index_path, "wb")
+            line = (Message.from_dict(record).to_json() + "\n").encode("utf-8")
+            index_handle.write(INDEX_ENTRY.pack(record["id"], segment.size))
+            data_handle.write(line)
+            segment.ids.append(record["id"])
+            segment.offsets.append(segment.size)
+            segment.size += len(line)
+        if data_handle is not None:
+            seal()
+        if segment is None:
+            segment = _Segment(self.directory, self._new_segment_name())
+            segment.path.touch()
+            segment.index_path.touch()
+            self._segments.append(segment)
+        self._write_manifest()
+        for old in old_segments:
+            old.unlink()
+        self._reindex()
+        self._freeze_cold()
+
+    def rewrite(self, messages: List[Dict[str, Any]]) -> None:
+        """Replace the whole history (used by ``MessageManager.save_chat_log``)
+
+        The new turns get fresh ids after the current last id, so consumers
+        that remember the last turn they handled pick them up as new turns.
+        """
+        with self._lock:
+            records = []
+            for i, message in enumerate(messages, start=self._last_id + 1):
+                records.append({
+                    "id": i,
+                    "role": message["role"],
+                    "content": message.get("content", ""),
+                    "timestamp": message.get("timestamp") or datetime.now().isoformat(),
+                })
+            self._replace_segments(records, id_floor=self._last_id)
+        if records:
+            self._notify(records)
+
+    def compact(self, drop_empty: bool = True) -> Dict[str, int]:
+        """Merge segments and optionally drop turns with empty content
+
+        Turn ids are preserved, so anything that refers to a turn by id stays
+        valid after compaction.
+        """
+        with self._lock:
+            before_turns = self._count
+            before_segments = len(self._segments)
+            records = self.read_all()
+            if drop_empty:
+                records = [r for r in records if str(r.get("content", "")).strip()]
+            self._replace_segments(records, id_floor=self._last_id)
+            stats = {
+                "turns_before": before_turns,
+                "turns_after": self._count,
+                "segments_before": before_segments,
+                "segments_after": len(self._segments),
+            }
+            logger.info(f"Chat log compacted: {stats}")
+            return stats
+
+    def storage_stats(self) -> Dict[str, int]:
+        """Turn and byte counts for the hot and cold tiers"""
+        with self._lock:
+            stats = {"hot_turns": 0, "hot_bytes": 0, "cold_turns": 0, "cold_bytes": 0}
+            for segment in self._segments:
+                tier = "cold" if isinstance(segment, _ColdSegment) else "hot"
+                stats[f"{tier}_turns"] += len(segment)
+                stats[f"{tier}_bytes"] += segment.size
+            return stats
+
+    def close(self) -> None:
+        with self._lock:
+            self._close_handles()
+
+
+_chat_log = None
+_chat_log_lock = threading.Lock()
+
+
+def get_chat_log():
+    """Return the process-wide chat log store, creating it on first use
+
+    ``config.CHAT_LOG_BACKEND`` selects the engine: ``"jsonl"`` (default) for
+    the segmented log above or ``"sqlite"`` for ``SQLiteChatLogStore``.
+    """
+    global _chat_log
+    with _chat_log_lock:
+        if _chat_log is None:
+            if config.CHAT_LOG_BACKEND == "sqlite":
+                from .chatlog_sqlite import SQLiteChatLogStore
+                _chat_log = SQLiteChatLogStore()
+            else:
+                _chat_log = ChatLogStore()
+        return _chat_log
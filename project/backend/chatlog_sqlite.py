@@ -0,0 +1,292 @@
+"""
+SQLite chat log storage for JARVIS AI Assistant
+
+An optional alternative to the segmented JSONL log, enabled with
+``CHAT_LOG_BACKEND=sqlite``. Turns live in a single table indexed by session,
+role and timestamp, so windowed queries such as "last N turns" or "turns
+since T" are answered by the database instead of by loading the history.
+"""
+import json
+import logging
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Union
+
+from .config import config
+from .listeners import TurnListener, TurnListenerMixin
+from .message import Message
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS turns (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    session TEXT NOT NULL,
+    role TEXT NOT NULL,
+    content TEXT NOT NULL,
+    timestamp TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_turns_session ON turns (session, id);
+CREATE INDEX IF NOT EXISTS idx_turns_role ON turns (role, id);
+CREATE INDEX IF NOT EXISTS idx_turns_timestamp ON turns (timestamp);
+"""
+
+COLUMNS = "id, role, content, timestamp"
+
+
+def _row_to_record(row: sqlite3.Row) -> Message:
+    return Message(row[0], row[1], row[2], row[3])
+
+
+class SQLiteChatLogStore(TurnListenerMixin):
+    """Chat log stored in SQLite (WAL mode, batched transactions)"""
+
+    def __init__(self, db_file: Optional[Union[str, Path]] = None,
+                 session: Optional[str] = None):
+        self.db_file = Path(db_file or config.CHAT_LOG_DB_FILE)
+        self.session = session or config.CHAT_SESSION_ID or datetime.now().strftime("%Y%m%d-%H%M%S")
+        self._lock = threading.RLock()
+        self._batch_depth = 0
+        self._listeners: List[TurnListener] = []
+        self._unnotified: List[Dict[str, Any]] = []
+
+        self.db_file.parent.mkdir(parents=True, exist_ok=True)
+        created = not self.db_file.exists()
+        self._conn = sqlite3.connect(str(self.db_file), check_same_thread=False,
+                                     isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._count = self._conn.execute("SELECT COUNT(*) FROM turns").fetchone()[0]
+        self._last_id = self._conn.execute(
+            "SELECT COALESCE(MAX(seq), 0) FROM sqlite_sequence WHERE name = 'turns'"
+        ).fetchone()[0]
+        if created:
+            self._import_existing()
+
+    # ------------------------------------------------------------------
+    # Setup
+    # ------------------------------------------------------------------
+    def _import_existing(self) -> None:
+        """Import history from the JSONL store or a legacy ChatLog.json"""
+        messages: List[Dict[str, Any]] = []
+        try:
+            if (config.CHAT_LOG_DIR / "manifest.json").exists():
+                from .chatlog import ChatLogStore
+                jsonl_store = ChatLogStore()
+                messages = jsonl_store.read_all()
+                jsonl_store.close()
+            elif config.CHAT_LOG_FILE.exists():
+                with open(config.CHAT_LOG_FILE, "r", encoding="utf-8") as f:
+                    messages = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not import existing chat history into SQLite: {e}")
+            return
+        if messages:
+            self.append_many(messages)
+            logger.info(f"Imported {len(messages)} turns into {self.db_file}")
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+    @contextmanager
+    def batch(self) -> Iterator[None]:
+        """Group every write inside the block into one transaction
+
+        Listeners are notified once, after the outermost block commits.
+        """
+        records: List[Dict[str, Any]] = []
+        with self._lock:
+            if self._batch_depth == 0:
+                self._conn.execute("BEGIN IMMEDIATE")
+            self._batch_depth += 1
+            try:
+                yield
+            except BaseException:
+                self._batch_depth -= 1
+                if self._batch_depth == 0:
+                    self._conn.execute("ROLLBACK")
+                    self._reload_counters()
+                    self._unnotified = []
+                raise
+            self._batch_depth -= 1
+            if self._batch_depth == 0:
+                self._conn.execute("COMMIT")
+                records, self._unnotified = self._unnotified, []
+        if records:
+            self._notify(records)
+
+    def _reload_counters(self) -> None:
+        self._count = self._conn.execute("SELECT COUNT(*) FROM turns").fetchone()[0]
+        self._last_id = self._conn.execute(
+            "SELECT COALESCE(MAX(seq), 0) FROM sqlite_sequence WHERE name = 'turns'"
+        ).fetchone()[0]
+
+    def _insert(self, message: Dict[str, Any]) -> Message:
+        record = Message(message.get("id"), message["role"], message.get("content", ""),
+                         message.get("timestamp"))
+        cursor = self._conn.execute(
+            "INSERT INTO turns (id, session, role, content, timestamp) VALUES (?, ?, ?, ?, ?)",
+            (record.id, self.session, record.role, record.content, record.timestamp),
+        )
+        record.id = cursor.lastrowid
+        self._unnotified.append(record)
+        self._count += 1
+        self._last_id = record["id"]
+        return record
+
+    def append(self, role: str, content: str,
+               timestamp: Optional[str] = None) -> Dict[str, Any]:
+        """Append a single turn and return the stored record"""
+        with self.batch():
+            return self._insert({"role": role, "content": content, "timestamp": timestamp})
+
+    def append_many(self, messages: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Append several turns in one transaction
+
+        Messages may carry an explicit ``id``; otherwise SQLite assigns one.
+        """
+        with self.batch():
+            return [self._insert(message) for message in messages]
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def last_id(self) -> int:
+        """Id of the most recently written turn (0 when empty)"""
+        return self._last_id
+
+    def _query(self, sql: str, params: tuple = ()) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [_row_to_record(row) for row in self._conn.execute(sql, params)]
+
+    def read_range(self, start: int, stop: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Read turns by position, like ``history[start:stop]``"""
+        start, stop, _ = slice(start, stop).indices(self._count)
+        if start >= stop:
+            return []
+        return self._query(
+            f"SELECT {COLUMNS} FROM turns ORDER BY id LIMIT ? OFFSET ?",
+            (stop - start, start),
+        )
+
+    def read_all(self) -> List[Dict[str, Any]]:
+        """Read the whole history"""
+        return self._query(f"SELECT {COLUMNS} FROM turns ORDER BY id")
+
+    def tail(self, n: int, session: Optional[str] = None,
+             role: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Read the newest ``n`` turns, optionally for one session or role"""
+        if n <= 0:
+            return []
+        where, params = self._filters(session=session, role=role)
+        rows = self._query(
+            f"SELECT {COLUMNS} FROM turns {where} ORDER BY id DESC LIMIT ?",
+            params + (n,),
+        )
+        rows.reverse()
+        return rows
+
+    def after(self, turn_id: int, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Read turns with an id greater than ``turn_id``, oldest first"""
+        return self._query(
+            f"SELECT {COLUMNS} FROM turns WHERE id > ? ORDER BY id LIMIT ?",
+            (turn_id, -1 if limit is None else limit),
+        )
+
+    def get_many(self, turn_ids: Iterable[int]) -> List[Dict[str, Any]]:
+        """Read specific turns by id, in the order requested"""
+        turn_ids = list(turn_ids)
+        if not turn_ids:
+            return []
+        placeholders = ", ".join("?" for _ in turn_ids)
+        rows = self._query(f"SELECT {COLUMNS} FROM turns WHERE id IN ({placeholders})", tuple(turn_ids))
+        by_id = {row["id"]: row for row in rows}
+        return [by_id[turn_id] for turn_id in turn_ids if turn_id in by_id]
+
+    def iter_reverse(self, batch_size: int = 64) -> Iterator[Dict[str, Any]]:
+        """Yield turns newest first, paging backwards by id"""
+        before = self._last_id + 1
+        while True:
+            rows = self._query(
+                f"SELECT {COLUMNS} FROM turns WHERE id < ? ORDER BY id DESC LIMIT ?",
+                (before, batch_size),
+            )
+            if not rows:
+                return
+            yield from rows
+            before = rows[-1]["id"]
+
+    def since(self, timestamp: str, session: Optional[str] = None,
+              role: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Read turns recorded at or after ``timestamp`` (ISO 8601)"""
+        where, params = self._filters(session=session, role=role, since=timestamp)
+        return self._query(f"SELECT {COLUMNS} FROM turns {where} ORDER BY id", params)
+
+    def sessions(self) -> List[str]:
+        """List the sessions present in the log, oldest first"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT session FROM turns GROUP BY session ORDER BY MIN(id)"
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    @staticmethod
+    def _filters(session: Optional[str] = None, role: Optional[str] = None,
+                 since: Optional[str] = None) -> tuple:
+        clauses, params = [], []
+        if session is not None:
+            clauses.append("session = ?")
+            params.append(session)
+        if role is not None:
+            clauses.append("role = ?")
+            params.append(role)
+        if since is not None:
+            clauses.append("timestamp >= ?")
+            params.append(since)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        return where, tuple(params)
+
+    # ------------------------------------------------------------------
+    # Maintenance
+    # ------------------------------------------------------------------
+    def rewrite(self, messages: List[Dict[str, Any]]) -> None:
+        """Replace the whole history (used by ``MessageManager.save_chat_log``)
+
+        Like ``ChatLogStore.rewrite``, the new turns get fresh ids after the
+        current last id (AUTOINCREMENT never reuses one), so consumers that
+        remember the last turn they handled pick them up as new turns.
+        """
+        with self.batch():
+            self._conn.execute("DELETE FROM turns")
+            self._count = 0
+            for message in messages:
+                self._insert({"role": message["role"], "content": message.get("content", ""),
+                              "timestamp": message.get("timestamp")})
+
+    def compact(self, drop_empty: bool = True) -> Dict[str, int]:
+        """Drop turns with empty content and reclaim space
+
+        Ids are never reused, so references to turns by id stay valid.
+        """
+        with self._lock:
+            before = self._count
+            if drop_empty:
+                with self.batch():
+                    self._conn.execute("DELETE FROM turns WHERE TRIM(content) = ''")
+                self._reload_counters()
+            self._conn.execute("VACUUM")
+            stats = {"turns_before": before, "turns_after": self._count}
+            logger.info(f"Chat log compacted: {stats}")
+            return stats
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,181 @@
+"""
+Configuration management for JARVIS AI Assistant
+"""
+import os
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+try:
+    from dotenv import load_dotenv
+except ImportError:  # python-dotenv is optional; the process environment is used as is
+    load_dotenv = None
+
+# Load environment variables
+if load_dotenv is not None:
+    load_dotenv()
+
+class Config:
+    """Configuration class for JARVIS AI Assistant"""
+    
+    # Base paths
+    BASE_DIR = Path(__file__).parent.parent
+    DATA_DIR = BASE_DIR / "data"
+    FRONTEND_DIR = BASE_DIR / "frountend"
+    GRAPHICS_DIR = FRONTEND_DIR / "Graphics"
+    FILES_DIR = FRONTEND_DIR / "Files"
+    
+    # Ensure directories exist
+    DATA_DIR.mkdir(parents=True, exist_ok=True)
+    FILES_DIR.mkdir(parents=True, exist_ok=True)
+    
+    # API Keys
+    GROQ_API_KEY = os.getenv("GROQ_API_KEY", "")
+    COHERE_API_KEY = os.getenv("COHERE_API_KEY", "")
+    GEMINI_API_KEY = os.getenv("GEMINI_API_KEY", "")
+    HUGGINGFACE_API_KEY = os.getenv("HUGGINGFACE_API_KEY", "")
+    
+    # Default AI Provider
+    DEFAULT_AI_PROVIDER = os.getenv("DEFAULT_AI_PROVIDER", "groq")
+    
+    # User Configuration
+    USERNAME = os.getenv("USERNAME", "User")
+    ASSISTANTNAME = os.getenv("ASSISTANTNAME", "JARVIS")
+    INPUT_LANGUAGE = os.getenv("INPUT_LANGUAGE", "en-US")
+    ASSISTANT_VOICE = os.getenv("ASSISTANT_VOICE", "Microsoft David - English (United States)")
+    
+    # Voice Configuration
+    VOICE_RATE = float(os.getenv("VOICE_RATE", "0.9"))
+    VOICE_PITCH = float(os.getenv("VOICE_PITCH", "0.6"))
+    VOICE_VOLUME = float(os.getenv("VOICE_VOLUME", "0.9"))
+    
+    # Application Settings
+    DEBUG = os.getenv("DEBUG", "false").lower() == "true"
+    LOG_LEVEL = os.getenv("LOG_LEVEL", "info").upper()
+    # Also write status/mic/response events to the legacy *.data files
+    EVENT_FILE_MIRROR = os.getenv("EVENT_FILE_MIRROR", "false").lower() == "true"
+    # Follow *.data files written by external tools (inotify where available)
+    GUI_FILE_WATCH = os.getenv("GUI_FILE_WATCH", "false").lower() == "true"
+    # Image generation jobs the image worker runs at the same time
+    IMAGE_WORKER_CONCURRENCY = int(os.getenv("IMAGE_WORKER_CONCURRENCY", "2"))
+    # Pooled HTTP client: connections per host and seconds allowed per call (retries included)
+    HTTP_LIMIT_PER_HOST = int(os.getenv("HTTP_LIMIT_PER_HOST", "8"))
+    HTTP_REQUEST_DEADLINE = float(os.getenv("HTTP_REQUEST_DEADLINE", "120"))
+    
+    # File paths
+    CHAT_LOG_FILE = DATA_DIR / "ChatLog.json"
+    STATUS_FILE = FILES_DIR / "status.data"
+    MIC_FILE = FILES_DIR / "mic.data"
+    RESPONSES_FILE = FILES_DIR / "Responses.data"
+    DATABASE_FILE = FILES_DIR / "database.data"
+    IMAGE_GEN_FILE = FILES_DIR / "imagegenration.data"
+    
+    # Chat log storage
+    CHAT_LOG_BACKEND = os.getenv("CHAT_LOG_BACKEND", "jsonl").lower()
+    CHAT_LOG_DIR = DATA_DIR / "chatlog"
+    CHAT_LOG_DB_FILE = DATA_DIR / "chatlog.db"
+    CHAT_SESSION_ID = os.getenv("CHAT_SESSION_ID", "")
+    CHAT_LOG_SEGMENT_BYTES = int(os.getenv("CHAT_LOG_SEGMENT_BYTES", str(4 * 1024 * 1024)))
+    CHAT_LOG_HOT_SEGMENTS = int(os.getenv("CHAT_LOG_HOT_SEGMENTS", "2"))
+    CHAT_CACHE_FLUSH_INTERVAL = float(os.getenv("CHAT_CACHE_FLUSH_INTERVAL", "2"))
+    CHAT_CACHE_TURNS = int(os.getenv("CHAT_CACHE_TURNS", "2000"))
+    CHAT_LOG_EXPORT_JSON = os.getenv("CHAT_LOG_EXPORT_JSON", "false").lower() == "true"
+    
+    # Rolling summarization of old chat history
+    CHAT_SUMMARY_FILE = DATA_DIR / "chat_summaries.jsonl"
+    CHAT_SUMMARY_HORIZON_TURNS = int(os.getenv("CHAT_SUMMARY_HORIZON_TURNS", "40"))
+    CHAT_SUMMARY_BATCH_TURNS = int(os.getenv("CHAT_SUMMARY_BATCH_TURNS", "40"))
+    CHAT_SUMMARY_INTERVAL = float(os.getenv("CHAT_SUMMARY_INTERVAL", "30"))
+    
+    # Retrieval memory over chat history
+    MEMORY_INDEX_FILE = DATA_DIR / "ChatLog.memory.npz"
+    MEMORY_TOP_K = int(os.getenv("MEMORY_TOP_K", "4"))
+    
+    # Full-text search index over chat history
+    SEARCH_INDEX_FILE = DATA_DIR / "ChatLog.search.npz"
+    # Seconds after new turns are indexed before the memory/search index is saved
+    INDEX_SAVE_DELAY = float(os.getenv("INDEX_SAVE_DELAY", "5"))
+    
+    # Shared-memory control block used to hand jobs to worker processes
+    CONTROL_BLOCK_FILE = DATA_DIR / "control.shm"
+    
+    # Generated images: content-addressed store, result cache and thumbnails
+    IMAGE_STORE_DIR = DATA_DIR / "images"
+    IMAGE_STORE_MAX_MB = int(os.getenv("IMAGE_STORE_MAX_MB", "1024"))
+    IMAGE_THUMBNAIL_SIZE = int(os.getenv("IMAGE_THUMBNAIL_SIZE", "256"))
+    IMAGE_THUMBNAIL_WORKERS = int(os.getenv("IMAGE_THUMBNAIL_WORKERS", "2"))
+    
+    # Synthesized speech cached by text, voice, pitch and rate
+    TTS_CACHE_DIR = DATA_DIR / "tts_cache"
+    TTS_CACHE_MAX_MB = int(os.getenv("TTS_CACHE_MAX_MB", "64"))
+    
+    # Resolved chromedriver path, so startup skips ChromeDriverManager's network check
+    CHROMEDRIVER_CACHE_FILE = DATA_DIR / "chromedriver.json"
+    
+    # Speech-to-text engine: "browser" (Chrome Web Speech) or "local" (offline, Vosk)
+    STT_ENGINE = os.getenv("STT_ENGINE", "browser").lower()
+    STT_SAMPLE_RATE = int(os.getenv("STT_SAMPLE_RATE", "16000"))
+    STT_VAD_THRESHOLD_DB = float(os.getenv("STT_VAD_THRESHOLD_DB", "-45"))
+    STT_ENDPOINT_SILENCE_MS = int(os.getenv("STT_ENDPOINT_SILENCE_MS", "400"))
+    VOSK_MODEL_PATH = os.getenv("VOSK_MODEL_PATH", str(DATA_DIR / "vosk-model"))
+    
+    @classmethod
+    def validate_config(cls) -> Dict[str, Any]:
+        """Validate configuration and return status"""
+        issues = []
+        warnings = []
+        
+        # Check API keys
+        if not cls.GROQ_API_KEY:
+            issues.append("GROQ_API_KEY is not set")
+        if not cls.COHERE_API_KEY:
+            warnings.append("COHERE_API_KEY is not set (optional)")
+        if not cls.GEMINI_API_KEY:
+            warnings.append("GEMINI_API_KEY is not set (optional)")
+        
+        # Check directories
+        required_dirs = [cls.DATA_DIR, cls.FILES_DIR]
+        for dir_path in required_dirs:
+            if not dir_path.exists():
+                issues.append(f"Required directory does not exist: {dir_path}")
+        
+        # Check voice settings
+        if not (0.1 <= cls.VOICE_RATE <= 2.0):
+            warnings.append(f"VOICE_RATE ({cls.VOICE_RATE}) should be between 0.1 and 2.0")
+        if not (0.0 <= cls.VOICE_PITCH <= 2.0):
+            warnings.append(f"VOICE_PITCH ({cls.VOICE_PITCH}) should be between 0.0 and 2.0")
+        if not (0.0 <= cls.VOICE_VOLUME <= 1.0):
+            warnings.append(f"VOICE_VOLUME ({cls.VOICE_VOLUME}) should be between 0.0 and 1.0")
+        
+        # Check chat log storage
+        if cls.CHAT_LOG_BACKEND not in ("jsonl", "sqlite"):
+            issues.append(f"CHAT_LOG_BACKEND ({cls.CHAT_LOG_BACKEND}) must be 'jsonl' or 'sqlite'")
+        
+        return {
+            "valid": len(issues) == 0,
+            "issues": issues,
+            "warnings": warnings,
+            "config": {
+                "username": cls.USERNAME,
+                "assistant_name": cls.ASSISTANTNAME,
+                "input_language": cls.INPUT_LANGUAGE,
+                "default_provider": cls.DEFAULT_AI_PROVIDER,
+                "chat_log_backend": cls.CHAT_LOG_BACKEND,
+                "debug": cls.DEBUG
+            }
+        }
+    
+    @classmethod
+    def get_file_path(cls, file_type: str) -> Path:
+        """Get file path for specific file types"""
+        file_map = {
+            "chat_log": cls.CHAT_LOG_FILE,
+            "status": cls.STATUS_FILE,
+            "mic": cls.MIC_FILE,
+            "responses": cls.RESPONSES_FILE,
+            "database": cls.DATABASE_FILE,
+            "image_gen": cls.IMAGE_GEN_FILE,
+        }
+        return file_map.get(file_type, cls.DATA_DIR / f"{file_type}.data")
+
+# Global config instance
+config = Config()
\ No newline at end of file
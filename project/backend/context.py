@@ -0,0 +1,131 @@
+"""
+Prompt context assembly for JARVIS AI Assistant
+
+Builds the ``messages`` list sent to chat completion APIs so that it always
+fits the model's context window: fixed system/query messages first, then as
+many of the newest history turns as the remaining token budget allows.
+"""
+import logging
+from typing import Any, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Context window sizes (in tokens) for the models we call
+MODEL_CONTEXT_WINDOWS = {
+    "llama3-70b-8192": 8192,
+    "llama3-8b-8192": 8192,
+    "mixtral-8x7b-32768": 32768,
+    "gemma2-9b-it": 8192,
+    "llama-3.1-8b-instant": 131072,
+    "llama-3.3-70b-versatile": 131072,
+}
+DEFAULT_CONTEXT_WINDOW = 8192
+
+# Rough per-message overhead for role markers and separators
+MESSAGE_OVERHEAD_TOKENS = 4
+# Average characters per token; kept low so estimates err on the high side
+CHARS_PER_TOKEN = 3.5
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the token count of ``text`` without a tokenizer"""
+    if not text:
+        return 0
+    return int(len(text) / CHARS_PER_TOKEN) + 1
+
+
+def message_tokens(message: Dict[str, Any]) -> int:
+    """Estimate the tokens a single chat message costs in a prompt"""
+    return estimate_tokens(str(message.get("content", ""))) + MESSAGE_OVERHEAD_TOKENS
+
+
+def to_prompt_message(message: Dict[str, Any]) -> Dict[str, str]:
+    """Strip a stored turn down to the fields chat APIs accept"""
+    return {"role": message["role"], "content": message["content"]}
+
+
+class ContextBuilder:
+    """Fits chat history into a per-model token budget"""
+
+    def __init__(self, model: str, max_tokens: int = 1024,
+                 context_window: Optional[int] = None, safety_margin: int = 64,
+                 retrieval_share: float = 0.25):
+        self.model = model
+        self.max_tokens = max_tokens
+        self.context_window = context_window or MODEL_CONTEXT_WINDOWS.get(model, DEFAULT_CONTEXT_WINDOW)
+        self.safety_margin = safety_margin
+        self.retrieval_share = retrieval_share
+
+    @property
+    def budget(self) -> int:
+        """Tokens available for the prompt after reserving ``max_tokens``"""
+        return self.context_window - self.max_tokens - self.safety_margin
+
+    def build(self, system: List[Dict[str, Any]], history: Iterable[Dict[str, Any]],
+              query: Optional[Dict[str, Any]] = None,
+              summary: Optional[Dict[str, Any]] = None,
+              retrieved: Optional[List[Dict[str, Any]]] = None) -> List[Dict[str, str]]:
+        """Assemble ``system + summary + retrieved + history window + query``
+
+        ``history`` must yield turns newest first (e.g. ``store.iter_reverse()``)
+        so only the turns that make it into the window are ever read. Turns
+        with empty content are skipped. When a ``summary`` record is given,
+        history stops at the last turn it covers. ``retrieved`` turns (most
+        relevant first) share up to ``retrieval_share`` of the budget and are
+        dropped if they already appear in the window.
+        """
+        system = list(system)
+        covers_until = 0
+        if summary:
+            system.append({
+                "role": "system",
+                "content": f"Summary of the earlier conversation:\n{summary['summary']}",
+            })
+            covers_until = summary["covers_until"]
+
+        fixed = [to_prompt_message(m) for m in system]
+        if query is not None:
+            fixed.append(to_prompt_message(query))
+        remaining = self.budget - sum(message_tokens(m) for m in fixed)
+        if remaining < 0:
+            logger.warning(f"Fixed prompt exceeds the {self.model} budget by {-remaining} tokens")
+
+        reserve = int(max(remaining, 0) * self.retrieval_share) if retrieved else 0
+        remaining -= reserve
+        reserve -= MESSAGE_OVERHEAD_TOKENS
+
+        window: List[Dict[str, str]] = []
+        window_ids = set()
+        for turn in history:
+            if turn.get("id", covers_until + 1) <= covers_until:
+                break
+            if not str(turn.get("content", "")).strip():
+                continue
+            cost = message_tokens(turn)
+            if cost > remaining:
+                break
+            window.append(to_prompt_message(turn))
+            window_ids.add(turn.get("id"))
+            remaining -= cost
+        window.reverse()
+
+        recalled = []
+        for turn in retrieved or []:
+            if turn.get("id") in window_ids:
+                continue
+            line = f"{turn['role']}: {turn['content']}"
+            cost = estimate_tokens(line) + 1
+            if cost > reserve:
+                break
+            recalled.append(line)
+            reserve -= cost
+        if recalled:
+            system.append({
+                "role": "system",
+                "content": "Possibly relevant earlier conversation:\n" + "\n".join(recalled),
+            })
+
+        messages = [to_prompt_message(m) for m in system] + window
+        if query is not None:
+            messages.append(to_prompt_message(query))
+        return messages
@@ -0,0 +1,256 @@
+"""
+Process-wide conversation cache for JARVIS AI Assistant
+
+The chatbot, the realtime search engine and ``MessageManager`` all read and
+write the conversation through one ``ConversationCache``. The newest turns
+are loaded from the chat log store once and reads of them are served from
+memory; older turns are read from the store on demand. New turns are written
+behind, in batches, by a flusher thread (and again at exit). A single lock
+serializes writers, so turns recorded from different threads can no longer
+overwrite each other.
+"""
+import atexit
+import logging
+import threading
+from bisect import bisect_right
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Union
+
+from .chatlog import atomic_write_json, get_chat_log
+from .config import config
+from .listeners import TurnListener, TurnListenerMixin
+from .message import Message
+
+logger = logging.getLogger(__name__)
+
+
+class ConversationCache(TurnListenerMixin):
+    """In-memory view of the chat log with write-behind persistence"""
+
+    def __init__(self, store=None, flush_interval: Optional[float] = None,
+                 snapshot_file: Optional[Union[str, Path]] = None,
+                 max_turns: Optional[int] = None):
+        self.store = store if store is not None else get_chat_log()
+        self.flush_interval = flush_interval or config.CHAT_CACHE_FLUSH_INTERVAL
+        self.max_turns = max_turns or config.CHAT_CACHE_TURNS
+        if snapshot_file is None and config.CHAT_LOG_EXPORT_JSON:
+            snapshot_file = config.CHAT_LOG_FILE
+        self.snapshot_file = Path(snapshot_file) if snapshot_file else None
+        self._lock = threading.RLock()
+        self._flush_lock = threading.Lock()
+        self._listeners: List[TurnListener] = []
+        self._dirty: List[Dict[str, Any]] = []
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._load()
+
+    def _load(self) -> None:
+        # Positions below _base live only in the store
+        self._base = max(0, len(self.store) - self.max_turns)
+        self._turns: List[Dict[str, Any]] = self.store.read_range(self._base)
+        self._ids: List[int] = [turn["id"] for turn in self._turns]
+        self._last_id = self.store.last_id
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+    def append(self, role: str, content: str,
+               timestamp: Optional[str] = None) -> Dict[str, Any]:
+        """Record a single turn and return it"""
+        return self.append_many([{"role": role, "content": content, "timestamp": timestamp}])[0]
+
+    def append_many(self, messages: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Record several turns atomically (they stay adjacent in the log)"""
+        records = []
+        with self._lock:
+            for message in messages:
+                self._last_id += 1
+                record = Message(self._last_id, message["role"], message.get("content", ""),
+                                 message.get("timestamp"))
+                self._turns.append(record)
+                self._ids.append(record["id"])
+                self._dirty.append(record)
+                records.append(record)
+        if records:
+            self._notify(records)
+            self._start_flusher()
+        return records
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+    def flush(self) -> int:
+        """Write dirty turns to the store; return how many were written"""
+        with self._flush_lock:
+            with self._lock:
+                dirty, self._dirty = self._dirty, []
+            if not dirty:
+                return 0
+            try:
+                self.store.append_many(dirty)
+            except Exception:
+                with self._lock:
+                    self._dirty = dirty + self._dirty
+                raise
+            self._trim()
+            if self.snapshot_file is not None:
+                self._write_snapshot()
+            return len(dirty)
+
+    def _trim(self) -> None:
+        """Drop the oldest persisted turns once memory holds twice ``max_turns``"""
+        with self._lock:
+            excess = len(self._turns) - self.max_turns
+            if excess < self.max_turns:
+                return
+            drop = min(excess, len(self._turns) - len(self._dirty))
+            self._turns = self._turns[drop:]
+            self._ids = self._ids[drop:]
+            self._base += drop
+
+    def _write_snapshot(self) -> None:
+        """Export the legacy ChatLog.json format (temp file + atomic rename)"""
+        turns = [{"role": turn["role"], "content": turn["content"]} for turn in self.read_all()]
+        atomic_write_json(self.snapshot_file, turns)
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Conversation flush failed, will retry: {e}")
+
+    def _start_flusher(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._flush_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stopped.clear()
+                self._thread = threading.Thread(target=self._run, name="ConversationFlusher", daemon=True)
+                self._thread.start()
+
+    def close(self) -> None:
+        """Stop the flusher thread and write any remaining turns"""
+        self._stopped.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.flush()
+
+    # ------------------------------------------------------------------
+    # Reads (same interface as the chat log stores; the newest turns are
+    # served from memory, older ones from the store)
+    # ------------------------------------------------------------------
+    def __len__(self) -> int:
+        return self._base + len(self._turns)
+
+    @property
+    def last_id(self) -> int:
+        return self._last_id
+
+    def read_range(self, start: int, stop: Optional[int] = None) -> List[Dict[str, Any]]:
+        with self._lock:
+            start, stop, _ = slice(start, stop).indices(len(self))
+            if start >= stop:
+                return []
+            records = self.store.read_range(start, min(stop, self._base)) if start < self._base else []
+            return records + self._turns[max(start - self._base, 0):stop - self._base]
+
+    def read_all(self) -> List[Dict[str, Any]]:
+        return self.read_range(0)
+
+    def tail(self, n: int) -> List[Dict[str, Any]]:
+        if n <= 0:
+            return []
+        return self.read_range(max(0, len(self) - n))
+
+    def _first_cached_id(self) -> float:
+        return self._ids[0] if self._ids else float("inf")
+
+    def after(self, turn_id: int, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        with self._lock:
+            first = self._first_cached_id()
+            records = []
+            if self._base and turn_id < first - 1:
+                records = [turn for turn in self.store.after(turn_id, limit) if turn["id"] < first]
+            start = bisect_right(self._ids, turn_id)
+            records += self._turns[start:] if limit is None else self._turns[start:start + limit]
+            return records if limit is None else records[:limit]
+
+    def get_many(self, turn_ids: Iterable[int]) -> List[Dict[str, Any]]:
+        turn_ids = list(turn_ids)
+        found: Dict[int, Dict[str, Any]] = {}
+        with self._lock:
+            first = self._first_cached_id()
+            older = []
+            for turn_id in turn_ids:
+                position = bisect_right(self._ids, turn_id) - 1
+                if position >= 0 and self._ids[position] == turn_id:
+                    found[turn_id] = self._turns[position]
+                elif turn_id < first:
+                    older.append(turn_id)
+            for turn in self.store.get_many(older) if older else []:
+                found[turn["id"]] = turn
+        return [found[turn_id] for turn_id in turn_ids if turn_id in found]
+
+    def iter_reverse(self, batch_size: int = 64) -> Iterator[Dict[str, Any]]:
+        with self._lock:
+            turns, stop = self._turns, self._base
+        for position in range(len(turns) - 1, -1, -1):
+            yield turns[position]
+        while stop > 0:
+            start = max(0, stop - batch_size)
+            yield from reversed(self.store.read_range(start, stop))
+            stop = start
+
+    def since(self, timestamp: str) -> List[Dict[str, Any]]:
+        with self._lock:
+            lo, hi = 0, len(self._turns)
+            while lo < hi:
+                mid = (lo + hi) // 2
+                if self._turns[mid]["timestamp"] < timestamp:
+                    lo = mid + 1
+                else:
+                    hi = mid
+            if lo > 0 or not self._base:
+                return self._turns[lo:]
+            first = self._first_cached_id()
+            older = [turn for turn in self.store.since(timestamp) if turn["id"] < first]
+            return older + self._turns
+
+    # ------------------------------------------------------------------
+    # Maintenance
+    # ------------------------------------------------------------------
+    def rewrite(self, messages: List[Dict[str, Any]]) -> None:
+        """Replace the whole history in the store and reload"""
+        with self._flush_lock, self._lock:
+            self._dirty = []
+            self.store.rewrite(messages)
+            self._load()
+            if self.snapshot_file is not None:
+                self._write_snapshot()
+
+    def compact(self, drop_empty: bool = True) -> Dict[str, int]:
+        """Flush, compact the underlying store and reload"""
+        self.flush()
+        with self._flush_lock, self._lock:
+            stats = self.store.compact(drop_empty=drop_empty)
+            self._load()
+            return stats
+
+
+_conversation: Optional[ConversationCache] = None
+_conversation_lock = threading.Lock()
+
+
+def get_conversation() -> ConversationCache:
+    """Return the process-wide conversation cache, loading it on first use"""
+    global _conversation
+    with _conversation_lock:
+        if _conversation is None:
+            _conversation = ConversationCache()
+            atexit.register(_conversation.close)
+        return _conversation
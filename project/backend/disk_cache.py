@@ -0,0 +1,141 @@
+"""
+Size-bounded on-disk LRU cache for JARVIS AI Assistant
+
+``DiskLRU`` stores one file per key in a directory. File names are a hash of
+the key (or the key itself, for keys that already are digests), and recency
+is the file's modification time (refreshed on every hit), so the cache needs
+no index file and survives restarts as-is. When the total size goes over
+``max_bytes`` the least recently used files are deleted.
+"""
+import hashlib
+import logging
+import os
+import shutil
+import tempfile
+import threading
+from pathlib import Path
+from typing import Dict, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+
+class DiskLRU:
+    """Files keyed by string, evicted least-recently-used first"""
+
+    def __init__(self, directory: Union[str, Path], max_bytes: int, suffix: str = "",
+                 hash_keys: bool = True):
+        self.directory = Path(directory)
+        self.hash_keys = hash_keys
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.suffix = suffix
+        self._lock = threading.Lock()
+        self._sizes: Dict[Path, int] = {}
+        self._total = 0
+        self.hits = 0
+        self.misses = 0
+        for path in self.directory.glob(f"*/*{suffix}"):
+            if not path.name.endswith(".part"):
+                self._sizes[path] = path.stat().st_size
+        self._total = sum(self._sizes.values())
+
+    def path_for(self, key: str) -> Path:
+        # Keys that are already hex digests (content addresses) are used as-is
+        name = hashlib.sha256(key.encode("utf-8")).hexdigest() if self.hash_keys else key
+        # Two-character fan-out keeps directories small
+        return self.directory / name[:2] / f"{name}{self.suffix}"
+
+    def get(self, key: str) -> Optional[Path]:
+        """Return the file for ``key`` and mark it as recently used"""
+        path = self.path_for(key)
+        with self._lock:
+            if path not in self._sizes:
+                self.misses += 1
+                return None
+            self.hits += 1
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            with self._lock:
+                self._forget(path)
+            return None
+        return path
+
+    def get_bytes(self, key: str) -> Optional[bytes]:
+        path = self.get(key)
+        if path is None:
+            return None
+        try:
+            return path.read_bytes()
+        except FileNotFoundError:
+            return None
+
+    def __contains__(self, key: str) -> bool:
+        return self.path_for(key) in self._sizes
+
+    def put_bytes(self, key: str, data: bytes) -> Path:
+        """Store ``data`` under ``key`` (written atomically)"""
+        path = self.path_for(key)
+        path.parent.mkdir(exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix=".part")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_name, path)
+        self._added(path, len(data))
+        return path
+
+    def put_file(self, key: str, source: Union[str, Path], move: bool = True) -> Path:
+        """Store an existing file under ``key``; with ``move`` the source is renamed
+
+        A file already written at ``path_for(key)`` is simply registered.
+        """
+        path = self.path_for(key)
+        path.parent.mkdir(exist_ok=True)
+        if Path(source) == path:
+            pass
+        elif move:
+            os.replace(source, path)
+        else:
+            tmp_name = path.with_name(path.name + ".part")
+            shutil.copyfile(source, tmp_name)
+            os.replace(tmp_name, path)
+        self._added(path, path.stat().st_size)
+        return path
+
+    def discard(self, key: str) -> None:
+        path = self.path_for(key)
+        with self._lock:
+            self._forget(path)
+        path.unlink(missing_ok=True)
+
+    def _forget(self, path: Path) -> None:
+        self._total -= self._sizes.pop(path, 0)
+
+    def _added(self, path: Path, size: int) -> None:
+        with self._lock:
+            self._forget(path)
+            self._sizes[path] = size
+            self._total += size
+            if self._total > self.max_bytes:
+                self._evict(keep=path)
+
+    def _evict(self, keep: Path) -> None:
+        def last_used(path: Path) -> float:
+            try:
+                return path.stat().st_mtime
+            except FileNotFoundError:
+                return 0.0
+
+        for path in sorted(self._sizes, key=last_used):
+            if self._total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            self._forget(path)
+            path.unlink(missing_ok=True)
+            logger.debug(f"Evicted {path.name} from {self.directory}")
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"files": len(self._sizes), "bytes": self._total, "max_bytes": self.max_bytes,
+                    "hits": self.hits, "misses": self.misses}
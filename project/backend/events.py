@@ -0,0 +1,140 @@
+"""
+In-process event bus for JARVIS AI Assistant
+
+Assistant status, microphone state and response text used to travel between
+the backend and the GUI through small files that the GUI polled. They are now
+published on an ``EventBus``: subscribers are called as soon as a value is
+published and the latest value of every topic is retained, so ``Get*``
+helpers read it without touching the filesystem. ``FileMirror`` keeps the old
+``*.data`` files in step for tools that still read them.
+"""
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Union
+
+from .config import config
+
+logger = logging.getLogger(__name__)
+
+# Topics shared by the backend and the GUI
+ASSISTANT_STATUS = "assistant.status"
+MIC_STATUS = "mic.status"
+RESPONSE_TEXT = "response.text"
+RESPONSE_PARTIAL = "response.partial"  # Answer so far while it is being generated
+IMAGE_STATUS = "image.status"
+
+Subscriber = Callable[[str, Any], None]
+
+
+class EventBus:
+    """Thread-safe publish/subscribe with a retained value per topic"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers: Dict[str, List[Subscriber]] = {}
+        self._latest: Dict[str, Any] = {}
+
+    def publish(self, topic: str, value: Any) -> None:
+        """Store ``value`` as the latest for ``topic`` and notify subscribers
+
+        Subscribers run on the publishing thread; GUI code should go through
+        a Qt bridge so widgets are only touched on the GUI thread.
+        """
+        with self._lock:
+            self._latest[topic] = value
+            subscribers = list(self._subscribers.get(topic, ()))
+        for callback in subscribers:
+            try:
+                callback(topic, value)
+            except Exception as e:
+                logger.error(f"Event subscriber {callback!r} for {topic} failed: {e}")
+
+    def subscribe(self, topic: str, callback: Subscriber, replay: bool = False) -> Callable[[], None]:
+        """Call ``callback(topic, value)`` on every publish; return an unsubscribe function
+
+        With ``replay`` the callback also receives the current value, if any.
+        """
+        with self._lock:
+            self._subscribers.setdefault(topic, []).append(callback)
+            has_value = topic in self._latest
+            value = self._latest.get(topic)
+        if replay and has_value:
+            callback(topic, value)
+
+        def unsubscribe() -> None:
+            with self._lock:
+                try:
+                    self._subscribers.get(topic, []).remove(callback)
+                except ValueError:
+                    pass
+
+        return unsubscribe
+
+    def latest(self, topic: str, default: Any = None) -> Any:
+        """Return the most recently published value for ``topic``"""
+        with self._lock:
+            return self._latest.get(topic, default)
+
+
+class FileMirror:
+    """Compatibility adapter that mirrors topics to the legacy ``*.data`` files"""
+
+    def __init__(self, bus: EventBus, files: Dict[str, Union[str, Path]]):
+        self.bus = bus
+        self.files = {topic: Path(path) for topic, path in files.items()}
+        self._unsubscribe: List[Callable[[], None]] = []
+
+    def load(self) -> None:
+        """Seed the bus with values left in the files by a previous run"""
+        for topic, path in self.files.items():
+            if self.bus.latest(topic) is None and path.exists():
+                try:
+                    self.bus.publish(topic, path.read_text(encoding="utf-8"))
+                except OSError as e:
+                    logger.warning(f"Could not read {path}: {e}")
+
+    def attach(self) -> None:
+        """Write every published value through to its file"""
+        for topic in self.files:
+            self._unsubscribe.append(self.bus.subscribe(topic, self._write, replay=True))
+
+    def detach(self) -> None:
+        for unsubscribe in self._unsubscribe:
+            unsubscribe()
+        self._unsubscribe = []
+
+    def _write(self, topic: str, value: Any) -> None:
+        # Temp file + rename, so readers never see a half-written value
+        path = self.files[topic]
+        tmp_path = path.with_name(path.name + ".tmp")
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(str(value))
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not mirror {topic} to {path}: {e}")
+
+
+_event_bus: Optional[EventBus] = None
+_event_bus_lock = threading.Lock()
+
+
+def get_event_bus() -> EventBus:
+    """Return the process-wide event bus, creating it on first use"""
+    global _event_bus
+    with _event_bus_lock:
+        if _event_bus is None:
+            _event_bus = EventBus()
+        return _event_bus
+
+
+def mirror_to_files(files: Dict[str, Union[str, Path]], bus: Optional[EventBus] = None) -> Optional[FileMirror]:
+    """Attach a ``FileMirror`` when ``config.EVENT_FILE_MIRROR`` is enabled"""
+    if not config.EVENT_FILE_MIRROR:
+        return None
+    mirror = FileMirror(bus or get_event_bus(), files)
+    mirror.load()
+    mirror.attach()
+    return mirror
@@ -0,0 +1,187 @@
+"""
+Change-driven watching of the GUI ``*.data`` files for JARVIS AI Assistant
+
+For deployments where external tools still write ``Status.data`` and
+``Responses.data``, the GUI follows those files instead of polling them. On
+Linux an inotify descriptor (via ctypes) reports changes and can be plugged
+into a ``QSocketNotifier``; elsewhere a cheap ``stat`` check stands in. A
+changed file is read from the last offset, so only appended bytes are read
+and decoded; a truncated, replaced or rewritten file is re-read from the start.
+Small files (the usual status lines) are always re-read whole when their
+size, mtime or inode changes, so a same-length rewrite is never missed.
+"""
+import codecs
+import ctypes
+import ctypes.util
+import logging
+import os
+import struct
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple, Union
+
+from .events import EventBus, get_event_bus
+
+logger = logging.getLogger(__name__)
+
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = 0o2000000
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+
+EVENT_HEADER = struct.Struct("iIII")  # wd, mask, cookie, name length
+HEAD_BYTES = 64
+# Files up to this size are re-read whole on every change
+FULL_READ_BYTES = 64 * 1024
+
+
+class TailReader:
+    """Reads a file incrementally, tracking the offset already consumed"""
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self.text = ""
+        self._offset = 0
+        self._head = b""
+        self._signature: Optional[Tuple[int, int, int]] = None
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+
+    def _reset(self) -> None:
+        self.text = ""
+        self._offset = 0
+        self._head = b""
+        self._signature = None
+        self._decoder.reset()
+
+    def read(self) -> bool:
+        """Consume new bytes; return True if ``text`` changed"""
+        previous = self.text
+        try:
+            with open(self.path, "rb") as f:
+                st = os.fstat(f.fileno())
+                signature = (st.st_ino, st.st_size, st.st_mtime_ns)
+                if signature == self._signature:
+                    return False
+                head = f.read(min(HEAD_BYTES, self._offset)) if self._offset else b""
+                rewritten = (st.st_size <= FULL_READ_BYTES
+                             or self._signature is None or st.st_ino != self._signature[0]
+                             or st.st_size < self._offset or head != self._head[:len(head)])
+                if rewritten:
+                    self._reset()
+                self._signature = signature
+                f.seek(self._offset)
+                chunk = f.read()
+        except FileNotFoundError:
+            changed = bool(self.text)
+            self._reset()
+            return changed
+        if not chunk:
+            return self.text != previous
+        if len(self._head) < HEAD_BYTES:
+            self._head += chunk[:HEAD_BYTES - len(self._head)]
+        self._offset += len(chunk)
+        self.text += self._decoder.decode(chunk)
+        return not rewritten or self.text != previous
+
+
+class _Inotify:
+    """Minimal ctypes binding for inotify (Linux only)"""
+
+    def __init__(self):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+    def add_watch(self, directory: Path) -> int:
+        wd = self._add_watch(self.fd, os.fsencode(str(directory)), WATCH_MASK)
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {directory}")
+        return wd
+
+    def read_names(self) -> List[Tuple[int, str]]:
+        """Drain pending events; return ``(watch descriptor, file name)`` pairs"""
+        names = []
+        while True:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                return names
+            offset = 0
+            while offset < len(data):
+                wd, _, _, length = EVENT_HEADER.unpack_from(data, offset)
+                offset += EVENT_HEADER.size
+                name = data[offset:offset + length].rstrip(b"\0")
+                offset += length
+                names.append((wd, os.fsdecode(name)))
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class FileTopicWatcher:
+    """Publishes the contents of watched files on the event bus when they change"""
+
+    def __init__(self, files: Dict[str, Union[str, Path]], bus: Optional[EventBus] = None,
+                 use_inotify: bool = True):
+        self.bus = bus or get_event_bus()
+        self._readers = {topic: TailReader(path) for topic, path in files.items()}
+        self._by_name: Dict[Tuple[int, str], str] = {}
+        self._stats: Dict[str, Tuple[int, int]] = {}
+        self._inotify: Optional[_Inotify] = None
+        if use_inotify:
+            try:
+                self._inotify = _Inotify()
+                for topic, reader in self._readers.items():
+                    wd = self._inotify.add_watch(reader.path.parent)
+                    self._by_name[(wd, reader.path.name)] = topic
+            except (OSError, AttributeError) as e:
+                logger.info(f"inotify unavailable, falling back to stat polling: {e}")
+                if self._inotify is not None:
+                    self._inotify.close()
+                self._inotify = None
+
+    def fileno(self) -> Optional[int]:
+        """inotify descriptor to register with a ``QSocketNotifier`` (None when polling)"""
+        return self._inotify.fd if self._inotify is not None else None
+
+    def _publish(self, topic: str) -> None:
+        reader = self._readers[topic]
+        if reader.read() and reader.text != self.bus.latest(topic):
+            self.bus.publish(topic, reader.text)
+
+    def refresh(self) -> None:
+        """Read every file once (e.g. at startup)"""
+        for topic in self._readers:
+            self._publish(topic)
+
+    def process_events(self) -> None:
+        """Handle pending inotify events; call when the descriptor is readable"""
+        changed: Set[str] = set()
+        for key in self._inotify.read_names():
+            topic = self._by_name.get(key)
+            if topic is not None:
+                changed.add(topic)
+        for topic in changed:
+            self._publish(topic)
+
+    def poll(self) -> None:
+        """Fallback: re-read only files whose size or mtime changed"""
+        for topic, reader in self._readers.items():
+            try:
+                st = os.stat(reader.path)
+                signature = (st.st_size, st.st_mtime_ns)
+            except FileNotFoundError:
+                signature = (-1, 0)
+            if self._stats.get(topic) != signature:
+                self._stats[topic] = signature
+                self._publish(topic)
+
+    def close(self) -> None:
+        if self._inotify is not None:
+            self._inotify.close()
+            self._inotify = None
@@ -0,0 +1,234 @@
+"""
+Pooled async HTTP client for JARVIS AI Assistant
+
+``AsyncHTTPClient`` wraps one ``aiohttp`` session, so requests share a
+connection pool (TLS handshakes are paid once per connection, not per
+request). Connections per host are capped at ``HTTP_LIMIT_PER_HOST``. Calls
+retry 503 "model loading" and other transient responses with backoff, always
+within a per-call deadline, and ``post_to_file`` streams the response body to
+disk. Synchronous code runs coroutines on a shared background loop through
+``run_coroutine``.
+
+Benchmark against a local stand-in inference server with::
+
+    python -m backend.http_client --requests 64 --concurrency 16
+"""
+import asyncio
+import logging
+import os
+import random
+import threading
+import time
+from pathlib import Path
+from typing import Any, BinaryIO, Coroutine, Dict, Optional, Union
+
+import aiohttp
+
+from .config import config
+
+logger = logging.getLogger(__name__)
+
+# Responses worth retrying: model still loading, rate limited, gateway hiccups
+RETRY_STATUSES = {429, 502, 503, 504}
+CHUNK_BYTES = 64 * 1024
+
+
+class HTTPError(Exception):
+    """Raised when a request fails with a non-retryable status or runs out of time"""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(f"HTTP {status}: {message}")
+        self.status = status
+
+
+class AsyncHTTPClient:
+    """Shared aiohttp session with per-host limits and deadline-aware retries"""
+
+    def __init__(self, limit_per_host: Optional[int] = None, deadline: Optional[float] = None,
+                 base_backoff: float = 0.5, max_backoff: float = 10.0):
+        self.limit_per_host = limit_per_host or config.HTTP_LIMIT_PER_HOST
+        self.deadline = deadline or config.HTTP_REQUEST_DEADLINE
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        # Created lazily so the session binds to the loop that first uses it
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit_per_host=self.limit_per_host, ttl_dns_cache=300)
+            self._session = aiohttp.ClientSession(connector=connector)
+        return self._session
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def __aenter__(self) -> "AsyncHTTPClient":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def _retry_delay(self, response: Optional[aiohttp.ClientResponse], attempt: int) -> float:
+        delay = min(self.max_backoff, self.base_backoff * 2 ** attempt)
+        if response is not None:
+            retry_after = response.headers.get("Retry-After")
+            if retry_after and retry_after.isdigit():
+                delay = float(retry_after)
+            elif response.status == 503:
+                # Hugging Face reports how long the model needs to load
+                try:
+                    body = await response.json(content_type=None)
+                    delay = float(body.get("estimated_time", delay))
+                except (ValueError, AttributeError, aiohttp.ClientError):
+                    pass
+        return delay * random.uniform(0.8, 1.2)
+
+    async def _request(self, method: str, url: str, deadline: Optional[float],
+                       out: Optional[BinaryIO] = None, **kwargs) -> Union[bytes, int]:
+        """Send a request, retrying until it succeeds or the deadline passes
+
+        With ``out`` (a binary file) the body is streamed into it and the byte
+        count is returned; otherwise the body is returned.
+        """
+        expires = time.monotonic() + (deadline or self.deadline)
+        attempt = 0
+        while True:
+            remaining = expires - time.monotonic()
+            if remaining <= 0:
+                raise HTTPError(504, f"{method} {url} ran out of time after {attempt} attempts")
+            timeout = aiohttp.ClientTimeout(total=remaining)
+            try:
+                async with self.session.request(method, url, timeout=timeout, **kwargs) as response:
+                    if response.status < 400:
+                        if out is None:
+                            return await response.read()
+                        out.seek(0)
+                        out.truncate()  # Drop a body cut off by an earlier attempt
+                        async for chunk in response.content.iter_chunked(CHUNK_BYTES):
+                            out.write(chunk)
+                        return out.tell()
+                    if response.status not in RETRY_STATUSES:
+                        raise HTTPError(response.status, (await response.text())[:200])
+                    delay = await self._retry_delay(response, attempt)
+                    logger.info(f"{method} {url} returned {response.status}, retrying in {delay:.1f}s")
+            except (aiohttp.ClientConnectionError, aiohttp.ClientPayloadError, asyncio.TimeoutError) as e:
+                delay = await self._retry_delay(None, attempt)
+                logger.info(f"{method} {url} failed ({e!r}), retrying in {delay:.1f}s")
+            if delay >= expires - time.monotonic():
+                raise HTTPError(504, f"{method} {url} would retry past its deadline")
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def post(self, url: str, deadline: Optional[float] = None, **kwargs) -> bytes:
+        """POST and return the response body"""
+        return await self._request("POST", url, deadline, **kwargs)
+
+    async def post_to_file(self, url: str, path: Union[str, Path], deadline: Optional[float] = None,
+                           **kwargs) -> Path:
+        """POST and stream the response body to ``path`` (written atomically)"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + ".part")
+        try:
+            with open(tmp_path, "wb") as f:
+                await self._request("POST", url, deadline, out=f, **kwargs)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+        os.replace(tmp_path, path)
+        return path
+
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_http_client: Optional[AsyncHTTPClient] = None
+_http_client_lock = threading.Lock()
+
+
+def _background_loop() -> asyncio.AbstractEventLoop:
+    global _loop
+    if _loop is None:
+        _loop = asyncio.new_event_loop()
+        threading.Thread(target=_loop.run_forever, name="HTTPClientLoop", daemon=True).start()
+    return _loop
+
+
+def get_http_client() -> AsyncHTTPClient:
+    """Return the process-wide client; use it from ``run_coroutine`` coroutines"""
+    global _http_client
+    with _http_client_lock:
+        _background_loop()
+        if _http_client is None:
+            _http_client = AsyncHTTPClient()
+        return _http_client
+
+
+def run_coroutine(coro: Coroutine, timeout: Optional[float] = None) -> Any:
+    """Run ``coro`` on the shared HTTP loop and wait for its result
+
+    Lets synchronous callers on any thread share one connection pool.
+    """
+    with _http_client_lock:
+        loop = _background_loop()
+    return asyncio.run_coroutine_threadsafe(coro, loop).result(timeout)
+
+
+async def _benchmark(args) -> Dict[str, float]:
+    from aiohttp import web
+
+    calls = {"count": 0}
+
+    async def infer(request: web.Request) -> web.StreamResponse:
+        # Stand-in for the inference API: a few "model loading" 503s, then images
+        calls["count"] += 1
+        if calls["count"] <= args.loading:
+            return web.json_response({"error": "Model is currently loading", "estimated_time": 0.05},
+                                     status=503)
+        await request.json()
+        await asyncio.sleep(args.latency)
+        return web.Response(body=os.urandom(args.size), content_type="image/jpeg")
+
+    app = web.Application()
+    app.router.add_post("/infer", infer)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    url = f"http://127.0.0.1:{port}/infer"
+
+    directory = Path(args.directory)
+    results = {}
+    try:
+        async with AsyncHTTPClient(limit_per_host=args.concurrency) as client:
+            started = time.perf_counter()
+            await asyncio.gather(*(
+                client.post_to_file(url, directory / f"bench{i}.jpg", json={"inputs": f"prompt {i}"})
+                for i in range(args.requests)
+            ))
+            elapsed = time.perf_counter() - started
+    finally:
+        await runner.cleanup()
+    for i in range(args.requests):
+        (directory / f"bench{i}.jpg").unlink(missing_ok=True)
+    results["seconds"] = elapsed
+    results["requests_per_second"] = args.requests / elapsed
+    results["megabytes_per_second"] = args.requests * args.size / elapsed / 1e6
+    return results
+
+
+if __name__ == "__main__":
+    import argparse
+    import tempfile
+
+    parser = argparse.ArgumentParser(description="Benchmark AsyncHTTPClient against a local stand-in server")
+    parser.add_argument("--requests", type=int, default=64)
+    parser.add_argument("--concurrency", type=int, default=16, help="Connections per host")
+    parser.add_argument("--latency", type=float, default=0.05, help="Server delay per request (s)")
+    parser.add_argument("--size", type=int, default=512 * 1024, help="Response bytes")
+    parser.add_argument("--loading", type=int, default=4, help="Initial 503 responses")
+    parser.add_argument("--directory", default=tempfile.gettempdir())
+    for key, value in asyncio.run(_benchmark(parser.parse_args())).items():
+        print(f"{key}: {value:.2f}")
@@ -1,86 +1,101 @@
 import asyncio
-from random import randint
+import hashlib
+import uuid
 from PIL import Image
-import requests
 from dotenv import get_key
 import os
 from time import sleep
+from backend.config import config
+from backend.http_client import get_http_client, run_coroutine
+from backend.image_store import get_image_store
+from backend.image_worker import ImageWorkerServer
 
 
-def open_image(prompt):
-    folder_path = r"C:\Users\Rinku\Desktop\jarvis3.0\data"  # Path where images are saved
-    prompt = prompt.replace(" ", "_")  # Ensure spaces in prompt are replaced by underscores for filenames
-
-    # Correct the file naming convention (no space between prompt and number)
-    files = [f"{prompt}{i}.jpg" for i in range(1, 5)]
-
-    for jpg_file in files:
-        image_path = os.path.join(folder_path, jpg_file)
-
+def open_image(image_paths):
+    for image_path in image_paths:
         try:
-            img = Image.open(image_path)
             print(f"Opening image: {image_path}")
-            img.show()
-            sleep(1)
+            if hasattr(os, "startfile"):
+                os.startfile(image_path)  # Native viewer; nothing is decoded here
+            else:
+                Image.open(image_path).show()
 
-        except IOError:
+        except OSError:
             print(f"Unable to open {image_path}")
 
 
-API_URL = "https://api-inference.huggingface.co/models/stabilityai/stable-diffusion-xl-base-1.0"
+MODEL = "stabilityai/stable-diffusion-xl-base-1.0"
+API_URL = f"https://api-inference.huggingface.co/models/{MODEL}"
 headers = {"Authorization": f"Bearer {get_key('.env', 'HuggingFaceAPIKey')}"}
 
 
-async def query(payload):
-    response = await asyncio.to_thread(requests.post, API_URL, headers=headers, json=payload)
-    return response.content
+def variant_seeds(prompt: str, count: int = 4, salt: str = ""):
+    # The same prompt always gets the same seeds, so repeating it is served
+    # from the result cache; a new salt (regenerate) gives new images
+    seeds = []
+    for index in range(count):
+        digest = hashlib.sha256(f"{prompt}\0{salt}\0{index}".encode("utf-8")).digest()
+        seeds.append(int.from_bytes(digest[:4], "big") % 1000000)
+    return seeds
 
 
-async def generate_image(prompt: str):
-    tasks = []
+async def query(payload, image_path):
+    # Streamed to disk through the shared connection pool; 503 "model loading"
+    # responses are retried until the request deadline
+    return await get_http_client().post_to_file(API_URL, image_path, headers=headers, json=payload)
 
-    for _ in range(4):
+
+async def fetch_variant(prompt: str, seed: int):
+    # Each image is remembered under the prompt and the seed it was made with
+    store = get_image_store()
+    digest = store.lookup(MODEL, prompt, seed)
+    if digest is None:
         payload = {
-            "inputs": f"{prompt}, quality=4k, sharpness=maximum, Ultra High details, high resolution, seed={randint(0, 1000000)}"
+            "inputs": f"{prompt}, quality=4k, sharpness=maximum, Ultra High details, high resolution, seed={seed}"
         }
+        incoming = store.incoming_path(f"{uuid.uuid4().hex}.jpg")
+        await query(payload, incoming)
+        digest = await asyncio.to_thread(store.add_file, incoming)
+        store.remember(MODEL, prompt, seed, digest)
+    return digest
 
-        task = asyncio.create_task(query(payload))
-        tasks.append(task)
-
-    image_bytes_list = await asyncio.gather(*tasks)
 
-    # Ensure the Data folder exists
-    folder_path = r"C:\Users\Rinku\Desktop\jarvis3.0\data"
-    os.makedirs(folder_path, exist_ok=True)
-
-    for i, image_bytes in enumerate(image_bytes_list):
-        image_path = os.path.join(folder_path, f"{prompt.replace(' ', '_')}{i + 1}.jpg")
-        with open(image_path, "wb") as f:
-            f.write(image_bytes)
-        print(f"Image saved: {image_path}")
+async def generate_image(prompt: str, on_progress=None, regenerate=False):
+    salt = uuid.uuid4().hex if regenerate else ""
+    tasks = [asyncio.create_task(fetch_variant(prompt, seed)) for seed in variant_seeds(prompt, salt=salt)]
 
+    digests = []
+    for task in asyncio.as_completed(tasks):
+        digests.append(await task)
+        if on_progress is not None:
+            on_progress(len(digests), len(tasks))
 
-def generate_images(prompt: str):
-    asyncio.run(generate_image(prompt))
-    open_image(prompt)
+    return digests
 
 
-# Update the path to your actual file location
-file_path = r"C:\Users\Rinku\Desktop\jarvis3.0\frountend\Files\imagegenration.data"
+def generate_images(prompt: str, on_progress=None, regenerate=False):
+    store = get_image_store()
+    digests = run_coroutine(generate_image(prompt, on_progress, regenerate))
+    # Thumbnails are downscaled in the process pool while the viewer opens
+    thumbnails = [store.thumbnail(digest) for digest in digests]
+    image_paths = [str(store.objects.path_for(digest)) for digest in digests]
+    for image_path in image_paths:
+        print(f"Image saved: {image_path}")
+    open_image(image_paths)
+    return {"paths": image_paths, "thumbnails": [thumbnail.result() for thumbnail in thumbnails]}
 
-while True:
-    try:
-        # Ensure the file exists
-        if not os.path.exists(file_path):
-            os.makedirs(os.path.dirname(file_path), exist_ok=True)
-            with open(file_path, "w") as f:
-                f.write("DefaultPrompt,False")
 
-        # Read and process the file
-        with open(file_path, "r") as f:
-            Data: str = f.read()
+def RunFileWorker(file_path):
+    # Standalone runs (not started by Main.py) still read imagegenration.data
+    while True:
+        try:
+            if not os.path.exists(file_path):
+                os.makedirs(os.path.dirname(file_path), exist_ok=True)
+                with open(file_path, "w") as f:
+                    f.write("DefaultPrompt,False")
 
-            Prompt, Status = Data.strip().split(",")
+            with open(file_path, "r") as f:
+                Prompt, Status = f.read().strip().rsplit(",", 1)
 
             if Status == "True":
                 print("Generating Image...")
@@ -90,8 +105,16 @@ while True:
                     f.write("False,False")
                 break
 
-            else:
-                sleep(1)
+            sleep(1)
+
+        except (OSError, ValueError) as e:
+            print(f"Could not read {file_path}: {e}")
+            sleep(1)
+
 
-    except:
-        pass
+if __name__ == "__main__":
+    if os.environ.get("JARVIS_IMAGE_WORKER_ADDRESS"):
+        # Started by Main.py: serve jobs until Main.py disconnects
+        ImageWorkerServer(generate_images).serve()
+    else:
+        RunFileWorker(str(config.IMAGE_GEN_FILE))
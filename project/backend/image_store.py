@@ -0,0 +1,152 @@
+"""
+Content-addressed image store for JARVIS AI Assistant
+
+Generated images are stored once under their SHA-256 digest, so identical
+outputs are deduplicated and prompts can no longer overwrite each other's
+files. A prompt+seed result cache maps a request to the digest it produced,
+so a repeated request is served from disk without calling the API. Full
+images and thumbnails are kept in ``DiskLRU`` caches bounded by
+``IMAGE_STORE_MAX_MB``. Thumbnails are downscaled with PIL in a process pool,
+so previews never wait on decoding a full-resolution image in the caller.
+"""
+import hashlib
+import logging
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Optional, Union
+
+from .config import config
+from .disk_cache import DiskLRU
+
+logger = logging.getLogger(__name__)
+
+HASH_CHUNK_BYTES = 1024 * 1024
+
+
+def file_digest(path: Union[str, Path]) -> str:
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_BYTES), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def make_thumbnail(source: str, target: str, size: int) -> str:
+    """Downscale ``source`` into a JPEG at ``target`` (runs in a worker process)"""
+    from PIL import Image
+
+    with Image.open(source) as image:
+        # JPEG draft mode decodes at a reduced scale, skipping most of the work
+        image.draft("RGB", (size, size))
+        image.thumbnail((size, size))
+        tmp_target = target + ".part"
+        image.convert("RGB").save(tmp_target, "JPEG", quality=85)
+    os.replace(tmp_target, target)
+    return target
+
+
+class ImageStore:
+    """Deduplicated image files, a prompt+seed result cache and thumbnails"""
+
+    def __init__(self, root: Optional[Union[str, Path]] = None, max_bytes: Optional[int] = None,
+                 thumbnail_size: Optional[int] = None, workers: Optional[int] = None):
+        self.root = Path(root or config.IMAGE_STORE_DIR)
+        max_bytes = max_bytes or config.IMAGE_STORE_MAX_MB * 1024 * 1024
+        self.thumbnail_size = thumbnail_size or config.IMAGE_THUMBNAIL_SIZE
+        self.objects = DiskLRU(self.root / "objects", max_bytes, suffix=".jpg", hash_keys=False)
+        # Thumbnails and result entries are small; a tenth of the budget is plenty
+        self.thumbnails = DiskLRU(self.root / "thumbnails", max_bytes // 10, suffix=".jpg")
+        self.results = DiskLRU(self.root / "results", max_bytes // 10, suffix=".ref")
+        self.incoming = self.root / "incoming"
+        self.incoming.mkdir(parents=True, exist_ok=True)
+        self._workers = workers or config.IMAGE_THUMBNAIL_WORKERS
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+
+    @staticmethod
+    def result_key(model: str, prompt: str, seed: int) -> str:
+        return f"{model}\0{prompt}\0{seed}"
+
+    def incoming_path(self, name: str) -> Path:
+        """Scratch path to download into before ``add_file``"""
+        return self.incoming / name
+
+    def add_file(self, path: Union[str, Path]) -> str:
+        """Move a downloaded image into the store; return its digest"""
+        digest = file_digest(path)
+        if self.objects.get(digest) is not None:
+            os.unlink(path)  # Same bytes already stored
+        else:
+            self.objects.put_file(digest, path)
+        return digest
+
+    def path(self, digest: str) -> Optional[Path]:
+        return self.objects.get(digest)
+
+    def remember(self, model: str, prompt: str, seed: int, digest: str) -> None:
+        self.results.put_bytes(self.result_key(model, prompt, seed), digest.encode("ascii"))
+
+    def lookup(self, model: str, prompt: str, seed: int) -> Optional[str]:
+        """Digest of the image produced for this request, if it is still stored"""
+        key = self.result_key(model, prompt, seed)
+        data = self.results.get_bytes(key)
+        if data is None:
+            return None
+        digest = data.decode("ascii")
+        if self.objects.get(digest) is None:
+            self.results.discard(key)  # The image itself was evicted
+            return None
+        return digest
+
+    def _thumbnail_pool(self) -> ProcessPoolExecutor:
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self._workers)
+            return self._pool
+
+    def thumbnail(self, digest: str) -> Future:
+        """Future for the thumbnail path; generated in the process pool on a miss"""
+        key = f"{digest}@{self.thumbnail_size}"
+        cached = self.thumbnails.get(key)
+        if cached is not None:
+            future: Future = Future()
+            future.set_result(str(cached))
+            return future
+        source = self.objects.path_for(digest)
+        target = self.thumbnails.path_for(key)
+        target.parent.mkdir(exist_ok=True)
+        future = self._thumbnail_pool().submit(make_thumbnail, str(source), str(target), self.thumbnail_size)
+
+        def register(done: Future) -> None:
+            if done.exception() is None:
+                self.thumbnails.put_file(key, target)
+            else:
+                logger.warning(f"Thumbnail for {digest} failed: {done.exception()}")
+
+        future.add_done_callback(register)
+        return future
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        return {"objects": self.objects.stats(), "thumbnails": self.thumbnails.stats(),
+                "results": self.results.stats()}
+
+    def close(self) -> None:
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=True)
+                self._pool = None
+
+
+_image_store: Optional[ImageStore] = None
+_image_store_lock = threading.Lock()
+
+
+def get_image_store() -> ImageStore:
+    """Return the process-wide image store, creating it on first use"""
+    global _image_store
+    with _image_store_lock:
+        if _image_store is None:
+            _image_store = ImageStore()
+        return _image_store
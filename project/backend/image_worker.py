@@ -0,0 +1,238 @@
+"""
+Long-lived image generation worker service for JARVIS AI Assistant
+
+Main.py used to start a fresh interpreter per image request. The worker is
+now started once and serves jobs over a ``multiprocessing.connection``
+channel (a Unix socket, or a named pipe on Windows) whose name includes the
+client's PID and a random suffix, so several assistants never collide, and
+which is authenticated with a per-run key. A shared-memory ``ControlBlock`` (backend/shm.py) is passed down
+too: the worker keeps a snapshot of its queue on the ``status`` channel, which
+the client reads without a round trip. ``ImageWorkerServer`` runs up to ``IMAGE_WORKER_CONCURRENCY``
+jobs at once and streams ``queued``/``running``/``done``/``failed`` events
+back; ``ImageWorkerClient`` spawns the worker, submits jobs and forwards those
+events to the event bus.
+"""
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing.connection import Client, Connection, Listener
+from typing import Any, Callable, Dict, List, Optional
+
+from .config import config
+from .events import IMAGE_STATUS, get_event_bus
+from .shm import ControlBlock
+
+logger = logging.getLogger(__name__)
+
+ENV_ADDRESS = "JARVIS_IMAGE_WORKER_ADDRESS"
+ENV_AUTHKEY = "JARVIS_IMAGE_WORKER_KEY"
+
+# handler(prompt, progress, **options) -> result fields for the "done" event;
+# progress(done, total), options as given to ImageWorkerClient.submit
+JobHandler = Callable[..., Dict[str, Any]]
+EventCallback = Callable[[Dict[str, Any]], None]
+
+
+def _unique_name() -> str:
+    return f"jarvis-image-worker-{os.getpid()}-{os.urandom(4).hex()}"
+
+
+def unique_address() -> str:
+    """A fresh address for one worker, named after this process"""
+    name = _unique_name()
+    if sys.platform == "win32":
+        return f"\\\\.\\pipe\\{name}"
+    # The temp dir keeps the path well inside the Unix socket length limit
+    return os.path.join(tempfile.gettempdir(), f"{name}.sock")
+
+
+class ImageWorkerServer:
+    """Accepts image jobs and runs them on a bounded thread pool"""
+
+    def __init__(self, handler: JobHandler, address: Optional[str] = None,
+                 authkey: Optional[bytes] = None, concurrency: Optional[int] = None):
+        self.handler = handler
+        self.address = address or os.environ.get(ENV_ADDRESS)
+        if not self.address:
+            raise ValueError(f"No image worker address: pass one or set {ENV_ADDRESS}")
+        if authkey is None and os.environ.get(ENV_AUTHKEY):
+            authkey = bytes.fromhex(os.environ[ENV_AUTHKEY])
+        self.authkey = authkey
+        self.concurrency = max(1, concurrency or config.IMAGE_WORKER_CONCURRENCY)
+        self._executor = ThreadPoolExecutor(self.concurrency, thread_name_prefix="ImageJob")
+        self.control = ControlBlock.from_env()
+        self._status_lock = threading.Lock()
+        self._queued = 0
+        self._running: Dict[int, Dict[str, int]] = {}
+
+    def _publish_status(self, event: Dict[str, Any]) -> None:
+        if self.control is None:
+            return
+        with self._status_lock:
+            job, state = event["job"], event["state"]
+            if state == "queued":
+                self._queued += 1
+            elif state == "running":
+                if job not in self._running:
+                    self._queued -= 1
+                self._running[job] = {"done": event["done"], "total": event["total"]}
+            else:
+                self._running.pop(job, None)
+            self.control.publish("status", {"queued": self._queued,
+                                            "running": {str(j): p for j, p in self._running.items()}})
+
+    def serve(self) -> None:
+        """Serve the process that started the worker until it disconnects"""
+        if not self.address.startswith("\\\\") and os.path.exists(self.address):
+            os.unlink(self.address)  # Stale socket from a worker that was killed
+        with Listener(self.address, authkey=self.authkey) as listener:
+            logger.info(f"Image worker listening on {self.address} ({self.concurrency} concurrent jobs)")
+            conn = listener.accept()
+        send_lock = threading.Lock()
+
+        def send(event: Dict[str, Any]) -> None:
+            self._publish_status(event)
+            with send_lock:
+                try:
+                    conn.send(event)
+                except OSError:
+                    pass  # Client went away; the job result is still on disk
+
+        try:
+            while True:
+                try:
+                    request = conn.recv()
+                except (EOFError, OSError):
+                    break
+                if request.get("op") == "close":
+                    break
+                if request.get("op") == "generate":
+                    send({"job": request["job"], "state": "queued"})
+                    self._executor.submit(self._run_job, request["job"], request["prompt"],
+                                          request.get("options", {}), send)
+        finally:
+            # Queued jobs still run to completion before the worker exits
+            self._executor.shutdown(wait=True)
+            conn.close()
+            if self.control is not None:
+                self.control.close()
+
+    def _run_job(self, job: int, prompt: str, options: Dict[str, Any], send: EventCallback) -> None:
+        send({"job": job, "state": "running", "done": 0, "total": 0})
+
+        def progress(done: int, total: int) -> None:
+            send({"job": job, "state": "running", "done": done, "total": total})
+
+        started = time.perf_counter()
+        try:
+            result = self.handler(prompt, progress, **options)
+        except Exception as e:
+            logger.error(f"Image job {job} failed: {e}")
+            send({"job": job, "state": "failed", "error": str(e)})
+            return
+        elapsed = time.perf_counter() - started
+        send({**result, "job": job, "state": "done", "seconds": round(elapsed, 2)})
+
+
+class ImageWorkerClient:
+    """Starts the image worker on first use and submits jobs to it"""
+
+    def __init__(self, command: List[str], on_event: Optional[EventCallback] = None,
+                 address: Optional[str] = None, connect_timeout: float = 30.0,
+                 cwd: Optional[str] = None):
+        self.command = command
+        # ``python -m backend...`` finds the package relative to this directory
+        self.cwd = cwd
+        self.on_event = on_event
+        # A fixed address is reused; otherwise every worker start gets its own
+        self.fixed_address = address
+        self.address: Optional[str] = address
+        self.connect_timeout = connect_timeout
+        self.process: Optional[subprocess.Popen] = None
+        self._conn: Optional[Connection] = None
+        self.control: Optional[ControlBlock] = None
+        self._lock = threading.Lock()
+        self._next_job = 0
+
+    def _start(self) -> None:
+        authkey = os.urandom(16)
+        self.address = self.fixed_address or unique_address()
+        self._close_control()
+        self.control = ControlBlock(os.path.join(tempfile.gettempdir(), f"{_unique_name()}.shm"), create=True)
+        env = {**os.environ, **self.control.child_env(), ENV_ADDRESS: self.address, ENV_AUTHKEY: authkey.hex()}
+        self.process = subprocess.Popen(self.command, env=env, cwd=self.cwd,
+                                        pass_fds=self.control.child_fds())
+        deadline = time.monotonic() + self.connect_timeout
+        while True:
+            try:
+                self._conn = Client(self.address, authkey=authkey)
+                break
+            except (FileNotFoundError, ConnectionRefusedError):
+                # Worker still importing; connecting fails until it listens
+                if self.process.poll() is not None or time.monotonic() > deadline:
+                    raise RuntimeError("Image worker did not start")
+                time.sleep(0.05)
+        threading.Thread(target=self._read_events, args=(self._conn,),
+                         name="ImageWorkerEvents", daemon=True).start()
+
+    def _read_events(self, conn: Connection) -> None:
+        bus = get_event_bus()
+        while True:
+            try:
+                event = conn.recv()
+            except (EOFError, OSError):
+                conn.close()
+                return
+            bus.publish(IMAGE_STATUS, event)
+            if self.on_event is not None:
+                try:
+                    self.on_event(event)
+                except Exception as e:
+                    logger.error(f"Image event callback failed: {e}")
+
+    def _close_control(self) -> None:
+        if self.control is not None:
+            self.control.close()
+            try:
+                os.unlink(self.control.path)
+            except OSError:
+                pass
+            self.control = None
+
+    def status(self) -> Dict[str, Any]:
+        """The worker's queue as last published: ``{"queued", "running": {job: progress}}``"""
+        control = self.control
+        if control is None:
+            return {"queued": 0, "running": {}}
+        try:
+            value = control.read("status")[1]
+        except (TimeoutError, ValueError):
+            value = None
+        return value or {"queued": 0, "running": {}}
+
+    def submit(self, prompt: str, **options: Any) -> int:
+        """Queue ``prompt`` on the worker, starting it if needed; return the job id"""
+        with self._lock:
+            if self._conn is None or self.process.poll() is not None:
+                self._start()
+            self._next_job += 1
+            self._conn.send({"op": "generate", "job": self._next_job, "prompt": prompt, "options": options})
+            return self._next_job
+
+    def close(self) -> None:
+        """Ask the worker to finish queued jobs and exit"""
+        with self._lock:
+            if self._conn is not None:
+                # The event reader owns the connection and closes it once the
+                # worker hangs up
+                try:
+                    self._conn.send({"op": "close"})
+                except OSError:
+                    pass
+                self._conn = None
+            self._close_control()
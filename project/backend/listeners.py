@@ -0,0 +1,34 @@
+"""
+Chat turn listeners for JARVIS AI Assistant
+
+The chat log stores and the in-memory conversation all tell subscribers about
+newly recorded turns the same way; ``TurnListenerMixin`` holds that code.
+"""
+import logging
+from typing import Any, Callable, Dict, List
+
+logger = logging.getLogger(__name__)
+
+TurnListener = Callable[[List[Dict[str, Any]]], None]
+
+
+class TurnListenerMixin:
+    """``add_listener``/``_notify`` for classes that record chat turns
+
+    Subclasses set ``self._listeners = []`` in ``__init__`` and call
+    ``_notify(records)`` once turns are recorded.
+    """
+
+    _listeners: List[TurnListener]
+
+    def add_listener(self, callback: TurnListener) -> None:
+        """Call ``callback(records)`` whenever turns are recorded"""
+        self._listeners.append(callback)
+
+    def _notify(self, records: List[Dict[str, Any]]) -> None:
+        # A failing listener (e.g. an index) must never lose the turns it was sent
+        for callback in self._listeners:
+            try:
+                callback(records)
+            except Exception as e:
+                logger.error(f"{type(self).__name__} listener {callback!r} failed: {e}")
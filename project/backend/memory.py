@@ -0,0 +1,148 @@
+"""
+Local retrieval memory over chat history for JARVIS AI Assistant
+
+Every chat turn is embedded as a sparse hashed n-gram vector (word unigrams
+and bigrams, sublinear term frequency) and stored in an inverted layout:
+one posting array per hashed feature. A query scores its rarest features
+first (they carry the most IDF weight) and stops once a fixed postings budget
+is used, so lookup cost stays flat as the history grows and no network
+embedding model is needed.
+"""
+import logging
+import math
+import threading
+import zlib
+from array import array
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+import numpy as np
+
+from .config import config
+from .turn_index import TurnIndex, attach_to_chat_log, tokenize
+
+logger = logging.getLogger(__name__)
+
+FEATURE_BITS = 20
+FEATURE_MASK = (1 << FEATURE_BITS) - 1
+
+
+def hashed_features(text: str) -> Dict[int, float]:
+    """Map ``text`` to ``{hashed feature: 1 + log(tf)}``"""
+    tokens = tokenize(text)
+    grams = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+    counts = Counter(zlib.crc32(gram.encode("utf-8")) & FEATURE_MASK for gram in grams)
+    return {feature: 1.0 + math.log(count) for feature, count in counts.items()}
+
+
+class RetrievalMemory(TurnIndex):
+    """Incremental sparse vector index over chat turns"""
+
+    label = "retrieval memory"
+
+    def __init__(self, index_file: Optional[Union[str, Path]] = None,
+                 max_postings: int = 8192):
+        self.max_postings = max_postings
+        super().__init__(index_file or config.MEMORY_INDEX_FILE)
+
+    def _reset(self) -> None:
+        self._norms = array("f")
+        self._postings: Dict[int, array] = {}
+        self._weights: Dict[int, array] = {}
+
+    def _index_turn(self, doc: int, turn: Dict[str, Any]) -> bool:
+        features = hashed_features(str(turn.get("content", "")))
+        if not features:
+            return False
+        self._norms.append(math.sqrt(sum(w * w for w in features.values())))
+        for feature, weight in features.items():
+            postings = self._postings.get(feature)
+            if postings is None:
+                postings = self._postings[feature] = array("i")
+                self._weights[feature] = array("f")
+            postings.append(doc)
+            self._weights[feature].append(weight)
+        return True
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+    def search(self, query: str, k: int = 5,
+               before_id: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Return ``[{"id", "score"}]`` for the ``k`` most similar turns
+
+        ``before_id`` restricts results to older turns, e.g. to skip turns
+        that are already in the prompt's recent window.
+        """
+        features = hashed_features(query)
+        with self._lock:
+            total = len(self._turn_ids)
+            if not features or not total:
+                return []
+            matched = sorted(
+                (len(self._postings[feature]), feature, query_weight)
+                for feature, query_weight in features.items() if feature in self._postings
+            )
+            docs, weights, used = [], [], 0
+            for df, feature, query_weight in matched:
+                if used and used + df > self.max_postings:
+                    break
+                idf = math.log(1 + total / df)
+                docs.append(np.frombuffer(self._postings[feature], dtype=np.int32))
+                weights.append(np.frombuffer(self._weights[feature], dtype=np.float32)
+                               * np.float32(query_weight * idf * idf))
+                used += df
+            if not docs:
+                return []
+            docs = np.concatenate(docs)
+            weights = np.concatenate(weights)
+            candidates, inverse = np.unique(docs, return_inverse=True)
+            # Index with copies so no buffer views outlive the lock
+            norms = np.frombuffer(self._norms, dtype=np.float32)[candidates]
+            candidate_ids = np.frombuffer(self._turn_ids, dtype=np.int64)[candidates]
+
+        scores = np.bincount(inverse, weights=weights) / norms
+        if before_id is not None:
+            scores[candidate_ids >= before_id] = 0.0
+        k = min(k, len(candidates))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [{"id": int(candidate_ids[i]), "score": float(scores[i])} for i in top if scores[i] > 0]
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+    def _arrays(self) -> Dict[str, np.ndarray]:
+        features = np.fromiter(self._postings.keys(), dtype=np.int64, count=len(self._postings))
+        lengths = np.array([len(self._postings[f]) for f in features.tolist()], dtype=np.int64)
+        indptr = np.concatenate(([0], np.cumsum(lengths)))
+        docs = np.concatenate([np.frombuffer(self._postings[f], dtype=np.int32)
+                               for f in features.tolist()]) if len(features) else np.empty(0, np.int32)
+        weights = np.concatenate([np.frombuffer(self._weights[f], dtype=np.float32)
+                                  for f in features.tolist()]) if len(features) else np.empty(0, np.float32)
+        return {"norms": np.frombuffer(self._norms, dtype=np.float32),
+                "features": features, "indptr": indptr, "docs": docs, "weights": weights}
+
+    def _restore(self, data: Any) -> None:
+        self._norms = array("f", data["norms"].astype(np.float32).tobytes())
+        indptr = data["indptr"]
+        docs = data["docs"].astype(np.int32)
+        weights = data["weights"].astype(np.float32)
+        for i, feature in enumerate(data["features"].tolist()):
+            start, stop = indptr[i], indptr[i + 1]
+            self._postings[feature] = array("i", docs[start:stop].tobytes())
+            self._weights[feature] = array("f", weights[start:stop].tobytes())
+
+
+_memory: Optional[RetrievalMemory] = None
+_memory_lock = threading.Lock()
+
+
+def get_memory(chat_log=None) -> RetrievalMemory:
+    """Return the process-wide retrieval memory, kept in sync with ``chat_log``"""
+    global _memory
+    with _memory_lock:
+        if _memory is None:
+            _memory = attach_to_chat_log(RetrievalMemory(), chat_log)
+        return _memory
@@ -0,0 +1,158 @@
+"""
+Compact chat message records for JARVIS AI Assistant
+
+``Message`` replaces the per-turn ``{"id", "role", "content", "timestamp"}``
+dicts: it uses ``__slots__`` (no per-instance dict), interns the role string
+and still behaves as a read-only mapping, so ``turn["content"]`` and
+``turn.get("id")`` keep working. ``encode_messages``/``decode_messages``
+provide a length-prefixed binary format for batches of turns, and the
+``to_*`` helpers convert at the LLM-call boundary.
+"""
+import json
+import struct
+import sys
+from array import array
+from collections.abc import Mapping
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+FIELDS = ("id", "role", "content", "timestamp")
+
+BINARY_MAGIC = b"JMB1"
+# Batch header after the magic: turn count, byte length of the role table
+BINARY_HEADER = struct.Struct("<II")
+
+# Cohere's chat_history uses its own role names
+COHERE_ROLES = {"user": "USER", "assistant": "CHATBOT", "system": "SYSTEM"}
+
+
+class Message(Mapping):
+    """One chat turn"""
+
+    __slots__ = FIELDS
+
+    def __init__(self, id: int, role: str, content: str, timestamp: Optional[str] = None):
+        self.id = id
+        self.role = sys.intern(role)
+        self.content = content
+        self.timestamp = timestamp or datetime.now().isoformat()
+
+    @classmethod
+    def from_dict(cls, data: Mapping) -> "Message":
+        """Build a message from a stored or legacy dict"""
+        if isinstance(data, Message):
+            return data
+        return cls(data.get("id", 0), data["role"], data.get("content", ""), data.get("timestamp"))
+
+    # Mapping interface, so code written against dict records keeps working
+    def __getitem__(self, key: str) -> Any:
+        if key in FIELDS:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(FIELDS)
+
+    def __len__(self) -> int:
+        return len(FIELDS)
+
+    def __repr__(self) -> str:
+        return f"Message(id={self.id!r}, role={self.role!r}, content={self.content!r}, timestamp={self.timestamp!r})"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"id": self.id, "role": self.role, "content": self.content, "timestamp": self.timestamp}
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), ensure_ascii=False)
+
+    def to_prompt(self) -> Dict[str, str]:
+        """Chat completion (Groq/OpenAI style) message"""
+        return {"role": self.role, "content": self.content}
+
+    def to_cohere(self) -> Dict[str, str]:
+        """Cohere ``chat_history`` entry"""
+        return {"role": COHERE_ROLES.get(self.role, self.role.upper()), "message": self.content}
+
+
+def to_prompt_messages(messages: Iterable[Mapping]) -> List[Dict[str, str]]:
+    """Convert turns to the ``messages`` list chat completion APIs expect"""
+    return [{"role": m["role"], "content": m["content"]} for m in messages]
+
+
+def to_cohere_history(messages: Iterable[Mapping]) -> List[Dict[str, str]]:
+    """Convert turns to Cohere's ``chat_history`` format"""
+    return [Message.from_dict(m).to_cohere() for m in messages]
+
+
+def _column(typecode: str, data: bytes, offset: int, count: int) -> array:
+    column = array(typecode)
+    column.frombytes(data[offset:offset + count * column.itemsize])
+    if sys.byteorder == "big":
+        column.byteswap()
+    return column
+
+
+def _column_bytes(column: array) -> bytes:
+    if sys.byteorder == "big":
+        column = array(column.typecode, column)
+        column.byteswap()
+    return column.tobytes()
+
+
+def encode_messages(messages: Iterable[Mapping]) -> bytes:
+    """Serialize turns as columns: ids, role codes, text lengths, then text
+
+    Numbers are little-endian; lengths count characters of one UTF-8 text
+    blob holding every content and timestamp, so decoding is one
+    ``bytes.decode`` plus slicing.
+    """
+    roles: Dict[str, int] = {}
+    ids, role_codes = array("q"), array("B")
+    content_lengths, timestamp_lengths = array("I"), array("I")
+    texts = []
+    for message in messages:
+        ids.append(message["id"])
+        role_codes.append(roles.setdefault(message["role"], len(roles)))
+        content, timestamp = str(message["content"]), str(message["timestamp"])
+        content_lengths.append(len(content))
+        timestamp_lengths.append(len(timestamp))
+        texts.append(content)
+        texts.append(timestamp)
+    role_table = "\n".join(roles).encode("utf-8")
+    return b"".join([
+        BINARY_MAGIC,
+        BINARY_HEADER.pack(len(ids), len(role_table)),
+        role_table,
+        _column_bytes(ids), _column_bytes(role_codes),
+        _column_bytes(content_lengths), _column_bytes(timestamp_lengths),
+        "".join(texts).encode("utf-8"),
+    ])
+
+
+def decode_messages(data: bytes) -> List[Message]:
+    """Inverse of ``encode_messages``"""
+    if not data.startswith(BINARY_MAGIC):
+        raise ValueError("Not an encoded message batch")
+    count, role_bytes = BINARY_HEADER.unpack_from(data, len(BINARY_MAGIC))
+    offset = len(BINARY_MAGIC) + BINARY_HEADER.size
+    roles = [sys.intern(role) for role in data[offset:offset + role_bytes].decode("utf-8").split("\n")]
+    offset += role_bytes
+    ids = _column("q", data, offset, count)
+    offset += count * ids.itemsize
+    role_codes = _column("B", data, offset, count)
+    offset += count * role_codes.itemsize
+    content_lengths = _column("I", data, offset, count)
+    offset += count * content_lengths.itemsize
+    timestamp_lengths = _column("I", data, offset, count)
+    offset += count * timestamp_lengths.itemsize
+    text = data[offset:].decode("utf-8")
+
+    messages = []
+    position = 0
+    for i in range(count):
+        content_end = position + content_lengths[i]
+        timestamp_end = content_end + timestamp_lengths[i]
+        messages.append(Message(ids[i], roles[role_codes[i]], text[position:content_end],
+                                text[content_end:timestamp_end]))
+        position = timestamp_end
+    return messages
@@ -1,6 +1,7 @@
 import cohere
 from rich import print
 from dotenv import dotenv_values
+from backend.message import Message, to_cohere_history
 
 # Load environment variables
 env_vars = dotenv_values(".env")
@@ -18,8 +19,6 @@ funcs = [
     "youtube search", "reminder"
 ]
 
-messages = []
-
 preamble = """
 You are a very accurate Decision-Making Model, which decides what kind of query is given to you.
 You will decide whether a query is a 'general' query, a 'realtime' query, or is asking to perform any task or automation like 'open facebook, instagram', 'can you write an application and open it in notepad'.
@@ -118,33 +117,34 @@ You will decide whether a query is a 'general' query, a 'realtime' query, or is
 -> Do not answer the query, just classify it as one of the above categories.
 """
 
-# Chat history to simulate conversation
+# Few-shot examples for the classifier, kept as compact Message records
 ChatHistory = [
-    {"role": "user", "message": "how are you?"},
-    {"role": "Chatbot", "message": "general how are you?"},
-    {"role": "user", "message": "do you like pizza?"},
-    {"role": "Chatbot", "message": "general do you like pizza."},
-    {"role": "user", "message": "open chrome and tell me about Mahatma Gandhi."},
-    {"role": "Chatbot", "message": "open chrome general tell me about Mahatma Gandhi."},
-    {"role": "user", "message": "open chrome and firefox"},
-    {"role": "Chatbot", "message": "open chrome, open firefox."},
-    {"role": "user", "message": "what is today's date and remind me that I have a dancing performance on 5th Aug at 11pm"},
-    {"role": "Chatbot", "message": "general what is today's date, reminder 11:00pm 5th Aug dancing performance"},
-    {"role": "user", "message": "chat with me."},
-    {"role": "Chatbot", "message": "general chat with me."}
+    Message(0, "user", "how are you?"),
+    Message(0, "assistant", "general how are you?"),
+    Message(0, "user", "do you like pizza?"),
+    Message(0, "assistant", "general do you like pizza."),
+    Message(0, "user", "open chrome and tell me about Mahatma Gandhi."),
+    Message(0, "assistant", "open chrome general tell me about Mahatma Gandhi."),
+    Message(0, "user", "open chrome and firefox"),
+    Message(0, "assistant", "open chrome, open firefox."),
+    Message(0, "user", "what is today's date and remind me that I have a dancing performance on 5th Aug at 11pm"),
+    Message(0, "assistant", "general what is today's date, reminder 11:00pm 5th Aug dancing performance"),
+    Message(0, "user", "chat with me."),
+    Message(0, "assistant", "general chat with me.")
 ]
 
+# Converted once to the format Cohere's chat_history expects
+CohereChatHistory = to_cohere_history(ChatHistory)
+
 
 # Define the first layer DMM function
 def FirstlayerDMM(prompt: str):
-    messages.append({"role": "user", "content": f"{prompt}"})
-
     # Stream the response from Cohere's API
     stream = co.chat_stream(
         model='command-r-plus',
         message=prompt,
         temperature=0.7,
-        chat_history=ChatHistory,
+        chat_history=CohereChatHistory,
         prompt_truncation='OFF',  
         connectors=[],
         preamble=preamble
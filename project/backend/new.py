@@ -1,13 +1,11 @@
 import os
 import time
-from selenium.webdriver.chrome.service import Service
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
 from dotenv import dotenv_values
+from backend.events import get_event_bus, ASSISTANT_STATUS
+from backend.browser import get_recognizer_browser
 import stranslate as mt
 import noisereduce as nr
 import soundfile as sf
@@ -73,22 +71,13 @@ with open(os.path.join(output_dir, "Voice.html"), "w") as f:
 current_dir = os.getcwd()
 Link = f"{current_dir}/Data/voice/Voice.html"
 
-# Configure Chrome options
-chrome_options = Options()
-user_agent = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/89.8.142.06 Safari/537.36"
-chrome_options.add_argument(f"user-agent={user_agent}")
-chrome_options.add_argument("--use-fake-ui-for-media-stream")
-chrome_options.add_argument("--headless=new")
-
-# Initialize the WebDriver
-service = Service(ChromeDriverManager().install())
-driver = webdriver.Chrome(service=service, options=chrome_options)
+# Headless Chrome is started on first use (or by a prewarm), not on import
+browser = get_recognizer_browser()
 
 TempDirpath = rf"{current_dir}/Frontend/Files"
 
 def SetAssistantStatus(Status):
-    with open(rf'{TempDirpath}/Status.data', "w", encoding='utf-8') as file:
-        file.write(Status)
+    get_event_bus().publish(ASSISTANT_STATUS, Status)
 
 def QueryModifier(Query):
     new_query = Query.lower().strip()
@@ -134,6 +123,7 @@ def speech_recognition_with_retries(max_attempts=3):
     """Perform speech recognition with multiple attempts and error handling."""
     for attempt in range(max_attempts):
         try:
+            driver = browser.get()
             driver.get("file:///" + Link)
 
             # Wait for the start button to be visible
@@ -0,0 +1,266 @@
+"""
+Full-text search over chat history for JARVIS AI Assistant
+
+A positional inverted index over chat turns: for every term it keeps the turns
+containing it and the token positions inside each turn. Queries are ranked
+with BM25, quoted phrases must match exactly, and results can be restricted by
+time range and role. The index is updated as turns are recorded and saved
+next to the chat log, so searching years of history never scans the log.
+"""
+import logging
+import math
+import re
+import threading
+from array import array
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+from .config import config
+from .turn_index import TurnIndex, attach_to_chat_log, tokenize  # noqa: F401  (tokenize re-exported)
+
+logger = logging.getLogger(__name__)
+
+PHRASE_PATTERN = re.compile(r'"([^"]+)"')
+
+ROLES = {"user": 0, "assistant": 1}
+OTHER_ROLE = 2
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+TimeArg = Union[str, datetime, None]
+
+
+def _to_epoch(value: Union[str, datetime]) -> float:
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    return value.timestamp()
+
+
+class _Postings:
+    """Turns containing one term, with the term's positions in each turn"""
+
+    __slots__ = ("docs", "starts", "positions")
+
+    def __init__(self):
+        self.docs = array("i")
+        self.starts = array("i")
+        self.positions = array("i")
+
+    def add(self, doc: int, positions: List[int]) -> None:
+        self.docs.append(doc)
+        self.starts.append(len(self.positions))
+        self.positions.extend(positions)
+
+    def term_frequencies(self) -> np.ndarray:
+        starts = np.frombuffer(self.starts, dtype=np.int32)
+        return np.diff(np.append(starts, len(self.positions))).astype(np.float64)
+
+    def positions_of(self, doc: int) -> List[int]:
+        i = int(np.searchsorted(np.frombuffer(self.docs, dtype=np.int32), doc))
+        if i >= len(self.docs) or self.docs[i] != doc:
+            return []
+        stop = self.starts[i + 1] if i + 1 < len(self.starts) else len(self.positions)
+        return self.positions[self.starts[i]:stop].tolist()
+
+
+class SearchIndex(TurnIndex):
+    """Persistent positional inverted index over chat turns"""
+
+    label = "search index"
+
+    def __init__(self, index_file: Optional[Union[str, Path]] = None):
+        super().__init__(index_file or config.SEARCH_INDEX_FILE)
+
+    def _reset(self) -> None:
+        self._lengths = array("i")
+        self._times = array("d")
+        self._roles = array("b")
+        self._terms: Dict[str, _Postings] = {}
+        self._total_length = 0
+
+    def _index_turn(self, doc: int, turn: Dict[str, Any]) -> bool:
+        tokens = tokenize(str(turn.get("content", "")))
+        positions: Dict[str, List[int]] = {}
+        for position, token in enumerate(tokens):
+            positions.setdefault(token, []).append(position)
+        for term, term_positions in positions.items():
+            postings = self._terms.get(term)
+            if postings is None:
+                postings = self._terms[term] = _Postings()
+            postings.add(doc, term_positions)
+        try:
+            timestamp = _to_epoch(turn["timestamp"])
+        except (KeyError, TypeError, ValueError):
+            timestamp = 0.0
+        self._lengths.append(len(tokens))
+        self._times.append(timestamp)
+        self._roles.append(ROLES.get(turn.get("role"), OTHER_ROLE))
+        self._total_length += len(tokens)
+        return True
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+    def search(self, query: str, limit: int = 10, since: TimeArg = None,
+               until: TimeArg = None, role: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Return ``[{"id", "score"}]`` for the best matching turns
+
+        Terms are ranked with BM25; ``"quoted phrases"`` must appear in the
+        turn verbatim. ``since``/``until`` (ISO strings or datetimes) bound
+        the turn timestamp and ``role`` keeps only that speaker's turns.
+        """
+        phrases = [tokenize(p) for p in PHRASE_PATTERN.findall(query)]
+        phrases = [p for p in phrases if p]
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return []
+
+        with self._lock:
+            total = len(self._turn_ids)
+            if not total:
+                return []
+            average_length = self._total_length / total or 1.0
+            lengths = np.frombuffer(self._lengths, dtype=np.int32)
+            docs, scores = [], []
+            for term in terms:
+                postings = self._terms.get(term)
+                if postings is None:
+                    if any(term in phrase for phrase in phrases):
+                        return []
+                    continue
+                term_docs = np.frombuffer(postings.docs, dtype=np.int32).copy()
+                tf = postings.term_frequencies()
+                df = len(term_docs)
+                idf = math.log(1 + (total - df + 0.5) / (df + 0.5))
+                norm = K1 * (1 - B + B * lengths[term_docs] / average_length)
+                docs.append(term_docs)
+                scores.append(idf * tf * (K1 + 1) / (tf + norm))
+            if not docs:
+                return []
+            candidates, inverse = np.unique(np.concatenate(docs), return_inverse=True)
+            totals = np.bincount(inverse, weights=np.concatenate(scores))
+
+            keep = np.ones(len(candidates), dtype=bool)
+            if since is not None:
+                keep &= np.frombuffer(self._times, dtype=np.float64)[candidates] >= _to_epoch(since)
+            if until is not None:
+                keep &= np.frombuffer(self._times, dtype=np.float64)[candidates] < _to_epoch(until)
+            if role is not None:
+                keep &= np.frombuffer(self._roles, dtype=np.int8)[candidates] == ROLES.get(role, OTHER_ROLE)
+            candidates, totals = candidates[keep], totals[keep]
+
+            order = np.argsort(-totals, kind="stable")
+            results = []
+            for i in order:
+                doc = int(candidates[i])
+                if phrases and not all(self._has_phrase(doc, phrase) for phrase in phrases):
+                    continue
+                results.append({"id": self._turn_ids[doc], "score": float(totals[i])})
+                if len(results) >= limit:
+                    break
+            return results
+
+    def _has_phrase(self, doc: int, phrase: List[str]) -> bool:
+        """Whether the tokens of ``phrase`` appear consecutively in ``doc``"""
+        position_sets = []
+        for term in phrase:
+            postings = self._terms.get(term)
+            positions = postings.positions_of(doc) if postings is not None else []
+            if not positions:
+                return False
+            position_sets.append(set(positions))
+        return any(
+            all(start + offset in positions for offset, positions in enumerate(position_sets[1:], 1))
+            for start in position_sets[0]
+        )
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+    def _arrays(self) -> Dict[str, np.ndarray]:
+        terms = list(self._terms)
+        postings = [self._terms[term] for term in terms]
+
+        def joined(name: str, dtype) -> np.ndarray:
+            parts = [np.frombuffer(getattr(p, name), dtype=dtype) for p in postings]
+            return np.concatenate(parts) if parts else np.empty(0, dtype)
+
+        return {"lengths": np.frombuffer(self._lengths, dtype=np.int32),
+                "times": np.frombuffer(self._times, dtype=np.float64),
+                "roles": np.frombuffer(self._roles, dtype=np.int8),
+                "terms": np.array(terms, dtype=str),
+                "term_indptr": np.cumsum([0] + [len(p.docs) for p in postings], dtype=np.int64),
+                "position_indptr": np.cumsum([0] + [len(p.positions) for p in postings], dtype=np.int64),
+                "docs": joined("docs", np.int32), "starts": joined("starts", np.int32),
+                "positions": joined("positions", np.int32)}
+
+    def _restore(self, data: Any) -> None:
+        self._lengths = array("i", data["lengths"].tobytes())
+        self._times = array("d", data["times"].tobytes())
+        self._roles = array("b", data["roles"].tobytes())
+        term_indptr, position_indptr = data["term_indptr"], data["position_indptr"]
+        docs, starts, positions = data["docs"], data["starts"], data["positions"]
+        for i, term in enumerate(data["terms"].tolist()):
+            postings = self._terms[term] = _Postings()
+            postings.docs = array("i", docs[term_indptr[i]:term_indptr[i + 1]].tobytes())
+            postings.starts = array("i", starts[term_indptr[i]:term_indptr[i + 1]].tobytes())
+            postings.positions = array("i", positions[position_indptr[i]:position_indptr[i + 1]].tobytes())
+        self._total_length = sum(self._lengths)
+
+
+def _parse_date_filter(key: str, value: str) -> datetime:
+    if value[:-1].isdigit() and value.endswith("d"):
+        return datetime.now() - timedelta(days=int(value[:-1]))
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"Bad {key} filter {value!r}: use YYYY-MM-DD or a number of days like 30d") from None
+
+
+def parse_search_command(text: str) -> Tuple[str, Dict[str, Any]]:
+    """Split ``since:``/``until:``/``role:`` filters out of a console query
+
+    Dates are ISO 8601 (``since:2024-05-01``) or a relative number of days
+    (``since:30d``). Raises ValueError for a date it cannot read.
+    """
+    filters: Dict[str, Any] = {}
+    words = []
+    for word in text.split():
+        key, _, value = word.partition(":")
+        if key in ("since", "until", "role") and value:
+            if key != "role":
+                value = _parse_date_filter(key, value)
+            filters[key] = value
+        else:
+            words.append(word)
+    return " ".join(words), filters
+
+
+def search_history(query: str, limit: int = 10, since: TimeArg = None,
+                   until: TimeArg = None, role: Optional[str] = None,
+                   chat_log=None) -> List[Dict[str, Any]]:
+    """Search the conversation and return matching turns with their scores"""
+    if chat_log is None:
+        from .conversation import get_conversation
+        chat_log = get_conversation()
+    hits = get_search_index(chat_log).search(query, limit=limit, since=since, until=until, role=role)
+    turns = {turn["id"]: turn for turn in chat_log.get_many([hit["id"] for hit in hits])}
+    return [{**turns[hit["id"]], "score": hit["score"]} for hit in hits if hit["id"] in turns]
+
+
+_search_index: Optional[SearchIndex] = None
+_search_index_lock = threading.Lock()
+
+
+def get_search_index(chat_log=None) -> SearchIndex:
+    """Return the process-wide search index, kept in sync with ``chat_log``"""
+    global _search_index
+    with _search_index_lock:
+        if _search_index is None:
+            _search_index = attach_to_chat_log(SearchIndex(), chat_log)
+        return _search_index
@@ -0,0 +1,180 @@
+"""
+Shared-memory control block for JARVIS AI Assistant worker processes
+
+A small file-backed ``mmap`` shared by Main.py and its worker subprocesses.
+It holds a fixed set of channels (``request`` and ``status``); each channel
+has a sequence number, a length and a JSON payload. Writers use a seqlock
+(the sequence is odd while a write is in progress), so readers never see a
+torn value. On Linux every channel also has an ``eventfd`` the writer
+signals, so waiting costs no polling; elsewhere waiters fall back to a short
+backoff on the sequence number.
+
+The image worker publishes a snapshot of its queue on the ``status`` channel,
+so Main.py can read how busy the worker is without asking it.
+"""
+import json
+import logging
+import mmap
+import os
+import select
+import struct
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from .config import config
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"JCB1"
+HEADER = struct.Struct("<4sII")  # magic, version, channel count
+CHANNEL_HEADER = struct.Struct("<QII")  # sequence, payload length, reserved
+PAYLOAD_BYTES = 4096
+CHANNEL_BYTES = CHANNEL_HEADER.size + PAYLOAD_BYTES
+CHANNELS = ("request", "status")
+VERSION = 1
+# A reader gives up on a channel that stays mid-write this long (its writer died)
+READ_TIMEOUT_SECONDS = 0.05
+
+ENV_PATH = "JARVIS_CONTROL_BLOCK"
+ENV_EVENTFDS = "JARVIS_CONTROL_EVENTFDS"
+
+HAS_EVENTFD = hasattr(os, "eventfd")
+
+
+class ControlBlock:
+    """Seqlock-protected channels in shared memory with eventfd wakeups"""
+
+    def __init__(self, path: Optional[Union[str, Path]] = None, create: bool = False,
+                 eventfds: Optional[Dict[str, int]] = None):
+        self.path = Path(path or config.CONTROL_BLOCK_FILE)
+        size = HEADER.size + CHANNEL_BYTES * len(CHANNELS)
+        if create:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "wb") as f:
+                f.write(HEADER.pack(MAGIC, VERSION, len(CHANNELS)))
+                f.write(b"\0" * (size - HEADER.size))
+        self._file = open(self.path, "r+b")
+        self._map = mmap.mmap(self._file.fileno(), size)
+        magic, version, count = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != VERSION or count != len(CHANNELS):
+            self.close()
+            raise ValueError(f"{self.path} is not a version {VERSION} control block")
+        self._write_lock = threading.Lock()
+        # Descriptors created here are closed with the block; inherited ones are not
+        self._owns_eventfds = eventfds is None and create and HAS_EVENTFD
+        if self._owns_eventfds:
+            eventfds = {name: os.eventfd(0, os.EFD_NONBLOCK) for name in CHANNELS}
+        self._eventfds: Dict[str, int] = eventfds or {}
+
+    @classmethod
+    def from_env(cls) -> Optional["ControlBlock"]:
+        """Attach to the block a parent process passed down, if any"""
+        path = os.environ.get(ENV_PATH)
+        if not path:
+            return None
+        eventfds = {}
+        for item in filter(None, os.environ.get(ENV_EVENTFDS, "").split(",")):
+            name, _, fd = item.partition(":")
+            eventfds[name] = int(fd)
+        return cls(path, eventfds=eventfds)
+
+    def child_fds(self) -> List[int]:
+        """Descriptors to pass to ``subprocess.Popen(pass_fds=...)``"""
+        return list(self._eventfds.values())
+
+    def child_env(self) -> Dict[str, str]:
+        """Environment that lets a child process attach with ``from_env``"""
+        return {
+            ENV_PATH: str(self.path),
+            ENV_EVENTFDS: ",".join(f"{name}:{fd}" for name, fd in self._eventfds.items()),
+        }
+
+    def _offset(self, channel: str) -> int:
+        return HEADER.size + CHANNELS.index(channel) * CHANNEL_BYTES
+
+    def publish(self, channel: str, value: Dict[str, Any]) -> int:
+        """Write ``value`` to ``channel`` and wake its waiter; return the new sequence
+
+        Each channel expects a single writing process.
+        """
+        payload = json.dumps(value, ensure_ascii=False).encode("utf-8")
+        if len(payload) > PAYLOAD_BYTES:
+            raise ValueError(f"Payload of {len(payload)} bytes exceeds {PAYLOAD_BYTES}")
+        offset = self._offset(channel)
+        with self._write_lock:
+            seq = CHANNEL_HEADER.unpack_from(self._map, offset)[0]
+            if seq % 2:
+                seq += 1  # A writer died mid-update; start from a stable value
+            struct.pack_into("<Q", self._map, offset, seq + 1)
+            self._map[offset + CHANNEL_HEADER.size:offset + CHANNEL_HEADER.size + len(payload)] = payload
+            CHANNEL_HEADER.pack_into(self._map, offset, seq + 2, len(payload), 0)
+        fd = self._eventfds.get(channel)
+        if fd is not None:
+            os.eventfd_write(fd, 1)
+        return seq + 2
+
+    def sequence(self, channel: str) -> int:
+        return CHANNEL_HEADER.unpack_from(self._map, self._offset(channel))[0]
+
+    def read(self, channel: str) -> Tuple[int, Optional[Dict[str, Any]]]:
+        """Return ``(sequence, value)``; value is None if nothing was published
+
+        Raises TimeoutError if the channel stays mid-write for
+        ``READ_TIMEOUT_SECONDS``, i.e. its writer died during an update.
+        """
+        offset = self._offset(channel)
+        deadline = None
+        while True:
+            seq, length, _ = CHANNEL_HEADER.unpack_from(self._map, offset)
+            if not seq % 2:
+                payload = self._map[offset + CHANNEL_HEADER.size:offset + CHANNEL_HEADER.size + length]
+                if CHANNEL_HEADER.unpack_from(self._map, offset)[0] == seq:
+                    return seq, json.loads(payload) if seq else None
+            # A write is in progress: yield to the writer instead of spinning
+            if deadline is None:
+                deadline = time.monotonic() + READ_TIMEOUT_SECONDS
+            elif time.monotonic() > deadline:
+                raise TimeoutError(f"{channel} channel of {self.path} is stuck mid-write")
+            time.sleep(0)
+
+    def wait(self, channel: str, after_seq: int = 0,
+             timeout: Optional[float] = None) -> Tuple[int, Optional[Dict[str, Any]]]:
+        """Block until ``channel`` has a sequence newer than ``after_seq``
+
+        Returns ``(sequence, value)``; on timeout the sequence is unchanged.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        fd = self._eventfds.get(channel)
+        backoff = 0.0005
+        while True:
+            seq, value = self.read(channel)
+            if seq > after_seq:
+                return seq, value
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return seq, value
+            if fd is not None:
+                if select.select([fd], [], [], remaining)[0]:
+                    try:
+                        os.eventfd_read(fd)
+                    except BlockingIOError:
+                        pass
+            else:
+                pause = backoff if remaining is None else min(backoff, remaining)
+                time.sleep(pause)
+                backoff = min(backoff * 2, 0.05)
+
+    def close(self) -> None:
+        if getattr(self, "_map", None) is not None:
+            self._map.close()
+            self._map = None
+        if getattr(self, "_file", None) is not None:
+            self._file.close()
+            self._file = None
+        if getattr(self, "_owns_eventfds", False):
+            for fd in self._eventfds.values():
+                os.close(fd)
+            self._eventfds = {}
+            self._owns_eventfds = False
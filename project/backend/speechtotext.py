@@ -1,14 +1,16 @@
 import os
 import time
+import queue
 import logging
-from selenium.webdriver.chrome.service import Service
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
+import threading
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
 from dotenv import dotenv_values
+from backend.events import get_event_bus, ASSISTANT_STATUS
+from backend.browser import get_recognizer_browser
+from backend.config import config
+from backend.stt import STTEngine, LocalSTT, MicrophoneSource, VoskBackend
 import stranslate as mt
 
 # Configure logging
@@ -32,8 +34,32 @@ HtmlCode = '''<!DOCTYPE html>
     <script>
         const output = document.getElementById('output');
         let recognition;
+        let listening = false;
+
+        // Final transcripts wait here until Python collects them
+        const pending = [];
+        let waiter = null;
+
+        // Long-poll used by execute_async_script: answers at once if a transcript
+        // is pending, otherwise as soon as one arrives or after timeoutMs
+        window.nextTranscripts = function(done, timeoutMs) {
+            if (pending.length) {
+                done(pending.splice(0));
+                return;
+            }
+            const timer = setTimeout(function() {
+                waiter = null;
+                done([]);
+            }, timeoutMs);
+            waiter = function() {
+                clearTimeout(timer);
+                waiter = null;
+                done(pending.splice(0));
+            };
+        };
 
         function startRecognition() {
+            listening = true;
             recognition = new (window.SpeechRecognition || window.webkitSpeechRecognition)();
             recognition.lang = 'en-US';  // You can set the language here
             recognition.continuous = true;
@@ -42,16 +68,22 @@ HtmlCode = '''<!DOCTYPE html>
             recognition.onresult = function(event) {
                 const transcript = event.results[event.results.length - 1][0].transcript.trim();
                 output.textContent = transcript;  // Overwrite instead of appending
+                if (transcript) {
+                    pending.push(transcript);
+                    if (waiter) waiter();
+                }
             };
 
+            // Keep the recognizer running between queries (it ends after silence)
             recognition.onend = function() {
-                recognition.start();
+                if (listening) recognition.start();
             };
 
             recognition.start();
         }
 
         function stopRecognition() {
+            listening = false;
             recognition.stop();
             output.innerHTML += '<br><strong>Recognition stopped.</strong>';
         }
@@ -74,23 +106,102 @@ with open(os.path.join(output_dir, "Voice.html"), "w") as f:
 current_dir = os.getcwd()
 Link = f"{current_dir}/Data/voice/Voice.html"
 
-# Configure Chrome options
-chrome_options = Options()
-user_agent = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/89.8.142.06 Safari/537.36"
-chrome_options.add_argument(f"user-agent={user_agent}")
-chrome_options.add_argument("--use-fake-ui-for-media-stream")
-chrome_options.add_argument("--headless=new")
-
-# Initialize the WebDriver
-service = Service(ChromeDriverManager().install())
-driver = webdriver.Chrome(service=service, options=chrome_options)
+# Headless Chrome is started on first use (or by a prewarm), not on import
+browser = get_recognizer_browser()
 
 TempDirpath = rf"{current_dir}/Frontend/Files"
 
+# Seconds one long-poll waits in the page before returning empty-handed
+LONG_POLL_SECONDS = 20
+POLL_SCRIPT = "window.nextTranscripts(arguments[arguments.length - 1], arguments[0]);"
+
+class RecognitionSession(STTEngine):
+    """Voice.html loaded once, with the recognizer left running between queries.
+
+    A reader thread long-polls the page with execute_async_script; the page
+    answers as soon as a final transcript arrives, and the transcript is put
+    on a queue. Once the session is open only the reader thread uses the driver.
+    """
+
+    def __init__(self, browser, url):
+        self.browser = browser
+        self.driver = None
+        self.url = url
+        self.transcripts = queue.Queue()
+        self.lock = threading.Lock()
+        self.reader = None
+
+    def start(self):
+        """Open the page and start the reader, unless they are already running."""
+        with self.lock:
+            if self.reader is not None and self.reader.is_alive():
+                return
+            self.reader = threading.Thread(target=self._read, name="SpeechRecognitionReader", daemon=True)
+            self.reader.start()
+
+    def _open_page(self):
+        started = time.perf_counter()
+        self.driver = self.browser.get()
+        self.driver.get("file:///" + self.url)
+        WebDriverWait(self.driver, 10).until(
+            EC.presence_of_element_located((By.ID, "start"))
+        )
+        self.driver.execute_script("startRecognition();")
+        self.driver.set_script_timeout(LONG_POLL_SECONDS + 5)
+        logging.info(f"Speech recognition started in {time.perf_counter() - started:.2f}s.")
+
+    def _read(self):
+        try:
+            self._open_page()
+            while True:
+                texts = self.driver.execute_async_script(POLL_SCRIPT, LONG_POLL_SECONDS * 1000)
+                for text in texts or []:
+                    self.transcripts.put((time.monotonic(), text))
+        except Exception as e:
+            # The next listen() reopens the page
+            logging.error(f"Speech recognition session stopped: {e}")
+
+    def listen(self, timeout=30):
+        """Return the next transcript heard after this call, or None after timeout seconds."""
+        since = time.monotonic()
+        self.start()
+        deadline = since + timeout
+        while True:
+            try:
+                heard, text = self.transcripts.get(timeout=max(0, deadline - time.monotonic()))
+            except queue.Empty:
+                return None
+            if heard >= since and text.strip():  # Skip speech from before we asked
+                return text
+
+# Created on first use: STT_ENGINE=local listens offline instead of through Chrome
+speech_engine = None
+speech_engine_lock = threading.Lock()
+
+def GetSpeechEngine():
+    """Return the configured speech-to-text engine."""
+    global speech_engine
+    with speech_engine_lock:
+        if speech_engine is None:
+            if config.STT_ENGINE == "local":
+                speech_engine = LocalSTT(MicrophoneSource(), VoskBackend(config.STT_SAMPLE_RATE))
+            else:
+                speech_engine = RecognitionSession(browser, Link)
+        return speech_engine
+
+def PrewarmSpeechRecognition():
+    """Get the speech engine ready in the background (Chrome and the page, or the Vosk model)."""
+    def warm():
+        try:
+            GetSpeechEngine().start()
+        except Exception as e:
+            logging.error(f"Could not start speech recognition: {e}")
+
+    threading.Thread(target=warm, name="SpeechRecognitionPrewarm", daemon=True).start()
+
 def SetAssistantStatus(Status):
     """Set the assistant's status."""
-    with open(rf'{TempDirpath}/Status.data', "w", encoding='utf-8') as file:
-        file.write(Status)
+    get_event_bus().publish(ASSISTANT_STATUS, Status)
 
 def QueryModifier(Query):
     """Modify the query to ensure it ends with a proper punctuation mark."""
@@ -125,59 +236,22 @@ def CleanText(Text):
     return Text.strip()
 
 def SpeechRecognition():
-    """Perform speech recognition using the HTML file and WebDriver."""
-    driver.get("file:///" + Link)
+    """Return the next recognized query from the speech engine."""
+    Text = GetSpeechEngine().listen(timeout=30)  # Timeout after 30 seconds of no speech
 
-    try:
-        # Wait for the start button to be visible
-        WebDriverWait(driver, 10).until(
-            EC.visibility_of_element_located((By.ID, "start"))
-        )
-
-        # Start speech recognition by clicking the start button
-        driver.find_element(by=By.ID, value="start").click()
-        logging.info("Speech recognition started.")
+    if not Text:
+        logging.warning("Speech recognition timed out.")
+        return None
 
-        start_time = time.time()
-        timeout = 30  # Timeout after 30 seconds of no speech
+    # Clean and process the recognized text
+    Text = CleanText(Text)
 
-        while True:
-            try:
-                # Wait for the output to be populated
-                WebDriverWait(driver, 10).until(
-                    EC.visibility_of_element_located((By.ID, "output"))
-                )
-                
-                # Get the recognized text from the HTML element
-                Text = driver.find_element(by=By.ID, value="output").text
-
-                if Text:
-                    # Stop speech recognition by clicking the end button
-                    driver.find_element(by=By.ID, value="end").click()
-                    logging.info("Speech recognition stopped.")
-
-                    # Clean and process the recognized text
-                    Text = CleanText(Text)
-
-                    # If the input language is English, return the modified query
-                    if InputLanguage.lower() == "en" or "en" in InputLanguage.lower():
-                        return QueryModifier(Text)
-                    else:
-                        SetAssistantStatus("Translating...")
-                        return QueryModifier(UniversalTranslator(Text))
-
-                # Check for timeout
-                if time.time() - start_time > timeout:
-                    logging.warning("Speech recognition timed out.")
-                    driver.find_element(by=By.ID, value="end").click()
-                    return None
-
-            except Exception as e:
-                logging.error(f"Error while recognizing text: {e}")
-                break  # Exit the loop if an error occurs
-
-    except Exception as e:
-        logging.error(f"Error opening the HTML file or interacting with WebDriver: {e}")
+    # If the input language is English, return the modified query
+    if InputLanguage.lower() == "en" or "en" in InputLanguage.lower():
+        return QueryModifier(Text)
+    else:
+        SetAssistantStatus("Translating...")
+        return QueryModifier(UniversalTranslator(Text))
 
 def CommandHandler(command):
     """Handle multiple commands based on the recognized speech."""
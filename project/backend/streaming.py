@@ -0,0 +1,147 @@
+"""
+Streaming helpers for JARVIS AI Assistant
+
+LLM answers are consumed as they are generated instead of after the last
+token. ``iter_completion_text`` yields the text deltas of a streamed chat
+completion, ``SentenceSplitter`` turns those deltas into complete sentences,
+and ``SentencePipeline`` hands sentences to a consumer (text-to-speech) on a
+background thread, so speaking one sentence overlaps with generating the
+next. A stream is cut short by cancelling its ``CancelToken``, and
+``SentencePipeline.clear`` drops sentences that will no longer be spoken.
+"""
+import logging
+import queue
+import re
+import threading
+from typing import Any, Callable, Iterable, Iterator, List, Optional
+
+from .cancel import CancelToken
+
+logger = logging.getLogger(__name__)
+
+# A sentence ends at . ! or ? (optionally followed by quotes/brackets) and
+# then whitespace; a line break always ends one
+SENTENCE_END = re.compile(r"""(?<=[.!?])["')\]]*(?=\s)|(?=\n)""")
+# Words whose trailing period does not end a sentence
+ABBREVIATIONS = {"mr", "mrs", "ms", "dr", "prof", "sr", "jr", "st", "vs", "etc", "e.g", "i.e", "no", "approx"}
+MIN_SENTENCE_CHARS = 2
+
+
+def _close_stream(completion: Any) -> None:
+    close = getattr(completion, "close", None) or getattr(getattr(completion, "response", None), "close", None)
+    if close is not None:
+        close()
+
+
+def iter_completion_text(completion: Iterable[Any], token: Optional[CancelToken] = None) -> Iterator[str]:
+    """Yield the non-empty text deltas of a streamed chat completion
+
+    Cancelling ``token`` closes the HTTP stream, so no further tokens are
+    generated for us, and ends the iteration quietly.
+    """
+    unregister = token.on_cancel(lambda: _close_stream(completion)) if token is not None else None
+    try:
+        for chunk in completion:
+            if token is not None and token.cancelled:
+                return
+            choices = getattr(chunk, "choices", None)
+            if not choices:
+                continue
+            delta = getattr(choices[0], "delta", None)
+            content = getattr(delta, "content", None)
+            if content:
+                yield content
+    except Exception:
+        if token is not None and token.cancelled:
+            return  # The read was interrupted by closing the stream
+        raise
+    finally:
+        if unregister is not None:
+            unregister()
+
+
+class SentenceSplitter:
+    """Accumulates streamed text and emits sentences once they are complete"""
+
+    def __init__(self):
+        self._buffer = ""
+
+    def _is_boundary(self, text: str) -> bool:
+        text = text.strip()
+        if len(text) < MIN_SENTENCE_CHARS or text.rstrip(".").isdigit():
+            return False  # Too short, or a list number such as "1."
+        last = text.rsplit(None, 1)[-1].rstrip(".")
+        # Abbreviations and initials ("Dr.", "J.") do not end a sentence
+        return last.lower() not in ABBREVIATIONS and not (len(last) == 1 and last.isupper())
+
+    def feed(self, text: str) -> List[str]:
+        """Add a delta; return the sentences it completed
+
+        A boundary needs the whitespace after the punctuation, so "3." at
+        the end of one delta is not split before a "5" in the next.
+        """
+        self._buffer += text
+        sentences = []
+        start = 0
+        for match in SENTENCE_END.finditer(self._buffer):
+            candidate = self._buffer[start:match.end()]
+            newline = self._buffer[match.end():match.end() + 1] == "\n"
+            if not newline and not self._is_boundary(candidate):
+                continue
+            if candidate.strip():
+                sentences.append(candidate.strip())
+            start = match.end()
+        self._buffer = self._buffer[start:].lstrip() if start else self._buffer
+        return sentences
+
+    def flush(self) -> List[str]:
+        """Return whatever is left once the stream has ended"""
+        rest, self._buffer = self._buffer.strip(), ""
+        return [rest] if rest else []
+
+
+class SentencePipeline:
+    """Runs ``consume(sentence)`` for each queued sentence on a worker thread
+
+    ``on_close`` runs on the worker once the last queued sentence is consumed.
+    """
+
+    def __init__(self, consume: Callable[[str], Any], name: str = "SentencePipeline",
+                 on_close: Optional[Callable[[], Any]] = None):
+        self.consume = consume
+        self.on_close = on_close
+        self._queue: "queue.Queue[Optional[str]]" = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            sentence = self._queue.get()
+            if sentence is None:
+                if self.on_close is not None:
+                    self.on_close()
+                return
+            try:
+                self.consume(sentence)
+            except Exception as e:
+                logger.error(f"Sentence consumer failed: {e}")
+
+    def put(self, sentence: str) -> None:
+        self._queue.put(sentence)
+
+    def clear(self) -> None:
+        """Drop queued sentences that have not been consumed yet"""
+        while True:
+            try:
+                sentence = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if sentence is None:
+                self._queue.put(None)  # Keep a pending close
+                return
+
+    def close(self, wait: bool = True) -> None:
+        """Stop after the queued sentences; with ``wait`` block until they are done"""
+        self._queue.put(None)
+        if wait:
+            self._thread.join()
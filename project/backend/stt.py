@@ -0,0 +1,425 @@
+"""
+Offline streaming speech-to-text for JARVIS AI Assistant
+
+``STTEngine`` is the interface the voice loop listens through: ``listen``
+returns the next utterance's text. The browser session in speechtotext.py is
+one implementation; ``LocalSTT`` is a local, streaming one:
+
+* audio blocks from a source (``MicrophoneSource`` or ``WavSource``) are
+  written into a NumPy ``RingBuffer``;
+* ``EnergyVAD`` classifies whole 20 ms frames at once from their energy and
+  zero-crossing rate, and ``Endpointer`` turns that into utterance start/end
+  with a short pre-roll and a silence hangover;
+* samples of the current utterance are streamed into a ``RecognizerBackend``
+  (``VoskBackend`` when the optional ``vosk`` package and a model are
+  installed) while the user is still talking, so the text is ready as soon
+  as the endpoint is detected.
+
+Everything but the microphone and the recognizer runs on WAV input, so the
+pipeline can be exercised without a browser. Benchmark endpoint detection
+with::
+
+    python -m backend.stt --benchmark [--wav speech.wav]
+"""
+import json
+import logging
+from abc import ABC, abstractmethod
+import threading
+import time
+import wave
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+
+from .config import config
+
+logger = logging.getLogger(__name__)
+
+FRAME_MS = 20
+# Quiet frames are averaged into the noise floor at this rate per frame
+NOISE_ADAPT_RATE = 0.05
+INITIAL_NOISE_FLOOR_DB = -60.0
+
+
+class STTEngine(ABC):
+    """Speech-to-text engine: ``listen`` returns what the user says next"""
+
+    def start(self) -> None:
+        """Prepare for ``listen`` ahead of time (open devices, load models)"""
+
+    @abstractmethod
+    def listen(self, timeout: Optional[float] = None) -> Optional[str]:
+        """Text of the next utterance, or None if nothing was heard in ``timeout`` seconds"""
+
+    def close(self) -> None:
+        pass
+
+
+class RingBuffer:
+    """The newest ``capacity`` int16 samples, addressed by absolute sample index"""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._data = np.zeros(capacity, dtype=np.int16)
+        self.total = 0  # Samples written so far
+
+    def write(self, samples: np.ndarray) -> None:
+        samples = np.asarray(samples, dtype=np.int16)
+        count = len(samples)
+        if count > self.capacity:
+            samples = samples[-self.capacity:]  # Only the newest samples fit
+        first = self.total + count - len(samples)
+        self._data[np.arange(first, self.total + count) % self.capacity] = samples
+        self.total += count
+
+    @property
+    def oldest(self) -> int:
+        return max(0, self.total - self.capacity)
+
+    def read(self, start: int, stop: int) -> np.ndarray:
+        """Samples ``[start, stop)``; ``start`` is clamped to what is still buffered"""
+        start = max(start, self.oldest)
+        if stop <= start:
+            return np.zeros(0, dtype=np.int16)
+        return self._data[np.arange(start, stop) % self.capacity]
+
+
+class EnergyVAD:
+    """Frame-level voice activity from energy and zero-crossing rate
+
+    A frame is speech when it is louder than the threshold, or a little
+    quieter but with the high zero-crossing rate of fricatives ("s", "f").
+    The threshold follows an adaptive noise floor, never going below
+    ``threshold_db``.
+    """
+
+    def __init__(self, sample_rate: int, frame_ms: int = FRAME_MS, threshold_db: Optional[float] = None,
+                 margin_db: float = 12.0, fricative_db: float = 8.0, fricative_zcr: float = 0.3):
+        self.sample_rate = sample_rate
+        self.frame_length = sample_rate * frame_ms // 1000
+        self.threshold_db = threshold_db if threshold_db is not None else config.STT_VAD_THRESHOLD_DB
+        self.margin_db = margin_db
+        self.fricative_db = fricative_db
+        self.fricative_zcr = fricative_zcr
+        self.noise_floor_db = INITIAL_NOISE_FLOOR_DB
+
+    def features(self, samples: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Energy (dBFS) and zero-crossing rate of each whole frame in ``samples``"""
+        count = len(samples) // self.frame_length
+        frames = samples[:count * self.frame_length].reshape(count, self.frame_length).astype(np.float32) / 32768.0
+        energy_db = 10.0 * np.log10(np.mean(frames * frames, axis=1) + 1e-10)
+        signs = np.signbit(frames)
+        zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / (self.frame_length - 1)
+        return energy_db, zcr
+
+    def classify(self, samples: np.ndarray) -> np.ndarray:
+        """Boolean speech decision per frame"""
+        energy_db, zcr = self.features(samples)
+        threshold = max(self.threshold_db, self.noise_floor_db + self.margin_db)
+        speech = (energy_db > threshold) | ((energy_db > threshold - self.fricative_db) & (zcr > self.fricative_zcr))
+        quiet = energy_db[~speech]
+        if quiet.size:
+            weight = 1.0 - (1.0 - NOISE_ADAPT_RATE) ** quiet.size
+            self.noise_floor_db += weight * (float(quiet.mean()) - self.noise_floor_db)
+        return speech
+
+
+class Endpointer:
+    """Turns per-frame speech decisions into utterance start and end frames
+
+    Speech starts after ``start_frames`` consecutive speech frames (reported
+    ``preroll_frames`` earlier, so the onset is not clipped) and ends after
+    ``end_frames`` consecutive silent frames.
+    """
+
+    def __init__(self, start_frames: int = 3, end_frames: Optional[int] = None, preroll_frames: int = 10):
+        self.start_frames = start_frames
+        self.end_frames = end_frames or max(1, config.STT_ENDPOINT_SILENCE_MS // FRAME_MS)
+        self.preroll_frames = preroll_frames
+        self.in_speech = False
+        self._run = 0
+
+    def update(self, speech: np.ndarray, first_frame: int) -> List[Tuple[str, int]]:
+        """Events ``("start" | "end", frame index)`` for decisions starting at ``first_frame``"""
+        events = []
+        for offset, is_speech in enumerate(speech.tolist()):
+            frame = first_frame + offset
+            if is_speech != self.in_speech:
+                self._run += 1
+            else:
+                self._run = 0
+            if not self.in_speech and self._run >= self.start_frames:
+                events.append(("start", max(0, frame - self._run + 1 - self.preroll_frames)))
+                self.in_speech, self._run = True, 0
+            elif self.in_speech and self._run >= self.end_frames:
+                events.append(("end", frame - self._run + 1))
+                self.in_speech, self._run = False, 0
+        return events
+
+
+class RecognizerBackend(ABC):
+    """Consumes the samples of one utterance as they arrive and returns its text"""
+
+    def start(self) -> None:
+        """Begin a new utterance"""
+
+    @abstractmethod
+    def accept(self, samples: np.ndarray) -> None:
+        """Add samples of the current utterance"""
+
+    @abstractmethod
+    def finish(self) -> str:
+        """Text of the current utterance once it has ended"""
+
+
+class VoskBackend(RecognizerBackend):
+    """Offline recognition with Vosk (``pip install vosk`` plus a model directory)"""
+
+    def __init__(self, sample_rate: int, model_path: Optional[Union[str, Path]] = None):
+        try:
+            from vosk import KaldiRecognizer, Model, SetLogLevel
+        except ImportError as e:
+            raise RuntimeError("Offline speech recognition needs the vosk package (pip install vosk)") from e
+        model_path = Path(model_path or config.VOSK_MODEL_PATH)
+        if not model_path.is_dir():
+            raise RuntimeError(f"Vosk model not found at {model_path} (set VOSK_MODEL_PATH)")
+        SetLogLevel(-1)
+        self._recognizer_class = KaldiRecognizer
+        self.model = Model(str(model_path))
+        self.sample_rate = sample_rate
+        self._recognizer = None
+
+    def start(self) -> None:
+        self._recognizer = self._recognizer_class(self.model, self.sample_rate)
+
+    def accept(self, samples: np.ndarray) -> None:
+        self._recognizer.AcceptWaveform(samples.astype(np.int16).tobytes())
+
+    def finish(self) -> str:
+        return json.loads(self._recognizer.FinalResult()).get("text", "")
+
+
+class WavSource:
+    """Blocks of int16 samples from a WAV file, optionally paced in real time"""
+
+    def __init__(self, path: Union[str, Path], block_ms: int = 100, realtime: bool = False):
+        self.path = Path(path)
+        self.block_ms = block_ms
+        self.realtime = realtime
+        with wave.open(str(self.path), "rb") as wav:
+            if wav.getsampwidth() != 2:
+                raise ValueError(f"{self.path} is not 16-bit PCM")
+            self.sample_rate = wav.getframerate()
+
+    def __iter__(self) -> Iterator[np.ndarray]:
+        with wave.open(str(self.path), "rb") as wav:
+            channels = wav.getnchannels()
+            block = self.sample_rate * self.block_ms // 1000
+            started = time.monotonic()
+            position = 0
+            while True:
+                data = wav.readframes(block)
+                if not data:
+                    return
+                samples = np.frombuffer(data, dtype=np.int16)
+                if channels > 1:
+                    samples = samples.reshape(-1, channels).mean(axis=1).astype(np.int16)
+                position += len(samples)
+                if self.realtime:
+                    time.sleep(max(0.0, started + position / self.sample_rate - time.monotonic()))
+                yield samples
+
+
+class MicrophoneSource:
+    """Blocks of int16 samples from the default microphone (PyAudio)"""
+
+    def __init__(self, sample_rate: Optional[int] = None, block_ms: int = 100):
+        self.sample_rate = sample_rate or config.STT_SAMPLE_RATE
+        self.block_ms = block_ms
+
+    def __iter__(self) -> Iterator[np.ndarray]:
+        import pyaudio
+
+        audio = pyaudio.PyAudio()
+        block = self.sample_rate * self.block_ms // 1000
+        stream = audio.open(format=pyaudio.paInt16, channels=1, rate=self.sample_rate,
+                            input=True, frames_per_buffer=block)
+        try:
+            while True:
+                data = stream.read(block, exception_on_overflow=False)
+                yield np.frombuffer(data, dtype=np.int16)
+        finally:
+            stream.stop_stream()
+            stream.close()
+            audio.terminate()
+
+
+class Transcript:
+    """One recognized utterance; times are seconds of audio since the source started"""
+
+    def __init__(self, text: str, start: float, end: float, detected: float):
+        self.text = text
+        self.start = start
+        self.end = end
+        self.detected = detected  # Audio time at which the endpoint was reported
+
+    @property
+    def endpoint_latency(self) -> float:
+        return self.detected - self.end
+
+    def __repr__(self) -> str:
+        return (f"Transcript({self.text!r}, start={self.start:.2f}, end={self.end:.2f}, "
+                f"latency={self.endpoint_latency * 1000:.0f}ms)")
+
+
+class LocalSTT(STTEngine):
+    """Streaming recognition: ring buffer -> VAD endpointing -> recognizer backend"""
+
+    def __init__(self, source: Iterable[np.ndarray], backend: RecognizerBackend,
+                 vad: Optional[EnergyVAD] = None, endpointer: Optional[Endpointer] = None,
+                 buffer_seconds: float = 10.0):
+        self.source = source
+        self.sample_rate = getattr(source, "sample_rate", config.STT_SAMPLE_RATE)
+        self.backend = backend
+        self.vad = vad or EnergyVAD(self.sample_rate)
+        self.endpointer = endpointer or Endpointer()
+        self.ring = RingBuffer(int(buffer_seconds * self.sample_rate))
+        self._blocks: Optional[Iterator[np.ndarray]] = None
+        self._lock = threading.Lock()
+        self._framed = 0  # Samples already classified by the VAD
+        self._fed = 0  # Samples already passed to the backend
+        self._start = 0
+
+    def start(self) -> None:
+        with self._lock:
+            if self._blocks is None:
+                self._blocks = iter(self.source)
+
+    def _feed(self, stop: int) -> None:
+        samples = self.ring.read(self._fed, stop)
+        if len(samples):
+            self.backend.accept(samples)
+        self._fed = stop
+
+    def process(self, block: np.ndarray) -> List[Transcript]:
+        """Add one block of audio; return the utterances it completed"""
+        self.ring.write(block)
+        frame_length = self.vad.frame_length
+        count = (self.ring.total - self._framed) // frame_length
+        if not count:
+            return []
+        start, stop = self._framed, self._framed + count * frame_length
+        speech = self.vad.classify(self.ring.read(start, stop))
+        self._framed = stop
+        transcripts = []
+        for kind, frame in self.endpointer.update(speech, start // frame_length):
+            sample = frame * frame_length
+            if kind == "start":
+                self.backend.start()
+                self._start = self._fed = max(sample, self.ring.oldest)
+            else:
+                self._feed(sample)
+                transcripts.append(Transcript(self.backend.finish().strip(), self._start / self.sample_rate,
+                                              sample / self.sample_rate, self.ring.total / self.sample_rate))
+        if self.endpointer.in_speech:
+            self._feed(stop)  # Recognize while the user is still talking
+        return transcripts
+
+    def transcripts(self) -> Iterator[Transcript]:
+        """Every utterance in the source, including empty recognitions"""
+        self.start()
+        for block in self._blocks:
+            yield from self.process(block)
+
+    def listen(self, timeout: Optional[float] = None) -> Optional[str]:
+        self.start()
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        for block in self._blocks:
+            for transcript in self.process(block):
+                if transcript.text:
+                    return transcript.text
+            if deadline is not None and time.monotonic() > deadline:
+                return None
+        return None
+
+
+def write_wav(path: Union[str, Path], samples: np.ndarray, sample_rate: int) -> None:
+    with wave.open(str(path), "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(np.asarray(samples, dtype=np.int16).tobytes())
+
+
+def synthetic_speech(sample_rate: int, segments: Iterable[Tuple[float, float]], duration: float,
+                     seed: int = 0) -> np.ndarray:
+    """Background noise with voiced bursts at ``(start, end)`` seconds, as a WAV fixture"""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(duration * sample_rate)) / sample_rate
+    audio = rng.normal(0.0, 0.002, len(t))
+    for start, end in segments:
+        voiced = (t >= start) & (t < end)
+        # A 140 Hz "voice" with harmonics and a syllable-rate envelope
+        envelope = 0.6 + 0.4 * np.sin(2 * np.pi * 4 * t[voiced])
+        tone = sum(np.sin(2 * np.pi * 140 * k * t[voiced]) / k for k in range(1, 6))
+        audio[voiced] += 0.15 * envelope * tone
+    return np.clip(audio * 32767, -32768, 32767).astype(np.int16)
+
+
+class _EndpointOnly(RecognizerBackend):
+    """Backend for benchmarking endpointing alone: reports the utterance length"""
+
+    def start(self) -> None:
+        self.samples = 0
+
+    def accept(self, samples: np.ndarray) -> None:
+        self.samples += len(samples)
+
+    def finish(self) -> str:
+        return f"<{self.samples} samples>"
+
+
+if __name__ == "__main__":
+    import argparse
+    import tempfile
+
+    parser = argparse.ArgumentParser(description="Run or benchmark the offline speech-to-text pipeline")
+    parser.add_argument("--wav", help="16-bit WAV file (default: a generated fixture)")
+    parser.add_argument("--benchmark", action="store_true", help="Measure endpointing only, no recognizer")
+    parser.add_argument("--realtime", action="store_true", help="Feed the WAV at real-time speed")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+    expected = []
+    wav_path = args.wav
+    if wav_path is None:
+        sample_rate = config.STT_SAMPLE_RATE
+        expected = [(0.5, 1.7), (2.6, 3.1), (4.0, 6.2)]
+        wav_path = str(Path(tempfile.gettempdir()) / "jarvis_stt_fixture.wav")
+        write_wav(wav_path, synthetic_speech(sample_rate, expected, 7.5), sample_rate)
+
+    source = WavSource(wav_path, realtime=args.realtime)
+    backend = _EndpointOnly() if args.benchmark else VoskBackend(source.sample_rate)
+    engine = LocalSTT(source, backend)
+    results: List[Transcript] = []
+    block_seconds = []
+    for block in source:
+        started = time.perf_counter()
+        results += engine.process(block)
+        block_seconds.append(time.perf_counter() - started)
+    elapsed = sum(block_seconds)
+    audio_seconds = engine.ring.total / source.sample_rate
+
+    for index, transcript in enumerate(results):
+        line = repr(transcript)
+        if index < len(expected):
+            line += f" (true end {expected[index][1]:.2f}s, detected after {transcript.detected - expected[index][1]:.3f}s)"
+        print(line)
+    if results:
+        latencies = np.array([transcript.endpoint_latency for transcript in results])
+        print(f"endpoint latency: mean {latencies.mean() * 1000:.0f}ms, max {latencies.max() * 1000:.0f}ms "
+              f"(silence hangover {engine.endpointer.end_frames * FRAME_MS}ms)")
+    print(f"processed {audio_seconds:.1f}s of audio in {elapsed * 1000:.1f}ms "
+          f"({audio_seconds / elapsed:.0f}x real time); slowest {source.block_ms}ms block took "
+          f"{max(block_seconds) * 1000:.2f}ms")
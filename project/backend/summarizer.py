@@ -0,0 +1,177 @@
+"""
+Rolling summarization of old chat history for JARVIS AI Assistant
+
+Turns older than a configurable horizon are folded into summary records by a
+background thread. Each run only looks at turns the latest summary does not
+cover yet, and prompt builders send ``latest summary + turns after it``
+instead of the full history.
+"""
+import json
+import logging
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Union
+
+from .config import config
+
+logger = logging.getLogger(__name__)
+
+# summarize(previous_summary, turns) -> new summary text
+SummarizeFn = Callable[[str, List[Dict[str, Any]]], str]
+
+SUMMARY_PROMPT = """You maintain a running summary of a conversation between a user and an AI assistant.
+Update the summary with the new turns below. Keep facts, names, preferences, decisions and open questions.
+Drop greetings and filler. Reply with the updated summary only, in at most 200 words."""
+
+MAX_TURN_CHARS = 1000
+
+
+class SummaryStore:
+    """Append-only file of summary records; the newest one is current"""
+
+    def __init__(self, file_path: Optional[Union[str, Path]] = None):
+        self.file_path = Path(file_path or config.CHAT_SUMMARY_FILE)
+        self._lock = threading.Lock()
+        self._latest: Optional[Dict[str, Any]] = None
+        if self.file_path.exists():
+            with open(self.file_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        self._latest = json.loads(line)
+                    except ValueError:
+                        logger.warning(f"Skipping unreadable summary record in {self.file_path}")
+
+    def latest(self) -> Optional[Dict[str, Any]]:
+        """Return the current summary record, if any"""
+        with self._lock:
+            return self._latest
+
+    @property
+    def covers_until(self) -> int:
+        """Id of the last turn folded into the current summary"""
+        latest = self.latest()
+        return latest["covers_until"] if latest else 0
+
+    def add(self, summary: str, covers_until: int) -> Dict[str, Any]:
+        """Record a new summary covering turns up to ``covers_until``"""
+        record = {
+            "covers_until": covers_until,
+            "summary": summary,
+            "timestamp": datetime.now().isoformat(),
+        }
+        with self._lock:
+            self.file_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.file_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            self._latest = record
+        return record
+
+
+class HistorySummarizer:
+    """Background job that folds turns beyond the horizon into the summary"""
+
+    def __init__(self, chat_log, summarize: SummarizeFn,
+                 summaries: Optional[SummaryStore] = None,
+                 horizon_turns: Optional[int] = None,
+                 batch_turns: Optional[int] = None,
+                 interval: Optional[float] = None):
+        self.chat_log = chat_log
+        self.summarize = summarize
+        self.summaries = summaries or get_summary_store()
+        self.horizon_turns = horizon_turns or config.CHAT_SUMMARY_HORIZON_TURNS
+        self.batch_turns = batch_turns or config.CHAT_SUMMARY_BATCH_TURNS
+        self.interval = interval or config.CHAT_SUMMARY_INTERVAL
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def pending(self) -> List[Dict[str, Any]]:
+        """Turns that are past the horizon and not yet summarized"""
+        cutoff = len(self.chat_log) - self.horizon_turns
+        if cutoff <= 0:
+            return []
+        cutoff_id = self.chat_log.read_range(cutoff, cutoff + 1)[0]["id"]
+        turns = self.chat_log.after(self.summaries.covers_until, limit=self.batch_turns)
+        return [turn for turn in turns if turn["id"] < cutoff_id]
+
+    def run_once(self) -> bool:
+        """Summarize one batch of pending turns; return True if work was done"""
+        turns = self.pending()
+        if not turns:
+            return False
+        latest = self.summaries.latest()
+        previous = latest["summary"] if latest else ""
+        if any(str(turn.get("content", "")).strip() for turn in turns):
+            summary = self.summarize(previous, turns)
+        else:
+            # Nothing worth summarizing; just move the horizon forward
+            summary = previous
+        self.summaries.add(summary, covers_until=turns[-1]["id"])
+        logger.info(f"Summarized {len(turns)} turns up to id {turns[-1]['id']}")
+        return True
+
+    def notify(self) -> None:
+        """Ask the background thread to check for new work (non-blocking)"""
+        self._wake.set()
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            try:
+                # Catch up in batches before going back to sleep
+                while not self._stopped.is_set() and self.run_once():
+                    pass
+            except Exception as e:
+                logger.error(f"History summarization failed: {e}")
+            self._wake.wait(self.interval)
+            self._wake.clear()
+
+    def start(self) -> None:
+        """Start the background thread (idempotent)"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name="HistorySummarizer", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stopped.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+
+def groq_summarizer(client, model: str = "llama3-70b-8192", max_tokens: int = 400) -> SummarizeFn:
+    """Build a summarize function that calls a Groq chat completion client"""
+
+    def summarize(previous: str, turns: List[Dict[str, Any]]) -> str:
+        transcript = "\n".join(
+            f"{turn['role']}: {str(turn['content'])[:MAX_TURN_CHARS]}"
+            for turn in turns if str(turn.get("content", "")).strip()
+        )
+        completion = client.chat.completions.create(
+            model=model,
+            messages=[
+                {"role": "system", "content": SUMMARY_PROMPT},
+                {"role": "user", "content": f"Current summary:\n{previous or '(none)'}\n\nNew turns:\n{transcript}"},
+            ],
+            max_tokens=max_tokens,
+            temperature=0.3,
+            stream=False,
+        )
+        return completion.choices[0].message.content.strip()
+
+    return summarize
+
+
+_summary_store: Optional[SummaryStore] = None
+_summary_store_lock = threading.Lock()
+
+
+def get_summary_store() -> SummaryStore:
+    """Return the process-wide summary store, creating it on first use"""
+    global _summary_store
+    with _summary_store_lock:
+        if _summary_store is None:
+            _summary_store = SummaryStore()
+        return _summary_store
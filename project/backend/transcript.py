@@ -0,0 +1,101 @@
+"""
+Incremental chat transcript rendering for JARVIS AI Assistant
+
+The GUI shows the conversation from a plain-text transcript
+(``Database.data``). Instead of re-formatting the whole history on every
+refresh, each turn is formatted once and appended; a small cursor file
+records the last rendered turn id and the transcript size so a restart only
+renders turns that are new since the previous run.
+"""
+import json
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Union
+
+from .chatlog import atomic_write_json
+
+logger = logging.getLogger(__name__)
+
+
+class TranscriptRenderer:
+    """Keeps a ``Name: message`` transcript in sync with the chat log"""
+
+    def __init__(self, output_file: Union[str, Path], user_label: str, assistant_label: str,
+                 cursor_file: Optional[Union[str, Path]] = None):
+        self.output_file = Path(output_file)
+        self.cursor_file = Path(cursor_file) if cursor_file else self.output_file.with_suffix(".cursor")
+        self.labels = {"user": user_label, "assistant": assistant_label}
+        self._lock = threading.Lock()
+        self._cursor = self._read_cursor()
+
+    def _read_cursor(self) -> Dict[str, Any]:
+        try:
+            with open(self.cursor_file, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _cursor_valid(self, chat_log) -> bool:
+        """The transcript on disk is exactly what the cursor describes"""
+        cursor = self._cursor
+        if not cursor or cursor.get("labels") != self.labels:
+            return False
+        if cursor.get("last_id", 0) > chat_log.last_id:
+            # The log was rewritten underneath us
+            return False
+        try:
+            return self.output_file.stat().st_size == cursor.get("size")
+        except OSError:
+            return False
+
+    def format_turn(self, turn: Dict[str, Any]) -> str:
+        """Render one turn as a line (blank lines inside the content dropped)"""
+        label = self.labels.get(turn["role"])
+        if label is None:
+            return ""
+        content = "\n".join(line for line in str(turn.get("content", "")).split("\n") if line.strip())
+        return f"{label}: {content}\n"
+
+    def _append(self, turns: Iterable[Dict[str, Any]], reset: bool = False) -> int:
+        last_id = 0 if reset else self._cursor.get("last_id", 0)
+        chunk = []
+        for turn in turns:
+            if turn["id"] <= last_id:
+                continue
+            chunk.append(self.format_turn(turn))
+            last_id = turn["id"]
+        if not chunk and not reset:
+            return 0
+        self.output_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.output_file, "w" if reset else "a", encoding="utf-8", newline="\n") as f:
+            f.write("".join(chunk))
+            f.flush()
+            size = f.tell()
+        self._cursor = {"last_id": last_id, "size": size, "labels": self.labels}
+        atomic_write_json(self.cursor_file, self._cursor)
+        return len(chunk)
+
+    def sync(self, chat_log) -> int:
+        """Render turns not yet in the transcript; return how many were added
+
+        Falls back to a full re-render when the cursor does not match the
+        transcript (first run, labels changed, file cleared or log rewritten).
+        """
+        with self._lock:
+            if self._cursor_valid(chat_log):
+                return self._append(chat_log.after(self._cursor.get("last_id", 0)))
+            logger.info(f"Re-rendering chat transcript {self.output_file}")
+            return self._append(chat_log.read_all(), reset=True)
+
+    def add_turns(self, turns: Iterable[Dict[str, Any]]) -> int:
+        """Append freshly recorded turns; suitable as a chat log listener"""
+        with self._lock:
+            if self._cursor.get("size") is None:
+                return 0
+            try:
+                if self.output_file.stat().st_size != self._cursor["size"]:
+                    return 0
+            except OSError:
+                return 0
+            return self._append(turns)
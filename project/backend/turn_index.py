@@ -0,0 +1,153 @@
+"""
+Persistent indexes over chat turns for JARVIS AI Assistant
+
+``TurnIndex`` holds what the retrieval memory and the full-text search index
+have in common: turns are indexed in id order, the id of the newest indexed
+turn tells ``sync`` where to catch up from the chat log, and the index is
+saved as one ``.npz`` file next to the chat log, a few seconds after each
+batch of new turns and again at exit. Subclasses only decide how a turn is
+indexed and which arrays are persisted.
+"""
+import atexit
+import logging
+import re
+import threading
+from abc import ABC, abstractmethod
+from array import array
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+import numpy as np
+
+from .config import config
+
+logger = logging.getLogger(__name__)
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase word tokens"""
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+class TurnIndex(ABC):
+    """Base for incremental indexes over chat turns, persisted as ``.npz``"""
+
+    # Used in log messages
+    label = "chat turn index"
+
+    def __init__(self, index_file: Union[str, Path], save_delay: Optional[float] = None):
+        self.index_file = Path(index_file)
+        self.save_delay = config.INDEX_SAVE_DELAY if save_delay is None else save_delay
+        self._lock = threading.Lock()
+        self._turn_ids = array("q")
+        self._dirty = False
+        self._save_timer: Optional[threading.Timer] = None
+        self._reset()
+        if self.index_file.exists():
+            self._load()
+
+    def __len__(self) -> int:
+        return len(self._turn_ids)
+
+    @property
+    def indexed_until(self) -> int:
+        """Id of the newest turn in the index (0 when empty)"""
+        return self._turn_ids[-1] if self._turn_ids else 0
+
+    # ------------------------------------------------------------------
+    # Subclass hooks (called with the lock held)
+    # ------------------------------------------------------------------
+    def _reset(self) -> None:
+        """Start from an empty index"""
+
+    @abstractmethod
+    def _index_turn(self, doc: int, turn: Dict[str, Any]) -> bool:
+        """Add ``turn`` as document ``doc``; False skips it"""
+
+    @abstractmethod
+    def _arrays(self) -> Dict[str, np.ndarray]:
+        """Arrays to save besides ``turn_ids``"""
+
+    @abstractmethod
+    def _restore(self, data: Any) -> None:
+        """Rebuild the index from the arrays of a saved file"""
+
+    # ------------------------------------------------------------------
+    # Indexing
+    # ------------------------------------------------------------------
+    def add_turns(self, turns: Iterable[Dict[str, Any]]) -> int:
+        """Index turns newer than ``indexed_until``; suitable as a chat log listener"""
+        added = 0
+        with self._lock:
+            for turn in turns:
+                if turn["id"] <= self.indexed_until:
+                    continue
+                if self._index_turn(len(self._turn_ids), turn):
+                    self._turn_ids.append(turn["id"])
+                    added += 1
+            if added:
+                self._dirty = True
+                self._schedule_save()
+        return added
+
+    def sync(self, chat_log) -> int:
+        """Catch up with turns recorded since the index was last saved"""
+        return self.add_turns(chat_log.after(self.indexed_until))
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+    def _schedule_save(self) -> None:
+        # A hard exit (os._exit) skips atexit, so batches are saved shortly after they land
+        if self._save_timer is not None or self.save_delay <= 0:
+            return
+        self._save_timer = threading.Timer(self.save_delay, self._save_in_background)
+        self._save_timer.daemon = True
+        self._save_timer.start()
+
+    def _save_in_background(self) -> None:
+        try:
+            self.save()
+        except Exception as e:
+            logger.error(f"Could not save {self.label} {self.index_file}: {e}")
+
+    def save(self) -> None:
+        """Write the index file (atomic rename) if anything changed"""
+        with self._lock:
+            if self._save_timer is not None:
+                self._save_timer.cancel()
+                self._save_timer = None
+            if not self._dirty:
+                return
+            tmp_file = self.index_file.with_suffix(".tmp.npz")
+            np.savez(tmp_file, turn_ids=np.frombuffer(self._turn_ids, dtype=np.int64), **self._arrays())
+            tmp_file.replace(self.index_file)
+            self._dirty = False
+
+    def _load(self) -> None:
+        try:
+            with np.load(self.index_file) as data:
+                self._turn_ids = array("q", data["turn_ids"].astype(np.int64).tobytes())
+                self._restore(data)
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Could not load {self.label} {self.index_file}, rebuilding: {e}")
+            self._turn_ids = array("q")
+            self._reset()
+
+
+def attach_to_chat_log(index: TurnIndex, chat_log=None) -> TurnIndex:
+    """Catch ``index`` up with ``chat_log`` and keep it updated as turns are recorded
+
+    The index is also saved when the process exits normally.
+    """
+    if chat_log is None:
+        from .conversation import get_conversation
+        chat_log = get_conversation()
+    added = index.sync(chat_log)
+    if added:
+        logger.info(f"Indexed {added} chat turns into the {index.label}")
+    chat_log.add_listener(index.add_turns)
+    atexit.register(index.save)
+    return index
@@ -8,6 +8,7 @@ from pathlib import Path
 from typing import Any, Dict, List, Optional, Union
 from datetime import datetime
 from .config import config
+from .conversation import get_conversation
 
 # Setup logging
 logging.basicConfig(
@@ -104,25 +105,48 @@ class MessageManager:
     
     @staticmethod
     def load_chat_log() -> List[Dict[str, Any]]:
-        """Load chat log from file"""
-        return FileManager.read_file(config.CHAT_LOG_FILE, [])
+        """Load chat log from the chat log store"""
+        return get_conversation().read_all()
     
     @staticmethod
     def save_chat_log(messages: List[Dict[str, Any]]) -> bool:
-        """Save chat log to file"""
-        return FileManager.write_file(config.CHAT_LOG_FILE, messages)
+        """Replace the chat log with ``messages``"""
+        try:
+            get_conversation().rewrite(messages)
+            return True
+        except OSError as e:
+            logger.error(f"Error saving chat log: {e}")
+            return False
     
     @staticmethod
     def add_message(role: str, content: str) -> bool:
-        """Add message to chat log"""
-        messages = MessageManager.load_chat_log()
-        message = {
-            "role": role,
-            "content": content,
-            "timestamp": datetime.now().isoformat()
-        }
-        messages.append(message)
-        return MessageManager.save_chat_log(messages)
+        """Append a message to the chat log"""
+        try:
+            get_conversation().append(role, content, timestamp=datetime.now().isoformat())
+            return True
+        except OSError as e:
+            logger.error(f"Error adding message to chat log: {e}")
+            return False
+    
+    @staticmethod
+    def get_recent_messages(count: int) -> List[Dict[str, Any]]:
+        """Get the newest ``count`` messages without loading the whole log"""
+        return get_conversation().tail(count)
+    
+    @staticmethod
+    def get_messages_since(timestamp: Union[str, datetime]) -> List[Dict[str, Any]]:
+        """Get messages recorded at or after ``timestamp``"""
+        if isinstance(timestamp, datetime):
+            timestamp = timestamp.isoformat()
+        return get_conversation().since(timestamp)
+    
+    @staticmethod
+    def search_history(query: str, limit: int = 10, since: Union[str, datetime, None] = None,
+                       until: Union[str, datetime, None] = None,
+                       role: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Full-text search over the chat log, best matches first"""
+        from .search_index import search_history
+        return search_history(query, limit=limit, since=since, until=until, role=role)
     
     @staticmethod
     def show_response(text: str) -> None:
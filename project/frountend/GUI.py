@@ -1,7 +1,11 @@
 from PyQt5.QtWidgets import QApplication, QMainWindow, QTextEdit, QStackedWidget, QWidget, QLineEdit, QGridLayout, QVBoxLayout, QHBoxLayout, QPushButton, QLabel, QFrame, QSizePolicy
-from PyQt5.QtGui import QIcon, QPainter, QMovie, QColor, QTextCharFormat, QFont, QPixmap, QTextBlockFormat
-from PyQt5.QtCore import Qt, QSize, QTimer
+from PyQt5.QtGui import QIcon, QPainter, QMovie, QColor, QTextCharFormat, QFont, QPixmap, QTextBlockFormat, QTextCursor, QImage
+from PyQt5.QtCore import Qt, QSize, QTimer, QObject, QSocketNotifier, pyqtSignal
 from dotenv import dotenv_values
+from backend.events import get_event_bus, mirror_to_files, ASSISTANT_STATUS, MIC_STATUS, RESPONSE_TEXT, RESPONSE_PARTIAL, IMAGE_STATUS
+from backend.assistant_state import get_assistant_state
+from backend.config import config
+from backend.file_watch import FileTopicWatcher
 import sys
 import os
 
@@ -13,6 +17,17 @@ old_chat_message = ""
 TempDirPath = rf"{current_dir}\frountend\Files"
 GraphicsDirPath = rf"{current_dir}\frountend\Graphics"
 
+# Status, mic state and responses travel over the in-process event bus;
+# set EVENT_FILE_MIRROR=true to also keep the legacy *.data files updated
+bus = get_event_bus()
+mirror_to_files({
+    ASSISTANT_STATUS: rf'{TempDirPath}\Status.data',
+    MIC_STATUS: rf'{TempDirPath}\Mic.data',
+    RESPONSE_TEXT: rf'{TempDirPath}\Responses.data',
+})
+# Mic flag and status line; only real changes are published
+assistant_state = get_assistant_state()
+
 # Function to modify answers
 def AnswerModifier(Answer):
     lines = Answer.split('\n')
@@ -44,27 +59,21 @@ def QueryModifier(Query):
 
 # Function to set microphone status
 def SetMicrophoneStatus(Command):
-    with open(rf'{TempDirPath}\Mic.data', 'w', encoding='utf-8') as file:
-        file.write(Command)
+    assistant_state.set_mic(Command)
 
 # Function to get microphone status
 def GetMicrophoneStatus():
-    with open(rf'{TempDirPath}\Mic.data', "r", encoding='utf-8') as file:
-        Status = file.read()
-    return Status
+    return str(assistant_state.mic)
 
 # Function to set assistant status
 def SetAssistantStatus(Status):
-    with open(rf'{TempDirPath}\Status.data', 'w', encoding='utf-8') as file:
-        file.write(Status)
+    assistant_state.set_status(Status)
 
 SetAssistantStatus("Speaking...")
 
 # Function to get assistant status
 def GetAssistantStatus():
-    with open(rf'{TempDirPath}\Status.data', "r", encoding='utf-8') as file:
-        Status = file.read()
-    return Status
+    return assistant_state.status
 
 # Mic button functions
 def MicButtonInitialed():
@@ -83,8 +92,47 @@ def TempDirectoryPath(Filename):
     return Path
 
 def ShowTextToScreen(Text):
-    with open(rf'{TempDirPath}\Responses.data', 'w', encoding='utf-8') as file:
-        file.write(Text)
+    bus.publish(RESPONSE_TEXT, Text)
+
+# Answer so far while it is still being generated; replaced by ShowTextToScreen
+def ShowPartialText(Text):
+    bus.publish(RESPONSE_PARTIAL, Text)
+
+# Re-emits event bus updates as Qt signals; Qt queues them to the GUI thread
+class EventBridge(QObject):
+    statusChanged = pyqtSignal(str)
+    responseChanged = pyqtSignal(str)
+    partialChanged = pyqtSignal(str)
+    imageChanged = pyqtSignal(object)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        unsubscribe = [
+            bus.subscribe(ASSISTANT_STATUS, lambda topic, value: self.statusChanged.emit(str(value))),
+            bus.subscribe(RESPONSE_TEXT, lambda topic, value: self.responseChanged.emit(str(value))),
+            bus.subscribe(RESPONSE_PARTIAL, lambda topic, value: self.partialChanged.emit(str(value))),
+            bus.subscribe(IMAGE_STATUS, lambda topic, value: self.imageChanged.emit(value)),
+        ]
+        self.destroyed.connect(lambda: [stop() for stop in unsubscribe])
+
+# Follow *.data files written by external tools (GUI_FILE_WATCH=true): an
+# inotify descriptor wakes the Qt loop only when a file changes
+def StartFileWatch(parent):
+    watcher = FileTopicWatcher({
+        ASSISTANT_STATUS: rf'{TempDirPath}\Status.data',
+        MIC_STATUS: rf'{TempDirPath}\Mic.data',
+        RESPONSE_TEXT: rf'{TempDirPath}\Responses.data',
+    })
+    watcher.refresh()
+    if watcher.fileno() is not None:
+        trigger = QSocketNotifier(watcher.fileno(), QSocketNotifier.Read, parent)
+        trigger.activated.connect(watcher.process_events)
+    else:
+        # No inotify on this platform: a cheap stat check instead of re-reading
+        trigger = QTimer(parent)
+        trigger.timeout.connect(watcher.poll)
+        trigger.start(250)
+    return watcher, trigger
 
 # Chat section UI class
 class ChatSection(QWidget):
@@ -137,10 +185,15 @@ class ChatSection(QWidget):
         font.setPointSize(13)
         self.chat_text_edit.setFont(font)
         
-        self.timer = QTimer(self)
-        self.timer.timeout.connect(self.loadMessages)
-        self.timer.timeout.connect(self.SpeechRecogText)
-        self.timer.start(5)
+        # Updates arrive as signals instead of polling the *.data files
+        self.events = EventBridge(self)
+        self.events.responseChanged.connect(self.loadMessages)
+        self.events.partialChanged.connect(self.showPartial)
+        self.partial_start = None
+        self.events.statusChanged.connect(self.SpeechRecogText)
+        self.events.imageChanged.connect(self.showImages)
+        self.loadMessages()
+        self.SpeechRecogText()
         
         self.chat_text_edit.viewport().installEventFilter(self)
         self.setStyleSheet("""
@@ -176,26 +229,43 @@ class ChatSection(QWidget):
                    }
                    """)
     
-    def loadMessages(self):
+    def loadMessages(self, messages=None):
         global old_chat_message
 
-        with open(TempDirectoryPath('Responses.data'), "r", encoding='utf-8') as file:
-            messages = file.read()
+        if messages is None:
+            messages = bus.latest(RESPONSE_TEXT)
 
-            if messages is None:
-                pass
-            elif len(messages) < 1:
-                pass
-            elif str(old_chat_message) == str(messages):
-                pass 
-            else:
-                self.addMessage(messages, color='white')
-                old_chat_message = messages
+        if messages is None:
+            pass
+        elif len(messages) < 1:
+            pass
+        elif str(old_chat_message) == str(messages):
+            pass 
+        else:
+            self.clearPartial()
+            self.addMessage(messages, color='white')
+            old_chat_message = messages
+
+    def showPartial(self, message):
+        # Rewrites the in-progress answer in place as more of it arrives
+        self.clearPartial()
+        self.partial_start = self.chat_text_edit.textCursor().position()
+        self.addMessage(message, color='white')
+
+    def clearPartial(self):
+        if self.partial_start is None:
+            return
+        cursor = self.chat_text_edit.textCursor()
+        cursor.setPosition(self.partial_start)
+        cursor.movePosition(QTextCursor.End, QTextCursor.KeepAnchor)
+        cursor.removeSelectedText()
+        self.chat_text_edit.setTextCursor(cursor)
+        self.partial_start = None
 
-    def SpeechRecogText(self):
-        with open(TempDirectoryPath('Status.data'), "r", encoding='utf-8') as file:
-            messages = file.read()
-            self.text_label.setText(messages)
+    def SpeechRecogText(self, status=None):
+        if status is None:
+            status = GetAssistantStatus()
+        self.text_label.setText(status)
 
     def load_icon(self, path, width=60, height=60):
         pixmap = QPixmap(path)
@@ -212,6 +282,20 @@ class ChatSection(QWidget):
 
         self.toogled = not self.toogled
 
+    def showImages(self, event):
+        # Thumbnails of finished image jobs are shown inline in the chat
+        if event.get("state") != "done":
+            return
+        cursor = self.chat_text_edit.textCursor()
+        cursor.movePosition(QTextCursor.End)
+        for path in event.get("thumbnails", []):
+            image = QImage(path)
+            if not image.isNull():
+                cursor.insertImage(image)
+                cursor.insertText(" ")
+        cursor.insertText("\n")
+        self.chat_text_edit.setTextCursor(cursor)
+
     def addMessage(self, message, color):
         cursor = self.chat_text_edit.textCursor()
         format = QTextCharFormat()
@@ -259,14 +343,14 @@ class InitialScreen(QWidget):
         self.setFixedHeight(screen_height)
         self.setFixedWidth(screen_width)
         self.setStyleSheet("background-color: black;")
-        self.timer = QTimer(self)
-        self.timer.timeout.connect(self.SpeechRecogText)
-        self.timer.start(5)
+        self.events = EventBridge(self)
+        self.events.statusChanged.connect(self.SpeechRecogText)
+        self.SpeechRecogText()
 
-    def SpeechRecogText(self):
-        with open(TempDirectoryPath('Status.data'), "r", encoding='utf-8') as file:
-            messages = file.read()
-            self.label.setText(messages)
+    def SpeechRecogText(self, status=None):
+        if status is None:
+            status = GetAssistantStatus()
+        self.label.setText(status)
 
     def load_icon(self, path, width=60, height=60):
         pixmap = QPixmap(path)
@@ -426,6 +510,8 @@ class MainWindow(QMainWindow):
         top_bar = CustomTopBar(self, stacked_widget)
         self.setMenuWidget(top_bar)
         self.setCentralWidget(stacked_widget)
+        if config.GUI_FILE_WATCH:
+            self.file_watch = StartFileWatch(self)
 
 def GraphicalUserInterface():
     app = QApplication(sys.argv)
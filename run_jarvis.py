@@ -8,9 +8,9 @@ import argparse
 import logging
 from pathlib import Path
 
-# Add project root to path
+# The backend and frountend packages live in project/
 project_root = Path(__file__).parent
-sys.path.insert(0, str(project_root))
+sys.path.insert(0, str(project_root / "project"))
 
 from backend import validate_environment, setup_directories, config
 
@@ -74,9 +74,16 @@ def run_web():
 def run_console():
     """Run the console version"""
     try:
-        from backend.chatbot import Chatbot
+        from backend.search_index import get_search_index, parse_search_command, search_history
+        try:
+            from backend.chatbot import Chatbot
+        except Exception as e:
+            # Missing packages or API keys still leave history search usable
+            Chatbot = None
+            print(f"⚠️ Chat is unavailable ({e}); only /search works")
         print("💬 Starting JARVIS Console Mode...")
-        print("Type 'exit' to quit")
+        print("Type 'exit' to quit, '/search <words> [since:30d] [until:YYYY-MM-DD] [role:user]' to search history")
+        get_search_index()  # Catch up now so later turns are indexed as they are recorded
         
         while True:
             user_input = input("\n🎤 You: ").strip()
@@ -84,7 +91,22 @@ def run_console():
                 print("👋 Goodbye!")
                 break
             
-            if user_input:
+            if user_input.startswith("/search"):
+                try:
+                    query, filters = parse_search_command(user_input[len("/search"):])
+                except ValueError as e:
+                    print(f"❌ {e}")
+                    continue
+                results = search_history(query, **filters)
+                if not results:
+                    print("🔍 No matching messages")
+                for turn in results:
+                    print(f"🔍 [{turn['timestamp'][:16]}] {turn['role']}: {turn['content'][:200]}")
+                continue
+            
+            if user_input and Chatbot is None:
+                print("❌ Chat is unavailable; use /search")
+            elif user_input:
                 response = Chatbot(user_input)
                 print(f"🤖 JARVIS: {response}")
     
@@ -15,7 +15,8 @@ setup(
     long_description=long_description,
     long_description_content_type="text/markdown",
     url="https://github.com/jarvis-ai/jarvis-assistant",
-    packages=find_packages(),
+    package_dir={"": "project"},
+    packages=find_packages(where="project"),
     classifiers=[
         "Development Status :: 4 - Beta",
         "Intended Audience :: End Users/Desktop",
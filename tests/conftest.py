@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# The backend package lives in project/, next to Main.py
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "project"))
@@ -0,0 +1,78 @@
+"""Tests for the offline speech-to-text pipeline, run from generated WAV fixtures"""
+import numpy as np
+import pytest
+
+from backend.stt import (FRAME_MS, Endpointer, LocalSTT, RecognizerBackend, RingBuffer, WavSource,
+                         _EndpointOnly, synthetic_speech, write_wav)
+
+SAMPLE_RATE = 16000
+SEGMENTS = [(0.5, 1.7), (2.6, 3.1), (4.0, 6.2)]
+FRAME = FRAME_MS / 1000
+
+
+@pytest.fixture
+def fixture_wav(tmp_path):
+    path = tmp_path / "speech.wav"
+    write_wav(path, synthetic_speech(SAMPLE_RATE, SEGMENTS, 7.5), SAMPLE_RATE)
+    return path
+
+
+@pytest.mark.parametrize("block_ms", [20, 30, 100])
+def test_endpoints_match_true_segments(fixture_wav, block_ms):
+    endpointer = Endpointer(end_frames=20)
+    engine = LocalSTT(WavSource(fixture_wav, block_ms=block_ms), _EndpointOnly(), endpointer=endpointer)
+    transcripts = list(engine.transcripts())
+
+    assert len(transcripts) == len(SEGMENTS)
+    hangover = endpointer.end_frames * FRAME
+    preroll = endpointer.preroll_frames * FRAME
+    block = block_ms / 1000
+    for transcript, (start, end) in zip(transcripts, SEGMENTS):
+        # Onsets are reported a pre-roll early so the first syllable is kept
+        assert start - preroll - FRAME <= transcript.start <= start
+        assert abs(transcript.end - end) <= FRAME
+        # Detection waits for the hangover; blocks add at most one block of delay
+        assert transcript.end + hangover <= transcript.detected + 1e-9
+        assert transcript.endpoint_latency <= hangover + max(block, FRAME) + 1e-9
+
+
+def test_listen_returns_first_utterance(fixture_wav):
+    engine = LocalSTT(WavSource(fixture_wav), _EndpointOnly())
+    assert engine.listen(timeout=5).startswith("<")
+
+
+def test_silence_has_no_utterances(tmp_path):
+    path = tmp_path / "silence.wav"
+    write_wav(path, synthetic_speech(SAMPLE_RATE, [], 3.0), SAMPLE_RATE)
+    assert list(LocalSTT(WavSource(path), _EndpointOnly()).transcripts()) == []
+
+
+def test_ring_buffer_wraps_around():
+    ring = RingBuffer(10)
+    ring.write(np.arange(7))
+    ring.write(np.arange(7, 15))
+
+    assert ring.total == 15
+    assert ring.oldest == 5
+    assert ring.read(0, 15).tolist() == list(range(5, 15))  # Start is clamped to what is kept
+    assert ring.read(12, 15).tolist() == [12, 13, 14]
+
+
+def test_ring_buffer_block_larger_than_capacity():
+    ring = RingBuffer(10)
+    ring.write(np.arange(3))
+    ring.write(np.arange(3, 28))
+
+    assert ring.total == 28
+    assert ring.read(18, 28).tolist() == list(range(18, 28))
+    ring.write(np.arange(28, 31))
+    assert ring.read(21, 31).tolist() == list(range(21, 31))
+
+
+def test_backend_missing_methods_fails_on_creation():
+    class Incomplete(RecognizerBackend):
+        def accept(self, samples):
+            pass
+
+    with pytest.raises(TypeError):
+        Incomplete()